@@ -32,6 +32,9 @@ export interface AuthResponse {
     first_name: string;
     last_name: string;
     role?: string;
+    // Student accounts only
+    student?: number;
+    student_id?: string;
   };
   tokens: AuthTokens;
 }
@@ -1,4 +1,6 @@
 // Django API client to replace Supabase
+import type { DashboardSummary } from './types';
+
 const DJANGO_API_BASE = 'http://localhost:8000/api/';
 
 interface ApiResponse<T> {
@@ -23,9 +25,12 @@ class DjangoAPIClient {
     endpoint: string,
     options: RequestInit = {}
   ): Promise<T> {
-    const url = `${this.baseURL}${endpoint}`;
+    // Pagination links (next/previous) are already absolute URLs
+    const url = endpoint.startsWith('http') ? endpoint : `${this.baseURL}${endpoint}`;
 
     const config: RequestInit = {
+      // Send cookies, including the one that pins us to the primary database after a write
+      credentials: 'include',
       ...options,
       headers: {
         ...this.defaultHeaders,
@@ -65,7 +70,7 @@ class DjangoAPIClient {
   }
 
   // Generic CRUD operations
-  async getAll<T>(resource: string, params?: Record<string, any>): Promise<T[]> {
+  async getPage<T>(resource: string, params?: Record<string, any>): Promise<ApiResponse<T>> {
     const searchParams = params ? new URLSearchParams(params).toString() : '';
     const endpoint = searchParams ? `${resource}/?${searchParams}` : `${resource}/`;
 
@@ -77,11 +82,30 @@ class DjangoAPIClient {
       };
     }
 
-    const response = await this.request<any>(endpoint, config);
+    return this.request<ApiResponse<T>>(endpoint, config);
+  }
+
+  async getAll<T>(resource: string, params?: Record<string, any>): Promise<T[]> {
+    let response: any = await this.getPage<T>(resource, params);
     if (Array.isArray(response)) {
       return response;
     }
-    return response.results || [];
+
+    const config: RequestInit = {};
+    const accessToken = localStorage.getItem('django_access_token');
+    if (accessToken) {
+      config.headers = {
+        'Authorization': `Bearer ${accessToken}`,
+      };
+    }
+
+    // Follow cursor links until the last page
+    const results: T[] = [...(response.results || [])];
+    while (response.next) {
+      response = await this.request<ApiResponse<T>>(response.next, config);
+      results.push(...(response.results || []));
+    }
+    return results;
   }
 
   async getById<T>(resource: string, id: string | number): Promise<T> {
@@ -160,6 +184,15 @@ class DjangoAPIClient {
     return this.delete('students', id);
   }
 
+  async searchStudents(q: string, limit?: number) {
+    const searchParams = new URLSearchParams({ q, ...(limit ? { limit: String(limit) } : {}) });
+    return this.request<any[]>(`students/search/?${searchParams}`);
+  }
+
+  async getStudentOverview(id: string | number) {
+    return this.request<any>(`students/${id}/overview/`);
+  }
+
   async getClasses(params?: Record<string, any>) {
     return this.getAll<any>('classes', params);
   }
@@ -180,6 +213,10 @@ class DjangoAPIClient {
     return this.delete('classes', id);
   }
 
+  async getClassReport(id: string | number) {
+    return this.request<any>(`classes/${id}/report/`);
+  }
+
   async getSubjects(params?: Record<string, any>) {
     return this.getAll<any>('subjects', params);
   }
@@ -220,6 +257,19 @@ class DjangoAPIClient {
     return this.delete('grades', id);
   }
 
+  async getGradeSummary(params?: Record<string, any>) {
+    const searchParams = params ? new URLSearchParams(params).toString() : '';
+    return this.request<any[]>(searchParams ? `grades/summary/?${searchParams}` : 'grades/summary/');
+  }
+
+  // Runs in the background: poll getJob() until it succeeds, then fetch its download_url
+  async queueReportCards(data: { class_id?: number; grade_level?: string; start_date?: string; end_date?: string }) {
+    return this.request<any>('grades/report-cards/', {
+      method: 'POST',
+      body: JSON.stringify(data),
+    });
+  }
+
   async getAttendance(params?: Record<string, any>) {
     return this.getAll<any>('attendance', params);
   }
@@ -240,9 +290,29 @@ class DjangoAPIClient {
     return this.delete('attendance', id);
   }
 
+  async bulkMarkAttendance(data: { class_name: number; date: string; records: any[] }) {
+    return this.request<any>('attendance/bulk/', {
+      method: 'POST',
+      body: JSON.stringify(data),
+    });
+  }
+
+  async getJob(id: string) {
+    return this.request<any>(`jobs/${id}/`);
+  }
+
   async getUsers(params?: Record<string, any>) {
     return this.getAll<any>('users', params);
   }
+
+  async autocomplete(kind: 'students' | 'classes' | 'subjects', q: string, limit?: number) {
+    const searchParams = new URLSearchParams({ q, ...(limit ? { limit: String(limit) } : {}) });
+    return this.request<{ id: number; label: string }[]>(`autocomplete/${kind}/?${searchParams}`);
+  }
+
+  async getDashboardSummary() {
+    return this.request<DashboardSummary>('dashboard/summary/');
+  }
 }
 
 // Export singleton instance
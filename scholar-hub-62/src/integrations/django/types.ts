@@ -86,6 +86,29 @@ export interface DjangoAttendance {
   updated_at: string;
 }
 
+// Dashboard summary, computed server-side with aggregate queries
+export interface DashboardAttendanceDay {
+  date: string;
+  present: number;
+  absent: number;
+  late: number;
+  excused: number;
+}
+
+export interface DashboardSummary {
+  date: string;
+  counts: {
+    students: number;
+    classes: number;
+    subjects: number;
+    grades: number;
+    attendance: number;
+  };
+  present_today: number;
+  attendance_last_7_days: DashboardAttendanceDay[];
+  grade_distribution: { name: string; value: number }[];
+}
+
 // API Response types
 export interface DjangoAPIResponse<T> {
   results?: T[];
@@ -100,32 +123,41 @@ export interface PaginationParams {
   page_size?: number;
 }
 
+// Sparse fieldsets: comma-separated field names, e.g. 'id,first_name,last_name'
+export interface FieldsetParams {
+  fields?: string;
+  expand?: string;
+}
+
 // Filter params for different resources
-export interface StudentFilters {
+export interface StudentFilters extends FieldsetParams {
   status?: string;
-  grade_level?: string;
-  search?: string;
+  class_enrolled?: number;
+  ordering?: string;
 }
 
-export interface ClassFilters {
+export interface ClassFilters extends FieldsetParams {
   grade_level?: string;
   academic_year?: string;
   class_teacher?: number;
 }
 
-export interface GradeFilters {
+export interface GradeFilters extends FieldsetParams {
   student?: number;
   subject?: number;
-  class_name?: number;
+  class_id?: number;
   grade_type?: string;
   start_date?: string;
   end_date?: string;
+  ordering?: string;
 }
 
-export interface AttendanceFilters {
+export interface AttendanceFilters extends FieldsetParams {
+  date?: string;
   student?: number;
   class_name?: number;
   status?: string;
   start_date?: string;
   end_date?: string;
+  ordering?: string;
 }
\ No newline at end of file
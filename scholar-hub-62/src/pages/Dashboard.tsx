@@ -44,85 +44,20 @@ const Dashboard = () => {
 
   const fetchDashboardData = async () => {
     try {
-      // Fetch total students
-      const students = await djangoAPI.getStudents();
-      const studentsCount = students.length;
-
-      // Fetch total classes
-      const classes = await djangoAPI.getClasses();
-      const classesCount = classes.length;
-
-      // Fetch total subjects
-      const subjects = await djangoAPI.getSubjects();
-      const subjectsCount = subjects.length;
-
-      // Fetch today's attendance
-      const today = new Date().toISOString().split("T")[0];
-      const attendanceRecords = await djangoAPI.getAttendance({ date: today });
-      const attendanceCount = attendanceRecords.filter(record => record.status === "present").length;
-
-      // Fetch total grades
-      const allGrades = await djangoAPI.getGrades();
-      const gradesCount = allGrades ? allGrades.length : 0;
-
-      // Fetch total attendance records
-      const allAttendanceRecordsTotal = await djangoAPI.getAttendance();
-      const attendanceRecordsCount = allAttendanceRecordsTotal ? allAttendanceRecordsTotal.length : 0;
+      // Counts and chart data are aggregated by the API in a single request
+      const summary = await djangoAPI.getDashboardSummary();
 
       setStats({
-        totalStudents: studentsCount,
-        totalClasses: classesCount,
-        totalSubjects: subjectsCount,
-        totalAttendanceToday: attendanceCount,
-        totalGrades: gradesCount,
-        totalAttendanceRecords: attendanceRecordsCount,
+        totalStudents: summary.counts.students,
+        totalClasses: summary.counts.classes,
+        totalSubjects: summary.counts.subjects,
+        totalAttendanceToday: summary.present_today,
+        totalGrades: summary.counts.grades,
+        totalAttendanceRecords: summary.counts.attendance,
       });
 
-      // Fetch grade distribution
-      const grades = allGrades;
-
-      if (grades) {
-        const distribution = {
-          "A (90-100)": 0,
-          "B (80-89)": 0,
-          "C (70-79)": 0,
-          "D (60-69)": 0,
-          "F (0-59)": 0,
-        };
-
-        grades.forEach((grade) => {
-          const value = parseFloat(String(grade.grade_value));
-          if (value >= 90) distribution["A (90-100)"]++;
-          else if (value >= 80) distribution["B (80-89)"]++;
-          else if (value >= 70) distribution["C (70-79)"]++;
-          else if (value >= 60) distribution["D (60-69)"]++;
-          else distribution["F (0-59)"]++;
-        });
-
-        setGradeDistribution(
-          Object.entries(distribution).map(([name, value]) => ({ name, value }))
-        );
-      }
-
-      // Fetch attendance data for the last 7 days
-      const sevenDaysAgo = new Date(Date.now() - 7 * 24 * 60 * 60 * 1000).toISOString().split("T")[0];
-      const allAttendanceRecords = allAttendanceRecordsTotal.filter(record => record.date >= sevenDaysAgo);
-
-      if (allAttendanceRecords) {
-        const attendanceMap = new Map();
-        allAttendanceRecords.forEach((record) => {
-          const date = record.date;
-          if (!attendanceMap.has(date)) {
-            attendanceMap.set(date, { date, present: 0, absent: 0, late: 0 });
-          }
-          const entry = attendanceMap.get(date);
-          if (record.status === "present") entry.present++;
-          else if (record.status === "absent") entry.absent++;
-          else if (record.status === "late") entry.late++;
-        });
-
-        setAttendanceData(Array.from(attendanceMap.values()).slice(-7));
-      }
+      setGradeDistribution(summary.grade_distribution);
+      setAttendanceData(summary.attendance_last_7_days);
     } catch (error) {
       console.error("Error fetching dashboard data:", error);
     }
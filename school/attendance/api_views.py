@@ -1,8 +1,204 @@
-from rest_framework import viewsets, permissions
-from .models import Attendance
-from .serializers import AttendanceSerializer
+from django.db import transaction
+from django.db.models import Sum
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.response import Response
+from classes.models import Class
+from school.conditional import ConditionalGetMixin
+from school.fieldsets import SparseFieldsetMixin
+from school.exports import CSVRenderer, streaming_csv_response
+from school.filters import QueryParamFilterBackend
+from students.authentication import API_AUTHENTICATION_CLASSES
+from students.models import Student
+from students.permissions import IsTeacher
+from .models import Attendance, ClassDailyAttendance, StudentMonthlyAttendance
+from .rollups import STATUSES, record_changes, rollup_key
+from .serializers import AttendanceSerializer, RollCallEntrySerializer, RollCallSerializer
 
-class AttendanceViewSet(viewsets.ModelViewSet):
-    queryset = Attendance.objects.all()
+EXPORT_CHUNK_SIZE = 2000
+
+
+def stats_row(row, **extra):
+    """Rollup status counts with their total and present rate."""
+    row.update(extra)
+    row['total'] = sum(row[s] for s in STATUSES)
+    row['present_rate'] = round(row['present'] * 100 / row['total'], 2) if row['total'] else None
+    return row
+
+
+class AttendanceViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    """
+    Attendance records, newest first.
+
+    Filters (each served by an index on Attendance):
+    - `date`, `start_date`, `end_date`: one day or an inclusive range (date, status)
+    - `class_name`: class id, usually with a date (class_name, date)
+    - `student`: student id, usually with a date range (student, date)
+    - `status`: present, absent, late or excused (date, status)
+
+    Order with `?ordering=` on date, status, student__last_name or student__first_name.
+    `?fields=` trims each record; `?expand=` takes student and class_name.
+    """
+    # AttendanceSerializer reads student and class names for every row
+    queryset = Attendance.objects.select_related('student', 'class_name')
+    etag_dependencies = [Student, Class]  # Names shown on each record
     serializer_class = AttendanceSerializer
-    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
\ No newline at end of file
+    authentication_classes = API_AUTHENTICATION_CLASSES  # Users from token claims, no query
+    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    filter_backends = [QueryParamFilterBackend, OrderingFilter]
+    replica_actions = ['export', 'class_stats', 'student_stats']
+    filter_params = {
+        'date': 'date',
+        'start_date': 'date__gte',
+        'end_date': 'date__lte',
+        'class_name': 'class_name',
+        'student': 'student',
+        'status': 'status',
+    }
+    ordering_fields = ['date', 'status', 'student__last_name', 'student__first_name']
+
+    @action(detail=False, methods=['post'], permission_classes=[IsTeacher])
+    def bulk(self, request):
+        """
+        Mark a whole class for one date in a single request.
+
+        Body: `{"class_name": id, "date": "YYYY-MM-DD", "records": [{"student": id,
+        "status": "present", "check_in_time": null, "check_out_time": null, "notes": ""}]}`
+
+        Valid records are upserted on (student, class_name, date), so a retry
+        updates the existing rows instead of failing. Invalid records are
+        reported in `results` and skipped.
+        """
+        roll_call = RollCallSerializer(data=request.data)
+        roll_call.is_valid(raise_exception=True)
+        class_obj = roll_call.validated_data['class_name']
+        date = roll_call.validated_data['date']
+        records = roll_call.validated_data['records']
+
+        results = [None] * len(records)
+        entries = {}
+        for index, record in enumerate(records):
+            entry = RollCallEntrySerializer(data=record)
+            if not entry.is_valid():
+                results[index] = {'student': record.get('student'), 'errors': entry.errors}
+            elif entry.validated_data['student'] in entries:
+                results[index] = {'student': entry.validated_data['student'],
+                                  'errors': {'student': ['Student appears more than once in this roll call.']}}
+            else:
+                entries[entry.validated_data['student']] = (index, entry.validated_data)
+
+        known = set(Student.objects.filter(pk__in=entries).values_list('pk', flat=True))
+        for student_id in list(entries):
+            if student_id not in known:
+                index, _ = entries.pop(student_id)
+                results[index] = {'student': student_id,
+                                  'errors': {'student': [f'Invalid pk "{student_id}" - object does not exist.']}}
+
+        # The id only: with token authentication request.user is not a User row
+        marked_by = request.user.pk if request.user.is_authenticated else None
+        objs = [
+            Attendance(
+                student_id=student_id,
+                class_name=class_obj,
+                date=date,
+                status=data['status'],
+                check_in_time=data.get('check_in_time'),
+                check_out_time=data.get('check_out_time'),
+                notes=data.get('notes'),
+                marked_by_id=marked_by,
+            )
+            for student_id, (_, data) in entries.items()
+        ]
+        with transaction.atomic():
+            # Previous statuses, for the result and to adjust the rollups
+            existing = dict(
+                Attendance.objects.select_for_update()
+                .filter(class_name=class_obj, date=date, student__in=entries)
+                .values_list('student_id', 'status')
+            )
+            Attendance.objects.bulk_create(
+                objs,
+                update_conflicts=True,
+                unique_fields=['student', 'class_name', 'date'],
+                update_fields=['status', 'check_in_time', 'check_out_time', 'notes', 'marked_by', 'updated_at'],
+            )
+            # bulk_create sends no signals
+            record_changes(
+                removed=[(student_id, class_obj.pk, date, old_status) for student_id, old_status in existing.items()],
+                added=[rollup_key(obj) for obj in objs],
+            )
+
+        for obj in objs:
+            index, _ = entries[obj.student_id]
+            results[index] = {'student': obj.student_id, 'id': obj.pk,
+                              'result': 'updated' if obj.student_id in existing else 'created'}
+
+        return Response({
+            'class_name': class_obj.pk,
+            'date': date,
+            'created': sum(1 for r in results if r.get('result') == 'created'),
+            'updated': sum(1 for r in results if r.get('result') == 'updated'),
+            'failed': sum(1 for r in results if 'errors' in r),
+            'results': results,
+        }, status=status.HTTP_200_OK if objs else status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, renderer_classes=[CSVRenderer])
+    def export(self, request, format=None):
+        """Stream attendance as CSV (`/api/attendance/export.csv`) with the same filters and ordering as the list."""
+        rows = self.filter_queryset(self.get_queryset()).values_list(
+            'id', 'date', 'student__student_id', 'student__first_name', 'student__last_name',
+            'class_name__class_name', 'status', 'check_in_time', 'check_out_time', 'notes',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def export_rows():
+            for (pk, date, student_id, first_name, last_name, class_name,
+                    record_status, check_in_time, check_out_time, notes) in rows:
+                yield [pk, date.isoformat(), student_id, f'{first_name} {last_name}', class_name,
+                       record_status, check_in_time or '', check_out_time or '', notes or '']
+
+        return streaming_csv_response('attendance.csv', [
+            'id', 'date', 'student_id', 'student_name', 'class_name',
+            'status', 'check_in_time', 'check_out_time', 'notes',
+        ], export_rows())
+
+    @action(detail=False, url_path='stats/classes')
+    def class_stats(self, request):
+        """
+        Per-class status counts and present rate, read from the daily rollup.
+
+        Filters: `class_name`, `date`, `start_date`, `end_date`.
+        """
+        queryset = QueryParamFilterBackend().filter_with(request, ClassDailyAttendance.objects.all(), {
+            'class_name': 'class_name',
+            'date': 'date',
+            'start_date': 'date__gte',
+            'end_date': 'date__lte',
+        })
+        rows = queryset.values('class_name', 'class_name__class_name').annotate(
+            **{s: Sum(s) for s in STATUSES}
+        ).order_by('class_name__class_name', 'class_name')
+        return Response([stats_row(row, class_name=row.pop('class_name__class_name')) for row in rows])
+
+    @action(detail=False, url_path='stats/students')
+    def student_stats(self, request):
+        """
+        Per-student status counts, read from the monthly rollup.
+
+        Filters: `student`, `class_enrolled`, `start_month`, `end_month`. Months are
+        keyed on their first day, so pass e.g. `2025-03-01`.
+        """
+        queryset = QueryParamFilterBackend().filter_with(request, StudentMonthlyAttendance.objects.all(), {
+            'student': 'student',
+            'class_enrolled': 'student__class_enrolled',
+            'start_month': 'month__gte',
+            'end_month': 'month__lte',
+        })
+        rows = queryset.values('student', 'student__student_id', 'student__first_name', 'student__last_name').annotate(
+            **{s: Sum(s) for s in STATUSES}
+        ).order_by('student__last_name', 'student__first_name', 'student')
+        return Response([
+            stats_row(row, student_id=row.pop('student__student_id'),
+                      student_name=f"{row.pop('student__first_name')} {row.pop('student__last_name')}")
+            for row in rows
+        ])
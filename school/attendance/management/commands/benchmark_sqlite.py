@@ -0,0 +1,157 @@
+import os
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from attendance.models import Attendance
+from attendance.rollups import record_changes, rollup_key
+from classes.models import Class
+from students.models import Student
+
+PROFILES = settings.SQLITE_PROFILES
+
+
+class Command(BaseCommand):
+    help = ('Measure concurrent roll-call writes and attendance reads on a scratch SQLite '
+            'database, with Django\'s default SQLite setup and with the production profile.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--class-size', type=int, default=30)
+        parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                            help='Profile(s) to run (default: all)')
+
+    def handle(self, *args, **options):
+        for name in options['profile'] or PROFILES:
+            with scratch_database(PROFILES[name]):
+                classes = self.seed(options['writers'], options['class_size'])
+                results = self.run(classes, options)
+            self.report(name, results, options['seconds'])
+
+    def seed(self, writers, class_size):
+        classes = []
+        for n in range(writers):
+            class_obj = Class.objects.create(class_name=f'Bench {n}', grade_level='Grade 1', academic_year='2025-2026')
+            Student.objects.bulk_create(
+                Student(student_id=f'B{n}-{i}', first_name='Bench', last_name=f'{n}-{i}',
+                        email=f'bench{n}-{i}@example.com', class_enrolled=class_obj)
+                for i in range(class_size)
+            )
+            classes.append((class_obj, list(class_obj.students.values_list('pk', flat=True))))
+        return classes
+
+    def run(self, classes, options):
+        stop = threading.Event()
+        results = {'write': [], 'read': []}
+        lock = threading.Lock()
+
+        def worker(role, operation):
+            latencies, errors = [], 0
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        operation()
+                    except OperationalError:
+                        errors += 1  # "database is locked"
+                    else:
+                        latencies.append(time.perf_counter() - started)
+            finally:
+                connections.close_all()
+            with lock:
+                results[role].append((latencies, errors))
+
+        threads = [threading.Thread(target=worker, args=('write', self.roll_caller(class_obj, students)))
+                   for class_obj, students in classes]
+        threads += [threading.Thread(target=worker, args=('read', self.reader(classes)))
+                    for _ in range(options['readers'])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def roll_caller(self, class_obj, students):
+        """The bulk roll-call write path, one day after another for one class."""
+        days = iter(range(10 ** 6))
+        statuses = [status for status, _ in Attendance.STATUS_CHOICES]
+
+        def roll_call():
+            day = date(2025, 1, 1) + timedelta(days=next(days) % 200)
+            objs = [Attendance(student_id=pk, class_name=class_obj, date=day, status=statuses[(pk + day.day) % 4])
+                    for pk in students]
+            with transaction.atomic():
+                existing = dict(Attendance.objects.filter(class_name=class_obj, date=day)
+                                .values_list('student_id', 'status'))
+                Attendance.objects.bulk_create(
+                    objs, update_conflicts=True, unique_fields=['student', 'class_name', 'date'],
+                    update_fields=['status', 'updated_at'],
+                )
+                record_changes(
+                    removed=[(pk, class_obj.pk, day, status) for pk, status in existing.items()],
+                    added=[rollup_key(obj) for obj in objs],
+                )
+        return roll_call
+
+    def reader(self, classes):
+        """A class's attendance page, as the list endpoint reads it."""
+        turn = iter(range(10 ** 9))
+
+        def read():
+            class_obj, _ = classes[next(turn) % len(classes)]
+            list(Attendance.objects.select_related('student').filter(class_name=class_obj)
+                 .order_by('-date')[:50])
+        return read
+
+    def report(self, name, results, seconds):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{name} profile'))
+        for role in ('write', 'read'):
+            latencies = [value for worker, _ in results[role] for value in worker]
+            errors = sum(errors for _, errors in results[role])
+            if latencies:
+                quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+                timings = (f'p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms, '
+                           f'max {max(latencies) * 1000:.1f} ms')
+            else:
+                timings = 'no successful operations'
+            self.stdout.write(f'  {role}s: {len(latencies) / seconds:8.1f}/s  {errors} locked  ({timings})')
+
+
+@contextmanager
+def scratch_database(profile):
+    """Point the default alias at a fresh, migrated SQLite file set up as ``profile``."""
+    database = connections.settings['default']
+    saved = dict(database)
+    connections.close_all()
+    handle, path = tempfile.mkstemp(suffix='.sqlite3')
+    os.close(handle)
+    database.update(NAME=path, ENGINE=profile['ENGINE'], OPTIONS=dict(profile['OPTIONS']))
+    _forget_connection()  # Rebuild this thread's connection from the new settings
+    try:
+        call_command('migrate', verbosity=0)
+        yield
+    finally:
+        connections.close_all()
+        _forget_connection()
+        database.clear()
+        database.update(saved)
+        for suffix in ('', '-wal', '-shm', '-journal'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+
+def _forget_connection():
+    try:
+        del connections['default']
+    except AttributeError:
+        pass  # Not opened in this thread yet
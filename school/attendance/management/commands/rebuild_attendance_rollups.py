@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from attendance import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the attendance rollup tables from the raw records, then check them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify-only', action='store_true',
+                            help='Only compare the rollups with the raw records; change nothing')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not options['verify_only']:
+            rollups.rebuild(batch_size=options['batch_size'])
+            self.stdout.write('Rebuilt attendance rollups')
+
+        mismatches = rollups.verify()
+        for table, key, expected, actual in mismatches:
+            self.stderr.write(f'{table} {key}: expected {expected}, found {actual}')
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} rollup row(s) do not match the attendance records')
+        self.stdout.write(self.style.SUCCESS('Attendance rollups match the attendance records'))
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_attendance_attendance_class_date_idx_and_more'),
+        ('classes', '0001_initial'),
+        ('students', '0006_student_student_name_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassDailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('date', models.DateField()),
+                ('class_name', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='classes.class')),
+            ],
+            options={
+                'ordering': ['-date', 'class_name'],
+                'indexes': [models.Index(fields=['date'], name='class_daily_date_idx')],
+                'unique_together': {('class_name', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentMonthlyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_attendance', to='students.student')),
+            ],
+            options={
+                'ordering': ['-month', 'student'],
+                'indexes': [models.Index(fields=['month'], name='student_monthly_month_idx')],
+                'unique_together': {('student', 'month')},
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+from django.db.models import Case, Sum, When
+from django.db.models.functions import TruncMonth
+
+STATUSES = ['present', 'absent', 'late', 'excused']
+
+
+def populate(apps, schema_editor):
+    Attendance = apps.get_model('attendance', 'Attendance')
+    ClassDailyAttendance = apps.get_model('attendance', 'ClassDailyAttendance')
+    StudentMonthlyAttendance = apps.get_model('attendance', 'StudentMonthlyAttendance')
+    counts = {status: Sum(Case(When(status=status, then=1), default=0)) for status in STATUSES}
+
+    ClassDailyAttendance.objects.bulk_create(
+        (ClassDailyAttendance(class_name_id=row.pop('class_name'), **row)
+         for row in Attendance.objects.values('class_name', 'date').annotate(**counts).order_by().iterator()),
+        batch_size=1000,
+    )
+    StudentMonthlyAttendance.objects.bulk_create(
+        (StudentMonthlyAttendance(student_id=row.pop('student'), **row)
+         for row in Attendance.objects.annotate(month=TruncMonth('date'))
+         .values('student', 'month').annotate(**counts).order_by().iterator()),
+        batch_size=1000,
+    )
+
+
+def clear(apps, schema_editor):
+    apps.get_model('attendance', 'ClassDailyAttendance').objects.all().delete()
+    apps.get_model('attendance', 'StudentMonthlyAttendance').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0003_classdailyattendance_studentmonthlyattendance'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, clear),
+    ]
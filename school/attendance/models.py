@@ -25,6 +25,11 @@ class Attendance(models.Model):
     class Meta:
         ordering = ['-date', 'student__last_name', 'student__first_name']
         unique_together = ['student', 'class_name', 'date']
+        indexes = [
+            models.Index(fields=['class_name', 'date'], name='attendance_class_date_idx'),
+            models.Index(fields=['date', 'status'], name='attendance_date_status_idx'),
+            models.Index(fields=['student', 'date'], name='attendance_student_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.class_name} - {self.date} - {self.status}"
@@ -38,3 +43,48 @@ class Attendance(models.Model):
             duration = check_out - check_in
             return duration.total_seconds() / 3600  # Return hours
         return None
+
+
+class AttendanceRollup(models.Model):
+    """Attendance counts per status, kept in step with Attendance by attendance.rollups."""
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def total(self):
+        return sum(getattr(self, status) for status, _ in Attendance.STATUS_CHOICES)
+
+
+class ClassDailyAttendance(AttendanceRollup):
+    class_name = models.ForeignKey(Class, on_delete=models.CASCADE, related_name='daily_attendance')
+    date = models.DateField()
+
+    class Meta:
+        ordering = ['-date', 'class_name']
+        unique_together = ['class_name', 'date']
+        indexes = [
+            models.Index(fields=['date'], name='class_daily_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.class_name} - {self.date}"
+
+
+class StudentMonthlyAttendance(AttendanceRollup):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='monthly_attendance')
+    month = models.DateField(help_text='First day of the month')
+
+    class Meta:
+        ordering = ['-month', 'student']
+        unique_together = ['student', 'month']
+        indexes = [
+            models.Index(fields=['month'], name='student_monthly_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.month:%Y-%m}"
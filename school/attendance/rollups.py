@@ -0,0 +1,130 @@
+"""
+Per-class daily and per-student monthly attendance counts.
+
+The rollups follow Attendance through its model signals and through the
+bulk roll call, which calls record_changes() itself. ``QuerySet.update()``,
+``bulk_update()`` and raw SQL bypass both, so after changing attendance
+that way run ``manage.py rebuild_attendance_rollups`` (or its
+``--verify-only`` mode to check for drift first).
+"""
+from collections import Counter, defaultdict
+from django.db import transaction
+from django.db.models import Case, F, Q, Sum, Value, When
+from django.db.models.functions import Greatest, TruncMonth
+from .models import Attendance, ClassDailyAttendance, StudentMonthlyAttendance
+
+STATUSES = [status for status, _ in Attendance.STATUS_CHOICES]
+
+
+def rollup_key(record):
+    """(student_id, class_id, date, status) for an Attendance instance."""
+    # The date may still be the string it was assigned as, e.g. create(date='2025-03-01')
+    day = Attendance._meta.get_field('date').to_python(record.date)
+    return (record.student_id, record.class_name_id, day, record.status)
+
+
+def record_changes(removed=(), added=()):
+    """
+    Apply Attendance changes to the rollup tables.
+
+    ``removed`` and ``added`` are iterables of rollup_key() tuples. Changes
+    are netted per rollup row and written with one INSERT (for rows that do
+    not exist yet) and one UPDATE per table, so a whole roll call costs the
+    same as a single record. Counters are incremented in SQL, which keeps
+    concurrent writers from losing updates, and never go below zero: if the
+    tables have drifted (see the module docstring) a removal must not fail
+    the save that caused it.
+    """
+    class_deltas = defaultdict(Counter)
+    student_deltas = defaultdict(Counter)
+    for sign, keys in ((-1, removed), (1, added)):
+        for student_id, class_id, day, status in keys:
+            class_deltas[(class_id, day)][status] += sign
+            student_deltas[(student_id, day.replace(day=1))][status] += sign
+
+    with transaction.atomic():
+        _apply(ClassDailyAttendance, ('class_name_id', 'date'), class_deltas)
+        _apply(StudentMonthlyAttendance, ('student_id', 'month'), student_deltas)
+
+
+def _apply(model, key_fields, deltas):
+    deltas = {key: counts for key, counts in deltas.items() if any(counts.values())}
+    if not deltas:
+        return
+
+    new_rows = [model(**dict(zip(key_fields, key))) for key, counts in deltas.items()
+                if any(value > 0 for value in counts.values())]
+    if new_rows:
+        model.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+    conditions = {key: Q(**dict(zip(key_fields, key))) for key in deltas}
+    changes = {}
+    for status in STATUSES:
+        whens = [When(conditions[key], then=Value(counts[status]))
+                 for key, counts in deltas.items() if counts[status]]
+        if whens:
+            changes[status] = Greatest(F(status) + Case(*whens, default=Value(0)), Value(0))
+    match = Q()
+    for condition in conditions.values():
+        match |= condition
+    model.objects.filter(match).update(**changes)
+
+
+def _class_daily_counts(queryset):
+    return queryset.values('class_name', 'date').annotate(
+        **{status: Sum(Case(When(status=status, then=1), default=0)) for status in STATUSES}
+    ).order_by()
+
+
+def _student_monthly_counts(queryset):
+    return queryset.annotate(month=TruncMonth('date')).values('student', 'month').annotate(
+        **{status: Sum(Case(When(status=status, then=1), default=0)) for status in STATUSES}
+    ).order_by()
+
+
+def rebuild(batch_size=1000):
+    """Recompute both rollup tables from the raw Attendance table."""
+    records = Attendance.objects.all()
+    with transaction.atomic():
+        ClassDailyAttendance.objects.all().delete()
+        StudentMonthlyAttendance.objects.all().delete()
+        ClassDailyAttendance.objects.bulk_create(
+            (ClassDailyAttendance(class_name_id=row.pop('class_name'), **row)
+             for row in _class_daily_counts(records).iterator()),
+            batch_size=batch_size,
+        )
+        StudentMonthlyAttendance.objects.bulk_create(
+            (StudentMonthlyAttendance(student_id=row.pop('student'), **row)
+             for row in _student_monthly_counts(records).iterator()),
+            batch_size=batch_size,
+        )
+
+
+def verify():
+    """
+    Compare the rollup tables with counts from the raw table.
+
+    Returns a list of ``(table, key, expected, actual)`` mismatches, where the
+    counts are dicts of status -> count (empty when a row is missing).
+    """
+    mismatches = []
+    records = Attendance.objects.all()
+    checks = [
+        (ClassDailyAttendance, ('class_name', 'date'), _class_daily_counts(records)),
+        (StudentMonthlyAttendance, ('student', 'month'), _student_monthly_counts(records)),
+    ]
+    for model, key_fields, expected_rows in checks:
+        expected = {
+            tuple(row[field] for field in key_fields): {status: row[status] for status in STATUSES}
+            for row in expected_rows.iterator()
+        }
+        actual = {
+            tuple(row[field] for field in key_fields): {status: row[status] for status in STATUSES}
+            for row in model.objects.values(*key_fields, *STATUSES).iterator()
+        }
+        empty = dict.fromkeys(STATUSES, 0)
+        for key in expected.keys() | actual.keys():
+            # A rollup row left at all zeros is equivalent to no row
+            if expected.get(key, empty) != actual.get(key, empty):
+                mismatches.append((model._meta.db_table, key, expected.get(key, {}), actual.get(key, {})))
+    return mismatches
@@ -1,7 +1,10 @@
 from rest_framework import serializers
+from classes.models import Class
+from school.caching import CachedPrimaryKeyRelatedField
+from school.fieldsets import SparseFieldsetSerializerMixin
 from .models import Attendance
 
-class AttendanceSerializer(serializers.ModelSerializer):
+class AttendanceSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     student_name = serializers.CharField(source='student.full_name', read_only=True)
     class_display = serializers.CharField(source='class_name.class_name', read_only=True)
     duration = serializers.ReadOnlyField()
@@ -11,4 +14,25 @@ class AttendanceSerializer(serializers.ModelSerializer):
         fields = ['id', 'student', 'student_name', 'class_name', 'class_display',
                   'date', 'status', 'check_in_time', 'check_out_time', 'duration',
                   'notes', 'marked_by', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'duration', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'duration', 'created_at', 'updated_at']
+        expandable = {
+            'student': 'students.serializers.StudentSerializer',
+            'class_name': 'classes.serializers.ClassSerializer',
+        }
+        sparse_sources = {
+            'duration': ['date', 'check_in_time', 'check_out_time'],
+            'student_name': ['student__first_name', 'student__last_name'],
+        }
+
+class RollCallEntrySerializer(serializers.Serializer):
+    # Plain ids; students are checked for the whole roll call in one query
+    student = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=Attendance.STATUS_CHOICES)
+    check_in_time = serializers.TimeField(required=False, allow_null=True)
+    check_out_time = serializers.TimeField(required=False, allow_null=True)
+    notes = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+class RollCallSerializer(serializers.Serializer):
+    class_name = CachedPrimaryKeyRelatedField('class-names', queryset=Class.objects.all())
+    date = serializers.DateField()
+    records = serializers.ListField(child=serializers.DictField(), allow_empty=False)
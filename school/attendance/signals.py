@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from .models import Attendance
+from .rollups import record_changes, rollup_key
+
+KEY_FIELDS = ('student_id', 'class_name_id', 'date', 'status')
+
+
+@receiver(post_init, sender=Attendance)
+def remember_rollup_key(sender, instance, **kwargs):
+    # Read __dict__ directly so deferred fields are not loaded one query at a time
+    if all(field in instance.__dict__ for field in KEY_FIELDS):
+        instance._rollup_key = rollup_key(instance)
+    else:
+        instance._rollup_key = None
+
+
+@receiver(pre_save, sender=Attendance)
+def load_rollup_key(sender, instance, raw, **kwargs):
+    if raw or instance._state.adding or instance._rollup_key is not None:
+        return
+    instance._rollup_key = (
+        Attendance.objects.filter(pk=instance.pk).values_list(*KEY_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Attendance)
+def update_rollups_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return  # Fixtures: run rebuild_attendance_rollups afterwards
+    old = None if created else instance._rollup_key
+    new = rollup_key(instance)
+    if old != new:
+        record_changes(removed=[old] if old else [], added=[new])
+    instance._rollup_key = new
+
+
+@receiver(post_delete, sender=Attendance)
+def update_rollups_on_delete(sender, instance, **kwargs):
+    record_changes(removed=[instance._rollup_key or rollup_key(instance)])
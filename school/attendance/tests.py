@@ -1,3 +1,208 @@
+import os
+import tempfile
+from io import StringIO
+from datetime import date
+from django.conf import settings
+from django.db import connection
+from django.db.utils import load_backend
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.core.management import call_command
+from attendance.models import Attendance, ClassDailyAttendance, StudentMonthlyAttendance
+from attendance.rollups import verify
+from school.testing import (
+    IndexUsageMixin, QueryBudgetMixin, make_attendance, make_class, make_student, make_teacher,
+)
 
-# Create your tests here.
+
+class AttendanceAPIQueryTests(QueryBudgetMixin, TestCase):
+    def test_list_does_not_query_per_row(self):
+        self.assertQueriesConstant('/api/attendance/', make_attendance, budget=2)  # ETag validators, then the page
+
+    def test_detail_loads_related_names_eagerly(self):
+        record = make_attendance()
+        queries, _ = self.count_queries(f'/api/attendance/{record.pk}/')
+        self.assertEqual(queries, 2)  # ETag validators, then the record
+
+
+class AttendanceFilterTests(TestCase):
+    def test_filters_by_date_range_and_status(self):
+        make_attendance(date=date(2025, 3, 1), status='present')
+        late = make_attendance(date=date(2025, 3, 2), status='late')
+        make_attendance(date=date(2025, 3, 5), status='late')
+        response = self.client.get('/api/attendance/', {
+            'start_date': '2025-03-01', 'end_date': '2025-03-02', 'status': 'late',
+        })
+        self.assertEqual([row['id'] for row in response.json()['results']], [late.pk])
+
+    def test_invalid_values_are_rejected(self):
+        response = self.client.get('/api/attendance/', {'date': 'yesterday', 'status': 'asleep'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'date', 'status'})
+
+
+class AttendanceIndexTests(IndexUsageMixin, TestCase):
+    def test_class_roll_call_uses_class_date_index(self):
+        self.assertUsesIndex(
+            Attendance.objects.filter(class_name=1, date__gte=date(2025, 3, 1)),
+            'attendance_class_date_idx',
+        )
+
+    def test_daily_status_uses_date_status_index(self):
+        self.assertUsesIndex(
+            Attendance.objects.filter(date=date(2025, 3, 1), status='present'),
+            'attendance_date_status_idx',
+        )
+
+    def test_student_history_uses_student_date_index(self):
+        self.assertUsesIndex(
+            Attendance.objects.filter(student=1, date__gte=date(2025, 3, 1)),
+            'attendance_student_date_idx',
+        )
+
+
+class AttendanceBulkTests(TestCase):
+    def setUp(self):
+        self.client.force_login(make_teacher())
+        self.class_obj = make_class()
+        self.students = [make_student(class_enrolled=self.class_obj) for _ in range(5)]
+
+    def post_roll_call(self, records):
+        return self.client.post('/api/attendance/bulk/', {
+            'class_name': self.class_obj.pk,
+            'date': '2025-03-01',
+            'records': records,
+        }, content_type='application/json')
+
+    def test_marks_class_in_one_round_trip(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_roll_call([{'student': s.pk, 'status': 'present'} for s in self.students])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 5)
+        self.assertEqual(Attendance.objects.filter(class_name=self.class_obj).count(), 5)
+        # session, user and their student profile (the role check), class (and
+        # the class-name map on a cold cache), students, existing rows, insert,
+        # an insert and update per rollup table, plus savepoint/transaction
+        # statements
+        self.assertLessEqual(len(context.captured_queries), 16)
+
+    def test_only_teachers_take_the_roll(self):
+        self.client.logout()
+        self.assertEqual(self.post_roll_call([]).status_code, 401)
+        self.client.force_login(make_student(user=make_teacher(is_staff=False)).user)
+        self.assertEqual(self.post_roll_call([]).status_code, 403)
+
+    def test_retry_updates_instead_of_violating_unique_together(self):
+        self.post_roll_call([{'student': s.pk, 'status': 'present'} for s in self.students])
+        response = self.post_roll_call([{'student': self.students[0].pk, 'status': 'late'}])
+        self.assertEqual(response.json()['results'][0]['result'], 'updated')
+        self.assertEqual(Attendance.objects.get(student=self.students[0]).status, 'late')
+        self.assertEqual(Attendance.objects.count(), 5)
+
+    def test_reports_invalid_rows_and_saves_the_rest(self):
+        response = self.post_roll_call([
+            {'student': self.students[0].pk, 'status': 'present'},
+            {'student': 999999, 'status': 'present'},
+            {'student': self.students[1].pk, 'status': 'asleep'},
+            {'student': self.students[0].pk, 'status': 'absent'},
+        ])
+        body = response.json()
+        self.assertEqual((body['created'], body['failed']), (1, 3))
+        self.assertEqual(body['results'][0]['id'], Attendance.objects.get().pk)
+        self.assertEqual([sorted(r.get('errors', {})) for r in body['results']],
+                         [[], ['student'], ['status'], ['student']])
+
+
+class AttendanceExportTests(TestCase):
+    def test_streams_filtered_rows_as_csv(self):
+        record = make_attendance(date=date(2025, 3, 1), status='absent')
+        make_attendance(date=date(2025, 3, 2), status='absent')
+        response = self.client.get('/api/attendance/export.csv', {'date': '2025-03-01'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1].split(',')[:2], [str(record.pk), '2025-03-01'])
+
+    def test_rejects_invalid_filters(self):
+        response = self.client.get('/api/attendance/export.csv', {'date': 'soon'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceRollupTests(TestCase):
+    def setUp(self):
+        self.client.force_login(make_teacher())
+        self.class_obj = make_class()
+        self.student = make_student(class_enrolled=self.class_obj)
+
+    def daily(self):
+        return ClassDailyAttendance.objects.values('present', 'absent', 'late', 'excused').get(
+            class_name=self.class_obj, date=date(2025, 3, 1))
+
+    def test_save_update_and_delete_keep_rollups_in_step(self):
+        record = make_attendance(student=self.student, class_name=self.class_obj, date=date(2025, 3, 1))
+        make_attendance(class_name=self.class_obj, date=date(2025, 3, 1), status='late')
+        self.assertEqual(self.daily(), {'present': 1, 'absent': 0, 'late': 1, 'excused': 0})
+
+        record.status = 'absent'
+        record.save()
+        self.assertEqual(self.daily(), {'present': 0, 'absent': 1, 'late': 1, 'excused': 0})
+        self.assertEqual(StudentMonthlyAttendance.objects.get(student=self.student).absent, 1)
+
+        record.delete()
+        self.assertEqual(self.daily(), {'present': 0, 'absent': 0, 'late': 1, 'excused': 0})
+        self.assertEqual(verify(), [])
+
+    def test_dates_given_as_strings_are_rolled_up(self):
+        Attendance.objects.create(student=self.student, class_name=self.class_obj, date='2025-03-01', status='present')
+        self.assertEqual(self.daily()['present'], 1)
+        self.assertEqual(verify(), [])
+
+    def test_drift_from_queryset_updates_does_not_break_saves(self):
+        make_attendance(student=self.student, class_name=self.class_obj, date=date(2025, 3, 1))
+        Attendance.objects.update(status='absent')  # Bypasses the signals
+        Attendance.objects.get().delete()
+        self.assertEqual(self.daily(), {'present': 1, 'absent': 0, 'late': 0, 'excused': 0})
+        call_command('rebuild_attendance_rollups', stdout=StringIO())
+        self.assertEqual(verify(), [])
+
+    def test_bulk_roll_call_updates_rollups(self):
+        url = '/api/attendance/bulk/'
+        body = {'class_name': self.class_obj.pk, 'date': '2025-03-01',
+                'records': [{'student': self.student.pk, 'status': 'present'}]}
+        self.client.post(url, body, content_type='application/json')
+        body['records'][0]['status'] = 'excused'
+        self.client.post(url, body, content_type='application/json')
+        self.assertEqual(self.daily(), {'present': 0, 'absent': 0, 'late': 0, 'excused': 1})
+        self.assertEqual(verify(), [])
+
+    def test_rebuild_repairs_drift(self):
+        make_attendance(student=self.student, class_name=self.class_obj, date=date(2025, 3, 1))
+        ClassDailyAttendance.objects.update(present=7)
+        self.assertEqual(len(verify()), 1)
+        call_command('rebuild_attendance_rollups', stdout=StringIO())
+        self.assertEqual(verify(), [])
+
+    def test_class_stats_read_from_rollup(self):
+        make_attendance(student=self.student, class_name=self.class_obj, date=date(2025, 3, 1))
+        make_attendance(class_name=self.class_obj, date=date(2025, 3, 2), status='absent')
+        response = self.client.get('/api/attendance/stats/classes/', {'start_date': '2025-03-01'})
+        row, = response.json()
+        self.assertEqual((row['class_name'], row['total'], row['present_rate']),
+                         (self.class_obj.class_name, 2, 50.0))
+
+
+class SQLiteProfileTests(TestCase):
+    def test_production_profile_sets_pragmas(self):
+        profile = settings.SQLITE_PROFILES['production']
+        with tempfile.TemporaryDirectory() as directory:
+            database = {**connection.settings_dict, **profile, 'NAME': os.path.join(directory, 'db.sqlite3')}
+            production = load_backend(profile['ENGINE']).DatabaseWrapper(database, alias='production')
+            try:
+                with production.cursor() as cursor:
+                    self.assertEqual(cursor.execute('PRAGMA journal_mode').fetchone()[0], 'wal')
+                    self.assertEqual(cursor.execute('PRAGMA busy_timeout').fetchone()[0], 5000)
+                    self.assertEqual(cursor.execute('PRAGMA synchronous').fetchone()[0], 1)  # NORMAL
+                self.assertEqual(production.transaction_mode, 'IMMEDIATE')
+            finally:
+                production.close()
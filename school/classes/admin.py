@@ -7,6 +7,7 @@ class ClassAdmin(admin.ModelAdmin):
     list_filter = ['grade_level', 'academic_year', 'class_teacher']
     search_fields = ['class_name', 'grade_level']
     ordering = ['grade_level', 'section', 'class_name']
+    list_select_related = ['class_teacher']
     fieldsets = (
         ('Basic Information', {
             'fields': ('class_name', 'grade_level', 'section', 'academic_year')
@@ -19,3 +20,10 @@ class ClassAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_enrollment()
+
+    @admin.display(description='Current enrollment', ordering='enrollment_count')
+    def current_enrollment(self, obj):
+        return obj.current_enrollment
@@ -1,17 +1,38 @@
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Sum
+from django.views.decorators.http import require_safe
+from attendance.api_views import stats_row
+from attendance.models import ClassDailyAttendance
+from attendance.rollups import STATUSES
+from grades.api_views import summary_row
+from grades.models import Grade
+from school.async_views import gather_queries, json_response
+from school.replicas import replica_reads
+from school.caching import CachedListMixin
+from school.conditional import ConditionalGetMixin
+from school.fieldsets import SparseFieldsetMixin
+from students.authentication import API_AUTHENTICATION_CLASSES
+from students.models import Student
 from .models import Class
 from .serializers import ClassSerializer
 
-class ClassViewSet(viewsets.ModelViewSet):
-    queryset = Class.objects.all()
+class ClassViewSet(ConditionalGetMixin, CachedListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    """
+    Classes with their enrollment counts. The list is served from the
+    reference cache until a class, an enrollment or a teacher changes.
+    """
+    queryset = Class.objects.with_enrollment()
     serializer_class = ClassSerializer
+    authentication_classes = API_AUTHENTICATION_CLASSES  # Users from token claims, no query
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    reference_collection = 'classes'
+    etag_dependencies = [Student]  # Enrollment counts
 
-    def get_queryset(self):
-        # Ensure we return a queryset, not a list
-        return Class.objects.all()
+    def get_etag_queryset(self):
+        # No enrollment annotation needed for count and max(updated_at)
+        return self.filter_queryset(Class.objects.all())
 
     def create(self, request, *args, **kwargs):
         print("API Create called with data:", request.data)
@@ -28,4 +49,40 @@ class ClassViewSet(viewsets.ModelViewSet):
 
     def update(self, request, *args, **kwargs):
         print("API Update called with data:", request.data)
-        return super().update(request, *args, **kwargs)
\ No newline at end of file
+        return super().update(request, *args, **kwargs)
+
+
+def _class_profile(pk):
+    class_obj = Class.objects.with_enrollment().filter(pk=pk).first()
+    return ClassSerializer(class_obj).data if class_obj else None
+
+
+@replica_reads
+@require_safe
+async def class_report(request, pk):
+    """
+    A class's report: profile, grade averages overall, per subject and per
+    student (best first), and attendance totals. The five queries run
+    concurrently.
+    """
+    grades = Grade.objects.filter(class_id=pk)
+    results = await gather_queries(
+        class_obj=lambda: _class_profile(pk),
+        overall=lambda: grades.summary()[0],
+        subjects=lambda: list(grades.summary(['subject'])),
+        students=lambda: list(grades.summary(['student'])),
+        attendance=lambda: ClassDailyAttendance.objects.filter(class_name=pk).aggregate(
+            **{status: Sum(status, default=0) for status in STATUSES}
+        ),
+    )
+    if results['class_obj'] is None:
+        return json_response({'detail': 'No Class matches the given query.'}, status=404)
+    students = [summary_row(row) for row in results['students']]
+    students.sort(key=lambda row: row['weighted_percentage'] or 0, reverse=True)
+    return json_response({
+        'class': results['class_obj'],
+        'grades': summary_row(results['overall']),
+        'subjects': [summary_row(row) for row in results['subjects']],
+        'students': students,
+        'attendance': stats_row(results['attendance']),
+    })
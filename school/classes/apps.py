@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class ClassesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'classes'
+
+    def ready(self):
+        from django.conf import settings
+        from school import autocomplete
+        from school.caching import invalidate_on_change
+        from school.conditional import track_changes
+        invalidate_on_change('classes.Class', 'classes', 'class-names')
+        # Enrollment counts in the class list
+        invalidate_on_change('students.Student', 'classes')
+        # Teacher choices; deleting a teacher also clears class_teacher in SQL
+        invalidate_on_change(settings.AUTH_USER_MODEL, 'classes', 'users', ignore_fields=['last_login'])
+        track_changes('classes.Class')  # Names on grades and attendance
+        autocomplete.register('classes', 'classes.Class', ['class_name', 'section', 'grade_level'])
@@ -1,6 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+class ClassQuerySet(models.QuerySet):
+    def with_enrollment(self):
+        # One grouped COUNT instead of a query per class
+        return self.annotate(enrollment_count=models.Count('students'))
+
+
 class Class(models.Model):
     class_name = models.CharField(max_length=100)
     grade_level = models.CharField(max_length=20)  # e.g., 'Grade 1', 'Grade 2', etc.
@@ -13,6 +19,8 @@ class Class(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ClassQuerySet.as_manager()
+
     class Meta:
         ordering = ['grade_level', 'section', 'class_name']
         unique_together = ['class_name', 'section', 'academic_year']
@@ -24,7 +32,10 @@ class Class(models.Model):
 
     @property
     def current_enrollment(self):
-        return self.student_set.count()
+        # Use the with_enrollment() annotation when the queryset provided one
+        if hasattr(self, 'enrollment_count'):
+            return self.enrollment_count
+        return self.students.count()
 
     @property
     def available_seats(self):
@@ -1,21 +1,20 @@
+from django.contrib.auth.models import User
 from rest_framework import serializers
+from school.caching import CachedPrimaryKeyRelatedField
+from school.fieldsets import SparseFieldsetSerializerMixin
 from .models import Class
 
-class ClassSerializer(serializers.ModelSerializer):
+class ClassSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     current_enrollment = serializers.ReadOnlyField()
     available_seats = serializers.ReadOnlyField()
-    class_teacher = serializers.PrimaryKeyRelatedField(
-        queryset=Class.objects.none(),  # Will be set in __init__ to avoid circular import
+    class_teacher = CachedPrimaryKeyRelatedField(
+        'users',
+        label_for=lambda user: user.get_full_name() or user.username,
+        queryset=User.objects.all(),
         allow_null=True,
         required=False
     )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Import here to avoid circular import
-        from django.contrib.auth.models import User
-        self.fields['class_teacher'].queryset = User.objects.all()
-
     def validate_class_name(self, value):
         if not value or not value.strip():
             raise serializers.ValidationError("Class name is required.")
@@ -41,4 +40,13 @@ class ClassSerializer(serializers.ModelSerializer):
         fields = ['id', 'class_name', 'grade_level', 'section', 'academic_year',
                  'class_teacher', 'room_number', 'capacity', 'description',
                  'current_enrollment', 'available_seats', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'current_enrollment', 'available_seats', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'current_enrollment', 'available_seats', 'created_at', 'updated_at']
+        sparse_sources = {
+            'current_enrollment': [],  # with_enrollment() annotation
+            'available_seats': ['capacity'],
+        }
+
+    @classmethod
+    def get_expand_queryset(cls):
+        # Expanded classes need their enrollment counts too
+        return Class.objects.with_enrollment()
\ No newline at end of file
@@ -1,3 +1,71 @@
 from django.test import TestCase
+from classes.models import Class
+from django.contrib.auth.models import User
+from school.testing import QueryBudgetMixin, ReferenceCacheMixin, make_attendance, make_class, make_grade, make_student
+
+
+class ClassEnrollmentTests(ReferenceCacheMixin, QueryBudgetMixin, TestCase):
+    def make_enrolled_class(self):
+        class_obj = make_class(capacity=30)
+        make_student(class_enrolled=class_obj)
+        make_student(class_enrolled=class_obj)
+        return class_obj
+
+    def test_list_does_not_count_per_row(self):
+        self.assertQueriesConstant('/api/classes/', self.make_enrolled_class, budget=2)  # ETag validators, then the page
+
+    def test_list_reports_enrollment(self):
+        self.make_enrolled_class()
+        row = self.client.get('/api/classes/').json()['results'][0]
+        self.assertEqual(row['current_enrollment'], 2)
+        self.assertEqual(row['available_seats'], 28)
+
+    def test_properties_fall_back_without_annotation(self):
+        class_obj = Class.objects.get(pk=self.make_enrolled_class().pk)
+        self.assertEqual(class_obj.current_enrollment, 2)
+        self.assertEqual(class_obj.available_seats, 28)
+
+
+class ClassCacheTests(ReferenceCacheMixin, QueryBudgetMixin, TestCase):
+    def test_enrollment_change_invalidates_the_list(self):
+        class_obj = make_class()
+        self.client.get('/api/classes/')
+        make_student(class_enrolled=class_obj)
+        row = self.client.get('/api/classes/').json()['results'][0]
+        self.assertEqual(row['current_enrollment'], 1)
+
+    def test_login_does_not_invalidate_the_list(self):
+        user = User.objects.create_user('teacher', password='secret')
+        make_class(class_teacher=user)
+        self.client.get('/api/classes/')
+        self.client.login(username='teacher', password='secret')
+        self.assertEqual(self.count_queries('/api/classes/')[0], 3)  # Session, user and ETag validators
+
+    def test_teacher_choices_reject_unknown_users_without_a_query(self):
+        from classes.serializers import ClassSerializer
+        user = User.objects.create_user('teacher')
+        data = {'class_name': 'Art', 'grade_level': 'Grade 1', 'academic_year': '2025-2026', 'section': 'A'}
+        self.assertTrue(ClassSerializer(data={**data, 'class_teacher': user.pk}).is_valid())
+        serializer = ClassSerializer(data={**data, 'class_teacher': user.pk + 1})
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('class_teacher', serializer.errors)
+
+
+class ClassReportTests(ReferenceCacheMixin, TestCase):
+    def test_report_ranks_students_and_totals_attendance(self):
+        class_obj = make_class(section='A')
+        weaker, stronger = make_student(class_enrolled=class_obj), make_student(class_enrolled=class_obj)
+        make_grade(student=weaker, class_id=class_obj, grade_value=55)
+        make_grade(student=stronger, class_id=class_obj, grade_value=95)
+        make_grade(grade_value=10)  # Another class
+        make_attendance(student=weaker, class_name=class_obj, status='absent')
+
+        data = self.client.get(f'/api/classes/{class_obj.pk}/report/').json()
+        self.assertEqual(data['class']['current_enrollment'], 2)
+        self.assertEqual(data['grades']['count'], 2)
+        self.assertEqual([row['student'] for row in data['students']], [stronger.pk, weaker.pk])
+        self.assertEqual((data['attendance']['absent'], data['attendance']['total']), (1, 1))
+
+    def test_unknown_class_is_404(self):
+        self.assertEqual(self.client.get('/api/classes/999/report/').status_code, 404)
 
-# Create your tests here.
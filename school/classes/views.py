@@ -5,12 +5,12 @@ from .models import Class
 from .forms import ClassForm
 
 def class_list(request):
-    classes = Class.objects.all()
+    classes = Class.objects.with_enrollment()
     return render(request, 'classes/class_list.html', {'classes': classes})
 
 @login_required
 def class_detail(request, pk):
-    class_obj = get_object_or_404(Class, pk=pk)
+    class_obj = get_object_or_404(Class.objects.with_enrollment(), pk=pk)
     return render(request, 'classes/class_detail.html', {'class_obj': class_obj})
 
 @login_required
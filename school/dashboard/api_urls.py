@@ -0,0 +1,7 @@
+from django.urls import path
+from .api_views import cache_stats, dashboard_summary
+
+urlpatterns = [
+    path('summary/', dashboard_summary, name='dashboard_summary'),
+    path('cache/', cache_stats, name='dashboard_cache_stats'),
+]
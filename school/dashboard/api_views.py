@@ -0,0 +1,123 @@
+from datetime import timedelta
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.views.decorators.http import require_safe
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from school import caching
+from school.async_views import gather_queries, json_response
+from school.replicas import replica_reads
+from students.models import Student
+from classes.models import Class
+from subjects.models import Subject
+from grades.models import Grade
+from attendance.models import ClassDailyAttendance
+from attendance.rollups import STATUSES
+
+ATTENDANCE_WINDOW_DAYS = 7
+
+# Same buckets the dashboard pie chart has always used (raw grade_value)
+GRADE_BUCKETS = [
+    ('A (90-100)', Q(grade_value__gte=90)),
+    ('B (80-89)', Q(grade_value__gte=80, grade_value__lt=90)),
+    ('C (70-79)', Q(grade_value__gte=70, grade_value__lt=80)),
+    ('D (60-69)', Q(grade_value__gte=60, grade_value__lt=70)),
+    ('F (0-59)', Q(grade_value__lt=60)),
+]
+
+
+def attendance_breakdown(start, end):
+    """Per-day status counts between start and end (inclusive), one row per day."""
+    # Summed from the per-class daily rollup rather than the raw records
+    rows = (
+        ClassDailyAttendance.objects.filter(date__range=(start, end))
+        .values('date')
+        .annotate(**{status: Sum(status) for status in STATUSES})
+        .order_by('date')
+    )
+    by_date = {row['date']: row for row in rows}
+
+    # Fill in days without any records so the payload is always the same size
+    breakdown = []
+    day = start
+    while day <= end:
+        row = by_date.get(day, {})
+        entry = {'date': day}
+        for status in STATUSES:
+            entry[status] = row.get(status, 0)
+        breakdown.append(entry)
+        day += timedelta(days=1)
+    return breakdown
+
+
+def grade_distribution():
+    counts = Grade.objects.aggregate(**{
+        f'bucket_{index}': Count('id', filter=condition)
+        for index, (_, condition) in enumerate(GRADE_BUCKETS)
+    })
+    return [
+        {'name': name, 'value': counts[f'bucket_{index}']}
+        for index, (name, _) in enumerate(GRADE_BUCKETS)
+    ]
+
+
+def dashboard_queries(today):
+    """The summary's independent queries, by name; none depends on another."""
+    return {
+        'students': Student.objects.count,
+        'classes': Class.objects.count,
+        'subjects': Subject.objects.count,
+        'grades': Grade.objects.count,
+        # Rollup totals equal the raw row count: each record adds one to one status
+        'attendance': lambda: ClassDailyAttendance.objects.aggregate(
+            total=Coalesce(Sum(F('present') + F('absent') + F('late') + F('excused')), 0),
+            present_today=Coalesce(Sum('present', filter=Q(date=today)), 0),
+        ),
+        'attendance_last_7_days': lambda: attendance_breakdown(
+            today - timedelta(days=ATTENDANCE_WINDOW_DAYS - 1), today
+        ),
+        'grade_distribution': grade_distribution,
+    }
+
+
+def build_dashboard_summary(today, results):
+    return {
+        'date': today,
+        'counts': {
+            'students': results['students'],
+            'classes': results['classes'],
+            'subjects': results['subjects'],
+            'grades': results['grades'],
+            'attendance': results['attendance']['total'],
+        },
+        'present_today': results['attendance']['present_today'],
+        'attendance_last_7_days': results['attendance_last_7_days'],
+        'grade_distribution': results['grade_distribution'],
+    }
+
+
+def get_dashboard_summary(today=None):
+    today = today or timezone.localdate()
+    return build_dashboard_summary(today, {name: query() for name, query in dashboard_queries(today).items()})
+
+
+async def aget_dashboard_summary(today=None):
+    """get_dashboard_summary() with its queries run concurrently."""
+    today = today or timezone.localdate()
+    return build_dashboard_summary(today, await gather_queries(**dashboard_queries(today)))
+
+
+@replica_reads
+@require_safe
+async def dashboard_summary(request):
+    # Async: under ASGI the seven queries overlap instead of queueing
+    return json_response(await aget_dashboard_summary())
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])  # Allow unauthenticated access for development
+def cache_stats(request):
+    """Reference cache hit and miss counts for this process."""
+    return Response(caching.stats())
@@ -0,0 +1,23 @@
+import sqlite3
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from school.replicas import REPLICA
+
+
+class Command(BaseCommand):
+    help = ('Copy the default SQLite database to the replica alias, for trying read/write '
+            'splitting locally with two SQLite files. Rerun it to bring the replica up to date.')
+
+    def handle(self, *args, **options):
+        source = connections['default'].settings_dict
+        target = connections[REPLICA].settings_dict
+        if 'sqlite3' not in source['ENGINE'] or 'sqlite3' not in target['ENGINE']:
+            raise CommandError('sync_replica only copies SQLite files; replicate other databases with their own tools.')
+        # The backup API takes a consistent snapshot while the primary stays writable
+        primary, replica = sqlite3.connect(source['NAME']), sqlite3.connect(target['NAME'])
+        try:
+            primary.backup(replica)
+        finally:
+            primary.close()
+            replica.close()
+        self.stdout.write(self.style.SUCCESS(f"Copied {source['NAME']} to {target['NAME']}"))
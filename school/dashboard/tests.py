@@ -0,0 +1,37 @@
+import threading
+from datetime import date
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase
+from dashboard.api_views import aget_dashboard_summary, get_dashboard_summary
+from school.async_views import gather_queries
+from school.testing import make_attendance, make_grade
+
+
+class DashboardSummaryTests(TestCase):
+    def test_summary_counts_and_charts(self):
+        make_grade(grade_value=95)
+        make_attendance(date=date(2025, 3, 10), status='present')
+        data = self.client.get('/api/dashboard/summary/').json()
+        self.assertEqual(data['counts']['grades'], 1)
+        self.assertEqual(data['counts']['students'], 2)
+        self.assertEqual(data['counts']['attendance'], 1)
+        self.assertEqual(len(data['attendance_last_7_days']), 7)
+        self.assertEqual(data['grade_distribution'][0], {'name': 'A (90-100)', 'value': 1})
+
+    def test_inside_a_transaction_queries_run_on_the_callers_connection(self):
+        make_grade()  # Uncommitted, so only this connection can see it
+        threads = async_to_sync(gather_queries)(thread=lambda: threading.current_thread().name)
+        self.assertEqual(threads['thread'], threading.current_thread().name)
+        self.assertEqual(async_to_sync(aget_dashboard_summary)()['counts']['grades'], 1)
+
+
+class ConcurrentQueryTests(TransactionTestCase):
+    def test_queries_run_on_worker_threads_with_the_same_results(self):
+        make_grade(grade_value=95)
+        make_attendance(date=date(2025, 3, 10), status='late')
+        today = date(2025, 3, 12)
+        threads = async_to_sync(gather_queries)(**{
+            str(n): lambda: threading.current_thread().name for n in range(3)
+        })
+        self.assertTrue(all(name.startswith('async-query') for name in threads.values()))
+        self.assertEqual(async_to_sync(aget_dashboard_summary)(today), get_dashboard_summary(today))
@@ -1,8 +1,176 @@
-from rest_framework import viewsets, permissions
-from .models import Grade
-from .serializers import GradeSerializer
+from django.http import StreamingHttpResponse
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from classes.models import Class
+from jobs.api_views import accepted
+from jobs.models import Job
+from school.conditional import ConditionalGetMixin
+from school.fieldsets import SparseFieldsetMixin
+from school.exports import CSVRenderer, streaming_csv_response
+from school.filters import QueryParamFilterBackend
+from students.authentication import API_AUTHENTICATION_CLASSES
+from students.models import Student
+from students.permissions import IsTeacher
+from subjects.models import Subject
+from . import report_cards
+from .models import Grade, GradeQuerySet, letter_for_percentage
+from .serializers import GradeSerializer, ReportCardRequestSerializer
 
-class GradeViewSet(viewsets.ModelViewSet):
-    queryset = Grade.objects.all()
+EXPORT_CHUNK_SIZE = 2000
+
+
+def summary_row(row):
+    """A GradeQuerySet.summary() row as the API returns it."""
+    data = {}
+    grade_types = {}
+    letters = {}
+    for key, value in row.items():
+        if key.startswith('type_'):
+            grade_types[key[len('type_'):]] = value
+        elif key.startswith('letter_'):
+            letters[key[len('letter_'):]] = value
+        elif key.endswith('_percentage'):
+            data[key] = round(value, 2) if value is not None else None
+        elif key not in ('total_points', 'total_max_points'):
+            data[key] = value
+    total_points = row['total_points'] or 0
+    total_max_points = row['total_max_points'] or 0
+    data['weighted_percentage'] = round(total_points * 100 / total_max_points, 2) if total_max_points else None
+    data['grade_types'] = grade_types
+    data['letter_grades'] = letters
+    return data
+
+
+class GradeViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    """
+    Grades, most recently graded first.
+
+    Filters (each served by an index on Grade):
+    - `student`: student id, optionally with `subject` (student, subject)
+    - `class_id`: class id, optionally with `subject` and a date range (class_id, subject, graded_at)
+    - `subject`: subject id (foreign key index)
+    - `start_date`, `end_date`: inclusive graded_at range (-graded_at, title)
+    - `grade_type`: assignment, quiz, exam, midterm or final; narrows one of the filters above
+
+    Order with `?ordering=` on graded_at, title, grade_value or grade_type.
+    `?fields=` trims each grade; `?expand=` takes student, subject and class_id.
+    """
+    # GradeSerializer reads student, subject and class names for every row
+    queryset = Grade.objects.select_related('student', 'subject', 'class_id')
+    etag_dependencies = [Student, Subject, Class]  # Names shown on each grade
     serializer_class = GradeSerializer
-    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
\ No newline at end of file
+    authentication_classes = API_AUTHENTICATION_CLASSES  # Users from token claims, no query
+    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    filter_backends = [QueryParamFilterBackend, OrderingFilter]
+    replica_actions = ['export', 'summary', 'report_card_archive']
+    filter_params = {
+        'student': 'student',
+        'subject': 'subject',
+        'class_id': 'class_id',
+        'grade_type': 'grade_type',
+        'start_date': 'graded_at__gte',
+        'end_date': 'graded_at__lte',
+    }
+    ordering_fields = ['graded_at', 'title', 'grade_value', 'grade_type']
+
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser],
+            permission_classes=[IsTeacher])
+    def import_csv(self, request):
+        """
+        Queue an import of the CSV gradebook uploaded as `file` (see
+        GradebookImporter for columns) and answer 202 with the job; poll
+        `/api/jobs/{id}/`, whose `result` is `{created, failed, errors}`.
+
+        `mode=partial` saves valid rows and reports the rest, committing
+        batch by batch; the default `atomic` saves nothing unless every row is
+        valid, and on SQLite holds off all other writes until it finishes.
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['No file was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+        # Not retried: a partial import that failed midway has saved some rows
+        job = Job.objects.enqueue('grades.import', {'atomic': request.data.get('mode', 'atomic') != 'partial'},
+                                  max_attempts=1, input_file=upload, created_by=request.user)
+        return accepted(job, request)
+
+    @action(detail=False, renderer_classes=[CSVRenderer])
+    def export(self, request, format=None):
+        """Stream grades as CSV (`/api/grades/export.csv`) with the same filters and ordering as the list."""
+        rows = self.filter_queryset(self.get_queryset()).values_list(
+            'id', 'student__student_id', 'student__first_name', 'student__last_name',
+            'subject__subject_code', 'subject__subject_name', 'class_id__class_name',
+            'grade_type', 'title', 'grade_value', 'max_grade', 'graded_at',
+        ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+        def export_rows():
+            for (pk, student_id, first_name, last_name, subject_code, subject_name,
+                    class_name, grade_type, title, grade_value, max_grade, graded_at) in rows:
+                percentage = (grade_value / max_grade) * 100 if max_grade > 0 else 0
+                yield [pk, student_id, f'{first_name} {last_name}', subject_code, subject_name,
+                       class_name, grade_type, title, grade_value, max_grade,
+                       round(percentage, 2), letter_for_percentage(percentage), graded_at.isoformat()]
+
+        return streaming_csv_response('grades.csv', [
+            'id', 'student_id', 'student_name', 'subject_code', 'subject_name', 'class_name',
+            'grade_type', 'title', 'grade_value', 'max_grade', 'percentage', 'letter_grade', 'graded_at',
+        ], export_rows())
+
+    @action(detail=False)
+    def summary(self, request):
+        """
+        Gradebook aggregates computed in the database, e.g. `?group_by=student,subject`.
+
+        `group_by` takes any of student, subject, class and grade_type (none
+        summarises everything) and accepts the same filters as the list.
+        """
+        group_by = [group for group in request.query_params.get('group_by', '').split(',') if group]
+        unknown = [group for group in group_by if group not in GradeQuerySet.SUMMARY_GROUPS]
+        if unknown:
+            return Response(
+                {'group_by': [f"Unknown group(s): {', '.join(unknown)}. Choose from {', '.join(GradeQuerySet.SUMMARY_GROUPS)}."]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        queryset = QueryParamFilterBackend().filter_queryset(request, Grade.objects.all(), self)
+        return Response([summary_row(row) for row in queryset.summary(group_by)])
+
+    @action(detail=False, url_path='report-cards', permission_classes=[IsTeacher])
+    def report_card_archive(self, request):
+        """
+        A ZIP of report cards, one file per student, streamed as they render.
+
+        Choose the students with `class_id` or `grade_level`; `start_date` and
+        `end_date` bound the term. `output` is html (default) or pdf.
+
+        Cards render one at a time in this process, so concurrent downloads
+        cannot multiply render processes; POST builds large runs in a job.
+        """
+        params = ReportCardRequestSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        options = params.validated_data
+        class_obj = options.get('class_id')
+        cards = report_cards.collect(
+            report_cards.select_students(class_obj.pk if class_obj else None, options.get('grade_level')),
+            options.get('start_date'), options.get('end_date'),
+        )
+        archive = report_cards.iter_zip(cards, format=options['output'], workers=1)
+        response = StreamingHttpResponse(archive, content_type='application/zip')
+        response['Content-Disposition'] = 'attachment; filename="report-cards.zip"'
+        return response
+
+    @report_card_archive.mapping.post
+    def queue_report_card_archive(self, request):
+        """
+        The same archive built by a background job, for runs too long to wait
+        on: answers 202 with the job, whose `download_url` serves the ZIP.
+        Takes the GET parameters in the body.
+        """
+        params = ReportCardRequestSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        payload = dict(params.validated_data)
+        if payload.get('class_id'):
+            payload['class_id'] = payload['class_id'].pk
+        job = Job.objects.enqueue('grades.report_cards', payload, created_by=request.user)
+        return accepted(job, request)
@@ -0,0 +1,219 @@
+import csv
+from datetime import datetime, time
+from itertools import islice
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from classes.models import Class
+from students.models import Student
+from subjects.models import Subject
+from .models import Grade
+
+REQUIRED_COLUMNS = ['student_id', 'subject_code', 'grade_value', 'grade_type', 'title', 'graded_at']
+
+
+class ImportAborted(Exception):
+    """Raised inside the atomic block to roll back an all-or-nothing import."""
+
+
+class GradebookImporter:
+    """
+    Import grades from CSV rows in batches.
+
+    Columns: student_id (Student.student_id), subject_code, class_id (Class pk)
+    or class_name with optional section and academic_year, grade_value,
+    max_grade (optional), grade_type, title, description (optional) and
+    graded_at (ISO date or datetime).
+
+    Each batch resolves its students, subjects, classes and already-stored
+    grades with one query apiece and is written with ``bulk_create``. With
+    ``atomic=True`` nothing is saved if any row fails; otherwise valid rows
+    are saved and the failures reported.
+
+    An atomic import is a single transaction. SQLite allows one writer at a
+    time, so for the whole import every other write (roll calls, the job
+    worker's heartbeat) waits, and gives up with "database is locked" after
+    the database timeout. Large gradebooks are better imported with
+    ``atomic=False``, which commits batch by batch.
+    """
+
+    def __init__(self, atomic=True, batch_size=1000, graded_by=None, progress=None):
+        self.atomic = atomic
+        self.batch_size = batch_size
+        self.graded_by = graded_by
+        self.progress = progress
+        self.created = 0
+        self.errors = []
+        self._seen = set()
+        self._graded_at = {}  # Gradebooks reuse a handful of dates
+        self._fields = {name: Grade._meta.get_field(name)
+                        for name in ('grade_value', 'max_grade', 'grade_type', 'title', 'description')}
+
+    @property
+    def result(self):
+        return {'created': self.created, 'failed': len(self.errors), 'errors': self.errors}
+
+    def import_file(self, text_file):
+        reader = csv.DictReader(text_file)
+        try:
+            missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+            if 'class_id' not in (reader.fieldnames or []) and 'class_name' not in (reader.fieldnames or []):
+                missing.append('class_id or class_name')
+            if missing:
+                self.errors.append({'row': 1, 'errors': {'columns': [f"Missing column(s): {', '.join(missing)}"]}})
+                return self.result
+            # Row 1 is the header
+            return self.import_rows(enumerate(reader, start=2))
+        except UnicodeDecodeError:
+            # Raised while reading, possibly midway: an atomic import has rolled back
+            if self.atomic:
+                self.created = 0
+            self.errors.append({'row': None, 'errors': {'file': ['The file is not UTF-8 text. Save it as CSV (UTF-8) and try again.']}})
+            return self.result
+
+    def import_rows(self, numbered_rows):
+        if not self.atomic:
+            self._import_batches(numbered_rows)
+            return self.result
+        try:
+            with transaction.atomic():
+                self._import_batches(numbered_rows)
+                if self.errors:
+                    raise ImportAborted
+        except ImportAborted:
+            self.created = 0
+        return self.result
+
+    def _import_batches(self, numbered_rows):
+        iterator = iter(numbered_rows)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                break
+            grades = self._build_batch(batch)
+            if grades and not (self.atomic and self.errors):
+                with transaction.atomic():
+                    Grade.objects.bulk_create(grades)
+                self.created += len(grades)
+            if self.progress:
+                self.progress(self.created, len(self.errors))
+
+    def _build_batch(self, batch):
+        students = dict(Student.objects.filter(
+            student_id__in={(row.get('student_id') or '').strip() for _, row in batch}
+        ).values_list('student_id', 'pk'))
+        subjects = dict(Subject.objects.filter(
+            subject_code__in={(row.get('subject_code') or '').strip() for _, row in batch}
+        ).values_list('subject_code', 'pk'))
+        classes = self._load_classes(batch)
+
+        candidates = []
+        for number, row in batch:
+            errors = {}
+            values = self._clean_row(row, errors)
+            student = students.get((row.get('student_id') or '').strip())
+            if student is None:
+                errors['student_id'] = [f"No student with student_id \"{row.get('student_id') or ''}\"."]
+            subject = subjects.get((row.get('subject_code') or '').strip())
+            if subject is None:
+                errors['subject_code'] = [f"No subject with subject_code \"{row.get('subject_code') or ''}\"."]
+            class_pk = self._resolve_class(row, classes, errors)
+            if errors:
+                self.errors.append({'row': number, 'errors': errors})
+                continue
+            candidates.append((number, Grade(student_id=student, subject_id=subject, class_id_id=class_pk,
+                                             graded_by=self.graded_by, **values)))
+
+        # One query for rows that already exist, then drop in-file duplicates
+        existing = set()
+        if candidates:
+            existing = set(Grade.objects.filter(
+                student__in={g.student_id for _, g in candidates},
+                subject__in={g.subject_id for _, g in candidates},
+                class_id__in={g.class_id_id for _, g in candidates},
+                title__in={g.title for _, g in candidates},
+                graded_at__in={g.graded_at for _, g in candidates},
+            ).values_list('student_id', 'subject_id', 'class_id_id', 'title', 'graded_at'))
+        grades = []
+        for number, grade in candidates:
+            key = (grade.student_id, grade.subject_id, grade.class_id_id, grade.title, grade.graded_at)
+            if key in existing or key in self._seen:
+                self.errors.append({'row': number, 'errors': {
+                    'title': ['A grade with this student, subject, class, title and graded_at already exists.']}})
+                continue
+            self._seen.add(key)
+            grades.append(grade)
+        return grades
+
+    def _load_classes(self, batch):
+        pks = set()
+        names = set()
+        for _, row in batch:
+            if (row.get('class_id') or '').strip():
+                pks.add(row['class_id'].strip())
+            elif (row.get('class_name') or '').strip():
+                names.add(row['class_name'].strip())
+        valid_pks = {pk for pk in pks if pk.isdigit()}
+        classes = {'pk': {str(pk) for pk in Class.objects.filter(pk__in=valid_pks).values_list('pk', flat=True)},
+                   'name': {}}
+        for pk, name, section, year in Class.objects.filter(class_name__in=names).values_list(
+                'pk', 'class_name', 'section', 'academic_year'):
+            classes['name'].setdefault(name, []).append((pk, section or '', year))
+        return classes
+
+    def _resolve_class(self, row, classes, errors):
+        class_id = (row.get('class_id') or '').strip()
+        if class_id:
+            if class_id not in classes['pk']:
+                errors['class_id'] = [f'No class with id "{class_id}".']
+                return None
+            return int(class_id)
+        name = (row.get('class_name') or '').strip()
+        section = (row.get('section') or '').strip()
+        year = (row.get('academic_year') or '').strip()
+        matches = [pk for pk, class_section, class_year in classes['name'].get(name, [])
+                   if (not section or class_section == section) and (not year or class_year == year)]
+        if len(matches) == 1:
+            return matches[0]
+        if not matches:
+            errors['class_name'] = [f'No class named "{name}".']
+        else:
+            errors['class_name'] = [f'"{name}" matches {len(matches)} classes; add section or academic_year.']
+        return None
+
+    def _clean_row(self, row, errors):
+        values = {}
+        for name, field in self._fields.items():
+            raw = (row.get(name) or '').strip()
+            if not raw and name == 'max_grade':
+                continue
+            if not raw and name == 'description':
+                values[name] = None
+                continue
+            try:
+                values[name] = field.clean(raw, None)
+            except ValidationError as e:
+                errors[name] = e.messages
+        raw = (row.get('graded_at') or '').strip()
+        try:
+            if raw not in self._graded_at:
+                self._graded_at[raw] = self._parse_graded_at(raw)
+            values['graded_at'] = self._graded_at[raw]
+        except ValueError as e:
+            errors['graded_at'] = [str(e)]
+        return values
+
+    def _parse_graded_at(self, raw):
+        try:
+            value = parse_datetime(raw)
+        except ValueError:
+            value = None
+        if value is None:
+            day = parse_date(raw) if raw else None
+            if day is None:
+                raise ValueError('Enter a valid date or date/time.')
+            value = datetime.combine(day, time.min)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
@@ -0,0 +1,44 @@
+import time
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from grades import report_cards
+
+
+class Command(BaseCommand):
+    help = ('Generate report cards for a class or a grade level into a directory, '
+            'or into a ZIP file when OUTPUT ends in .zip.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Directory, or a .zip file, to write')
+        parser.add_argument('--class', dest='class_id', type=int, help='Class id')
+        parser.add_argument('--grade-level', help="Every class at this level, e.g. 'Grade 5'")
+        parser.add_argument('--start-date', type=date.fromisoformat, help='First day of the term (YYYY-MM-DD)')
+        parser.add_argument('--end-date', type=date.fromisoformat, help='Last day of the term (YYYY-MM-DD)')
+        parser.add_argument('--format', choices=report_cards.FORMATS, default='html')
+        parser.add_argument('--workers', type=int, help='Rendering processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            report_cards.check_format(options['format'])
+            students = report_cards.select_students(options['class_id'], options['grade_level'])
+        except report_cards.ReportCardError as e:
+            raise CommandError(str(e))
+        cards = report_cards.collect(students, options['start_date'], options['end_date'])
+        if not cards:
+            raise CommandError('No students match')
+        self.stdout.write(f'Collected {len(cards)} report card(s) in {time.perf_counter() - started:.1f}s')
+
+        def progress(done, total):
+            self.stdout.write(f'  {done}/{total} rendered', ending='\r')
+            self.stdout.flush()
+
+        render_options = {'format': options['format'], 'workers': options['workers'], 'progress': progress}
+        if options['output'].endswith('.zip'):
+            report_cards.write_zip(cards, options['output'], **render_options)
+        else:
+            report_cards.write_directory(cards, options['output'], **render_options)
+        self.stdout.write('')
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {len(cards)} report card(s) to {options['output']} in {time.perf_counter() - started:.1f}s"
+        ))
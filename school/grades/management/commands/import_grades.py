@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from grades.importers import GradebookImporter
+
+
+class Command(BaseCommand):
+    help = 'Import grades from a CSV file in batches (see GradebookImporter for the columns).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--partial', action='store_true',
+                            help='Save valid rows even if some rows fail, committing batch by batch '
+                                 '(default: all or nothing, blocking other writers until done)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--graded-by', help='Username recorded as graded_by')
+
+    def handle(self, *args, **options):
+        graded_by = None
+        if options['graded_by']:
+            try:
+                graded_by = User.objects.get(username=options['graded_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['graded_by']!r}")
+
+        def progress(created, failed):
+            self.stdout.write(f'  {created} imported, {failed} failed', ending='\r')
+            self.stdout.flush()
+
+        importer = GradebookImporter(
+            atomic=not options['partial'],
+            batch_size=options['batch_size'],
+            graded_by=graded_by,
+            progress=progress,
+        )
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                result = importer.import_file(f)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write('')
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if result['errors'] and not result['created']:
+            raise CommandError(f"Nothing imported: {result['failed']} row(s) failed")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} grade(s); {result['failed']} row(s) failed"
+        ))
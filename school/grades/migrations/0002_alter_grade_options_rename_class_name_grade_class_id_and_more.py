@@ -1,5 +1,6 @@
 # Generated by Django 5.2.7 on 2025-10-17 08:49
 
+import django.utils.timezone
 from django.db import migrations, models
 
 
@@ -22,16 +23,16 @@ class Migration(migrations.Migration):
             old_name='class_name',
             new_name='class_id',
         ),
-        migrations.AlterUniqueTogether(
-            name='grade',
-            unique_together={('student', 'subject', 'class_id', 'title', 'graded_at')},
-        ),
         migrations.AddField(
             model_name='grade',
             name='graded_at',
-            field=models.DateTimeField(default=1),
+            field=models.DateTimeField(default=django.utils.timezone.now),
             preserve_default=False,
         ),
+        migrations.AlterUniqueTogether(
+            name='grade',
+            unique_together={('student', 'subject', 'class_id', 'title', 'graded_at')},
+        ),
         migrations.AlterField(
             model_name='grade',
             name='grade_type',
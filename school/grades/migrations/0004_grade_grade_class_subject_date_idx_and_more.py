@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0001_initial'),
+        ('grades', '0003_auto_20251018_1438'),
+        ('students', '0004_student_class_enrolled'),
+        ('subjects', '0002_remove_subject_created_at_remove_subject_credits_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['class_id', 'subject', 'graded_at'], name='grade_class_subject_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grade',
+            index=models.Index(fields=['-graded_at', 'title'], name='grade_recent_idx'),
+        ),
+    ]
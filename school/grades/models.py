@@ -1,9 +1,101 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Concat
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
 from django.contrib.auth.models import User
 from students.models import Student
 from classes.models import Class
 from subjects.models import Subject
 
+# Lowest percentage for each letter, highest first; anything below is an F
+LETTER_GRADE_THRESHOLDS = [
+    (95, 'A'),
+    (80, 'B'),
+    (70, 'C'),
+    (60, 'D'),
+]
+
+
+def letter_for_percentage(percentage):
+    for minimum, letter in LETTER_GRADE_THRESHOLDS:
+        if percentage >= minimum:
+            return letter
+    return 'F'
+
+
+class GradeQuerySet(models.QuerySet):
+    # Output column -> expression for each summary grouping
+    SUMMARY_GROUPS = {
+        'student': {
+            'student': F('student'),
+            'student_code': F('student__student_id'),
+            'student_name': Concat('student__first_name', Value(' '), 'student__last_name'),
+        },
+        'subject': {
+            'subject': F('subject'),
+            'subject_code': F('subject__subject_code'),
+            'subject_name': F('subject__subject_name'),
+        },
+        'class': {
+            'class_id': F('class_id'),
+            'class_name': F('class_id__class_name'),
+        },
+        'grade_type': {
+            'grade_type': F('grade_type'),
+        },
+    }
+
+    def percentage_expression(self):
+        # Same rule as Grade.percentage, in floating point so SQLite doesn't truncate
+        return models.Case(
+            models.When(
+                max_grade__gt=0,
+                then=Cast('grade_value', models.FloatField()) * 100.0 / Cast('max_grade', models.FloatField()),
+            ),
+            default=Value(0.0),
+            output_field=models.FloatField(),
+        )
+
+    def summary(self, group_by=()):
+        """
+        Gradebook statistics per group in one GROUP BY query.
+
+        ``group_by`` holds keys of SUMMARY_GROUPS; an empty tuple summarises
+        the whole queryset in a single row. Each row has the group's columns
+        plus count, average/min/max percentage, total points for a weighted
+        percentage, a count per grade_type and a count per letter grade using
+        LETTER_GRADE_THRESHOLDS.
+        """
+        columns = {name: expression for group in group_by for name, expression in self.SUMMARY_GROUPS[group].items()}
+        percentage = self.percentage_expression()
+        aggregates = {
+            'count': models.Count('id'),
+            'average_percentage': models.Avg(percentage),
+            'min_percentage': models.Min(percentage),
+            'max_percentage': models.Max(percentage),
+            'total_points': models.Sum(Cast('grade_value', models.FloatField())),
+            'total_max_points': models.Sum(Cast('max_grade', models.FloatField())),
+        }
+        for grade_type, _ in Grade.GRADE_TYPE_CHOICES:
+            aggregates[f'type_{grade_type}'] = models.Count('id', filter=models.Q(grade_type=grade_type))
+        upper = None
+        for minimum, letter in LETTER_GRADE_THRESHOLDS + [(None, 'F')]:
+            bounds = []
+            if minimum is not None:
+                bounds.append(GreaterThanOrEqual(percentage, minimum))
+            if upper is not None:
+                bounds.append(LessThan(percentage, upper))
+            aggregates[f'letter_{letter}'] = models.Count('id', filter=models.Q(*bounds))
+            upper = minimum
+
+        if not columns:
+            return [self.aggregate(**aggregates)]
+        # Columns named after a model field are grouped on directly
+        fields = [name for name, expression in columns.items() if isinstance(expression, F) and expression.name == name]
+        renamed = {name: expression for name, expression in columns.items() if name not in fields}
+        return self.values(*fields, **renamed).annotate(**aggregates).order_by(*columns)
+
+
 class Grade(models.Model):
     GRADE_TYPE_CHOICES = [
         ('assignment', 'Assignment'),
@@ -26,9 +118,15 @@ class Grade(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = GradeQuerySet.as_manager()
+
     class Meta:
         ordering = ['-graded_at', 'title']
         unique_together = ['student', 'subject', 'class_id', 'title', 'graded_at']
+        indexes = [
+            models.Index(fields=['class_id', 'subject', 'graded_at'], name='grade_class_subject_date_idx'),
+            models.Index(fields=['-graded_at', 'title'], name='grade_recent_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.subject} - {self.title} - {self.grade_value}/{self.max_grade}"
@@ -41,14 +139,4 @@ class Grade(models.Model):
 
     @property
     def letter_grade(self):
-        percentage = self.percentage
-        if percentage >= 95:
-            return 'A'
-        elif percentage >= 80:
-            return 'B'
-        elif percentage >= 70:
-            return 'C'
-        elif percentage >= 60:
-            return 'D'
-        else:
-            return 'F'
+        return letter_for_percentage(self.percentage)
@@ -0,0 +1,233 @@
+"""
+Report cards for a class or a whole grade level.
+
+collect() fetches everything with three queries, whatever the number of
+students, and groups it into one plain dict per student. render() turns a
+card into HTML (or PDF when WeasyPrint is installed) and runs in worker
+processes: cards are picklable and rendering never touches the database.
+write_directory() and write_zip() drive the pool and report progress.
+"""
+import io
+import multiprocessing
+import os
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+import django
+from django.db.models import Count
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.text import slugify
+from attendance.models import Attendance
+from attendance.rollups import STATUSES
+from students.models import Student
+from .models import Grade, letter_for_percentage
+
+FORMATS = ('html', 'pdf')
+# Cards handed to a worker at a time; large enough to amortise pickling
+CHUNK_SIZE = 16
+
+
+class ReportCardError(Exception):
+    pass
+
+
+def select_students(class_id=None, grade_level=None):
+    """Students of one class or of every class at ``grade_level``."""
+    if class_id is None and grade_level is None:
+        raise ReportCardError('Choose a class or a grade level.')
+    students = Student.objects.select_related('class_enrolled')
+    if class_id is not None:
+        students = students.filter(class_enrolled=class_id)
+    if grade_level is not None:
+        students = students.filter(class_enrolled__grade_level=grade_level)
+    return students.order_by('class_enrolled__class_name', 'last_name', 'first_name', 'pk')
+
+
+def _percentage(points, max_points):
+    return float(points * 100 / max_points) if max_points else 0.0
+
+
+def collect(students, start_date=None, end_date=None):
+    """One report card dict per student in ``students``, for the term between the dates (inclusive)."""
+    students = list(students)
+    ids = [student.pk for student in students]
+
+    grades = Grade.objects.filter(student__in=ids).order_by('subject__subject_name', 'graded_at', 'title')
+    attendance = Attendance.objects.filter(student__in=ids)
+    if start_date:
+        grades = grades.filter(graded_at__date__gte=start_date)
+        attendance = attendance.filter(date__gte=start_date)
+    if end_date:
+        grades = grades.filter(graded_at__date__lte=end_date)
+        attendance = attendance.filter(date__lte=end_date)
+
+    grades_by_student = defaultdict(lambda: defaultdict(list))
+    for row in grades.values('student', 'subject__subject_code', 'subject__subject_name',
+                             'title', 'grade_type', 'grade_value', 'max_grade', 'graded_at').iterator():
+        grades_by_student[row['student']][(row['subject__subject_name'], row['subject__subject_code'])].append(row)
+
+    attendance_by_student = defaultdict(dict)
+    for row in attendance.order_by().values('student', 'status').annotate(count=Count('id')):
+        attendance_by_student[row['student']][row['status']] = row['count']
+
+    generated = timezone.localdate()
+    return [
+        _card(student, grades_by_student[student.pk], attendance_by_student[student.pk],
+              start_date, end_date, generated)
+        for student in students
+    ]
+
+
+def _card(student, subjects, attendance, start_date, end_date, generated):
+    subject_rows = []
+    total_points = total_max = Decimal(0)
+    for (name, code), rows in subjects.items():
+        points = sum(row['grade_value'] for row in rows)
+        max_points = sum(row['max_grade'] for row in rows)
+        total_points += points
+        total_max += max_points
+        percentage = _percentage(points, max_points)
+        subject_rows.append({
+            'name': name,
+            'code': code,
+            'percentage': round(percentage, 1),
+            'letter': letter_for_percentage(percentage),
+            'grades': [{
+                'title': row['title'],
+                'grade_type': row['grade_type'],
+                'score': f"{row['grade_value']:g}/{row['max_grade']:g}",
+                'date': row['graded_at'].date(),
+            } for row in rows],
+        })
+    overall = _percentage(total_points, total_max) if total_max else None
+    attendance = {status: attendance.get(status, 0) for status in STATUSES}
+    days = sum(attendance.values())
+    class_obj = student.class_enrolled
+    return {
+        'student': {
+            'pk': student.pk,
+            'student_id': student.student_id,
+            'name': student.full_name,
+        },
+        'class_name': str(class_obj) if class_obj else '',
+        'folder': slugify(str(class_obj)) if class_obj else 'unassigned',
+        'start_date': start_date,
+        'end_date': end_date,
+        'generated': generated,
+        'subjects': subject_rows,
+        'overall': round(overall, 1) if overall is not None else None,
+        'overall_letter': letter_for_percentage(overall) if overall is not None else None,
+        'attendance': attendance,
+        'attendance_days': days,
+        'present_rate': round(attendance['present'] * 100 / days, 1) if days else None,
+    }
+
+
+def filename(card, format):
+    student = card['student']
+    return f"{card['folder']}/{slugify(student['student_id'])}-{slugify(student['name'])}.{format}"
+
+
+def render(card, format='html'):
+    """``(filename, bytes)`` for one card."""
+    html = render_to_string('grades/report_card.html', {'card': card})
+    if format == 'pdf':
+        from weasyprint import HTML
+        return filename(card, format), HTML(string=html).write_pdf()
+    return filename(card, format), html.encode()
+
+
+def _render_html(card):
+    return render(card, 'html')
+
+
+def _render_pdf(card):
+    return render(card, 'pdf')
+
+
+def check_format(format):
+    if format not in FORMATS:
+        raise ReportCardError(f"Unknown format {format!r}. Choose from {', '.join(FORMATS)}.")
+    if format == 'pdf':
+        try:
+            import weasyprint  # noqa: F401
+        except ImportError:
+            raise ReportCardError('PDF output needs WeasyPrint (pip install weasyprint); use html instead.')
+
+
+def render_all(cards, format='html', workers=None, progress=None):
+    """
+    Yield ``(filename, bytes)`` for each card, in order, rendered across
+    ``workers`` processes (default: one per CPU; 1 renders in this process).
+    ``progress(done, total)`` is called after every CHUNK_SIZE cards and
+    at the end.
+    """
+    check_format(format)
+    worker = _render_pdf if format == 'pdf' else _render_html
+    workers = workers or os.cpu_count() or 1
+    total = len(cards)
+    if workers == 1 or total <= CHUNK_SIZE:
+        results = map(worker, cards)
+        pool = None
+    else:
+        # Spawned rather than forked: the caller may be a threaded server or job
+        # worker, and a fork copies locks other threads hold at that moment
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup,
+                                   mp_context=multiprocessing.get_context('spawn'))
+        results = pool.map(worker, cards, chunksize=CHUNK_SIZE)
+    try:
+        for done, result in enumerate(results, 1):
+            yield result
+            if progress and (done % CHUNK_SIZE == 0 or done == total):
+                progress(done, total)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def write_directory(cards, path, **options):
+    """Write each card under ``path``, one folder per class; return the number written."""
+    count = 0
+    for name, content in render_all(cards, **options):
+        target = os.path.join(path, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(content)
+        count += 1
+    return count
+
+
+class _Drain(io.RawIOBase):
+    """Write-only stream whose contents are taken out as they are written."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def take(self):
+        data, self.chunks = b''.join(self.chunks), []
+        return data
+
+
+def iter_zip(cards, **options):
+    """Yield a ZIP archive of the cards in pieces, without holding it in memory."""
+    stream = _Drain()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in render_all(cards, **options):
+            archive.writestr(name, content)
+            yield stream.take()
+    yield stream.take()
+
+
+def write_zip(cards, path, **options):
+    with open(path, 'wb') as f:
+        for chunk in iter_zip(cards, **options):
+            f.write(chunk)
@@ -1,7 +1,11 @@
 from rest_framework import serializers
+from classes.models import Class
+from school.caching import CachedPrimaryKeyRelatedField
+from school.fieldsets import SparseFieldsetSerializerMixin
 from .models import Grade
+from .report_cards import FORMATS, ReportCardError, check_format
 
-class GradeSerializer(serializers.ModelSerializer):
+class GradeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     percentage = serializers.ReadOnlyField()
     letter_grade = serializers.ReadOnlyField()
     student_name = serializers.CharField(source='student.full_name', read_only=True)
@@ -14,4 +18,33 @@ class GradeSerializer(serializers.ModelSerializer):
                   'class_id', 'class_name', 'grade_value', 'max_grade',
                   'grade_type', 'title', 'description', 'percentage',
                   'letter_grade', 'graded_by', 'graded_at', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'percentage', 'letter_grade', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'percentage', 'letter_grade', 'created_at', 'updated_at']
+        expandable = {
+            'student': 'students.serializers.StudentSerializer',
+            'subject': 'subjects.serializers.SubjectSerializer',
+            'class_id': 'classes.serializers.ClassSerializer',
+        }
+        sparse_sources = {
+            'percentage': ['grade_value', 'max_grade'],
+            'letter_grade': ['grade_value', 'max_grade'],
+            'student_name': ['student__first_name', 'student__last_name'],
+        }
+
+
+class ReportCardRequestSerializer(serializers.Serializer):
+    class_id = CachedPrimaryKeyRelatedField('class-names', queryset=Class.objects.all(), required=False)
+    grade_level = serializers.CharField(required=False)
+    start_date = serializers.DateField(required=False)
+    end_date = serializers.DateField(required=False)
+    output = serializers.ChoiceField(choices=FORMATS, default='html')
+
+    def validate(self, data):
+        if 'class_id' not in data and 'grade_level' not in data:
+            raise serializers.ValidationError('Choose a class_id or a grade_level.')
+        if data.get('start_date') and data.get('end_date') and data['start_date'] > data['end_date']:
+            raise serializers.ValidationError({'end_date': ['The term cannot end before it starts.']})
+        try:
+            check_format(data['output'])
+        except ReportCardError as e:
+            raise serializers.ValidationError({'output': [str(e)]})
+        return data
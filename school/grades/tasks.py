@@ -0,0 +1,52 @@
+import io
+import tempfile
+from django.conf import settings
+from django.core.files import File
+from django.utils.dateparse import parse_date
+from jobs.registry import JobError, task
+from . import report_cards
+from .importers import GradebookImporter
+
+
+@task('grades.import')
+def import_gradebook(job):
+    """
+    Import the job's CSV file; the result is GradebookImporter's. The job
+    fails, keeping that result, if no row was imported. Atomic imports write
+    their progress in the import's transaction, so it shows once they finish.
+    """
+    with job.input_file.open('rb') as f:
+        total = max(sum(1 for _ in f) - 1, 0)  # Data lines, less the header
+        f.seek(0)
+        importer = GradebookImporter(
+            atomic=job.payload.get('atomic', True),
+            graded_by=job.created_by,
+            progress=lambda created, failed: job.report_progress(created + failed, total),
+        )
+        result = importer.import_file(io.TextIOWrapper(f, encoding='utf-8-sig', newline=''))
+    if result['errors'] and not result['created']:
+        raise JobError('No grades were imported; see the errors in the result.', result=result)
+    return result
+
+
+@task('grades.report_cards')
+def generate_report_cards(job):
+    """A ZIP of report cards as the job's output; payload as for ReportCardRequestSerializer."""
+    options = job.payload
+    try:
+        students = report_cards.select_students(options.get('class_id'), options.get('grade_level'))
+    except report_cards.ReportCardError as e:
+        raise JobError(str(e))
+    start_date, end_date = options.get('start_date'), options.get('end_date')
+    cards = report_cards.collect(students, start_date and parse_date(start_date), end_date and parse_date(end_date))
+    if not cards:
+        raise JobError('No students match.')
+    job.report_progress(0, len(cards))
+    with tempfile.TemporaryFile() as f:
+        for chunk in report_cards.iter_zip(cards, format=options.get('output', 'html'),
+                                           workers=getattr(settings, 'REPORT_CARD_WORKERS', None),
+                                           progress=job.report_progress):
+            f.write(chunk)
+        f.seek(0)
+        job.save_output('report-cards.zip', File(f))
+    return {'report_cards': len(cards)}
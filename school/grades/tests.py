@@ -1,3 +1,328 @@
-from django.test import TestCase
+import csv
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date, datetime, timezone
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, connections
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from grades import report_cards
+from grades.importers import GradebookImporter
+from grades.models import Grade
+from jobs.worker import run_pending
+from school.testing import (
+    IndexUsageMixin, QueryBudgetMixin, ReferenceCacheMixin, TemporaryMediaMixin, make_attendance, make_class,
+    make_grade, make_student, make_subject, make_teacher,
+)
 
-# Create your tests here.
+
+class GradeAPIQueryTests(QueryBudgetMixin, TestCase):
+    def test_list_does_not_query_per_row(self):
+        self.assertQueriesConstant('/api/grades/', make_grade, budget=2)  # ETag validators, then the page
+
+    def test_detail_loads_related_names_eagerly(self):
+        grade = make_grade()
+        queries, _ = self.count_queries(f'/api/grades/{grade.pk}/')
+        self.assertEqual(queries, 2)  # ETag validators, then the grade
+
+
+class GradeConditionalGetTests(TestCase):
+    def test_renaming_a_student_changes_the_list_etag(self):
+        grade = make_grade()
+        etag = self.client.get('/api/grades/')['ETag']
+        grade.student.last_name = 'Renamed'
+        grade.student.save()
+        self.assertEqual(self.client.get('/api/grades/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_validators_do_not_read_the_dependency_tables(self):
+        grade = make_grade()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/grades/{grade.pk}/')
+        validators = queries.captured_queries[0]['sql']
+        for table in ('students_student', 'subjects_subject', 'classes_class'):
+            self.assertNotIn(table, validators)
+
+
+class GradeFilterTests(TestCase):
+    def test_end_date_includes_the_whole_day(self):
+        late_in_day = make_grade(graded_at=datetime(2025, 3, 2, 23, 30, tzinfo=timezone.utc))
+        make_grade(graded_at=datetime(2025, 3, 3, 0, 0, tzinfo=timezone.utc))
+        response = self.client.get('/api/grades/', {'start_date': '2025-03-02', 'end_date': '2025-03-02'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [late_in_day.pk])
+
+    def test_dates_that_do_not_exist_are_rejected(self):
+        for params in ({'start_date': '2025-02-30'}, {'end_date': '2025-13-01'}):
+            response = self.client.get('/api/grades/', params)
+            self.assertEqual((response.status_code, list(response.json())), (400, list(params)))
+
+    def test_end_date_can_be_the_last_day_there_is(self):
+        grade = make_grade()
+        for url in ('/api/grades/', '/api/grades/summary/'):
+            self.assertEqual(self.client.get(url, {'end_date': '9999-12-31'}).status_code, 200)
+        response = self.client.get('/api/grades/', {'end_date': '9999-12-31'})
+        self.assertEqual([row['id'] for row in response.json()['results']], [grade.pk])
+
+    def test_ids_too_large_for_the_column_are_rejected(self):
+        response = self.client.get('/api/grades/', {'student': '9' * 23, 'subject': '1'})
+        self.assertEqual((response.status_code, list(response.json())), (400, ['student']))
+
+
+class GradeIndexTests(IndexUsageMixin, TestCase):
+    def test_student_report_uses_the_unique_together_index(self):
+        # Its (student, subject) prefix serves these lookups without an index of their own
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Grade._meta.db_table)
+        name, = [name for name, constraint in constraints.items()
+                 if constraint['unique'] and constraint['columns'][:2] == ['student_id', 'subject_id']]
+        self.assertUsesIndex(Grade.objects.filter(student=1, subject=1), name)
+
+    def test_class_gradebook_uses_class_subject_date_index(self):
+        self.assertUsesIndex(
+            Grade.objects.filter(class_id=1, subject=1, graded_at__gte=datetime(2025, 3, 1, tzinfo=timezone.utc)),
+            'grade_class_subject_date_idx',
+        )
+
+    def test_default_ordering_uses_recent_index(self):
+        self.assertUsesIndex(Grade.objects.all()[:50], 'grade_recent_idx')
+
+
+class GradebookImportTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(make_teacher())
+        self.class_obj = make_class(class_name='7A', academic_year='2025-2026')
+        self.students = [make_student(student_id=f'IMP{i}') for i in range(3)]
+        self.subject = make_subject(subject_code='MATH')
+
+    def csv_file(self, rows):
+        lines = ['student_id,subject_code,class_name,grade_value,grade_type,title,graded_at']
+        lines += [','.join(row) for row in rows]
+        return SimpleUploadedFile('grades.csv', '\n'.join(lines).encode('utf-8'))
+
+    def valid_rows(self):
+        return [[s.student_id, 'MATH', '7A', '88.5', 'exam', 'Term 1', '2025-03-01'] for s in self.students]
+
+    def test_imports_all_rows_with_batched_lookups(self):
+        importer = GradebookImporter(atomic=False, batch_size=2)
+        with CaptureQueriesContext(connection) as context:
+            result = importer.import_rows(enumerate(
+                [dict(zip(['student_id', 'subject_code', 'class_name', 'grade_value', 'grade_type', 'title', 'graded_at'], row))
+                 for row in self.valid_rows() * 2], start=2))
+        self.assertEqual(result['created'], 3)
+        self.assertEqual(result['failed'], 3)  # The repeated rows are duplicates
+        self.assertEqual(Grade.objects.count(), 3)
+        # Two batches, each: students, subjects, classes, existing grades, insert
+        inserts = [q for q in context.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 2)
+
+    def test_files_that_are_not_utf8_are_reported(self):
+        upload = 'student_id,subject_code\nIMP0,MATH,Élève'.encode('latin-1')
+        result = GradebookImporter().import_file(io.TextIOWrapper(io.BytesIO(upload), encoding='utf-8-sig'))
+        self.assertEqual((result['created'], list(result['errors'][0]['errors'])), (0, ['file']))
+
+    def import_in_background(self, rows, **data):
+        response = self.client.post('/api/grades/import/', {'file': self.csv_file(rows), **data})
+        self.assertEqual(response.status_code, 202)
+        self.assertFalse(Grade.objects.exists())  # Nothing happens until a worker runs it
+        run_pending()
+        return self.client.get(response['Location']).json()
+
+    def test_atomic_import_saves_nothing_when_a_row_fails(self):
+        rows = self.valid_rows() + [['NOPE', 'MATH', '7A', '50', 'exam', 'Term 1', '2025-03-01']]
+        job = self.import_in_background(rows)
+        self.assertEqual((job['status'], job['result']['created']), ('failed', 0))
+        self.assertEqual(job['result']['errors'], [
+            {'row': 5, 'errors': {'student_id': ['No student with student_id "NOPE".']}},
+        ])
+        self.assertFalse(Grade.objects.exists())
+
+    def test_partial_import_saves_valid_rows(self):
+        rows = self.valid_rows() + [['IMP0', 'MATH', '7A', 'abc', 'essay', 'Term 2', 'soon']]
+        job = self.import_in_background(rows, mode='partial')
+        self.assertEqual(job['result']['created'], 3)
+        self.assertEqual(job['progress'], {'done': 4, 'total': 4, 'percentage': 100.0})
+        self.assertEqual(sorted(job['result']['errors'][0]['errors']), ['grade_type', 'grade_value', 'graded_at'])
+
+    def test_import_needs_a_file(self):
+        response = self.client.post('/api/grades/import/', {'mode': 'partial'})
+        self.assertEqual(response.status_code, 400)
+
+
+class GradeExportTests(TestCase):
+    def test_streams_grades_with_letter_grade(self):
+        make_grade(grade_value=96)
+        make_grade(grade_value=42, max_grade=50)
+        response = self.client.get('/api/grades/export.csv', {'ordering': 'grade_value'})
+        rows = list(csv.DictReader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual([(r['percentage'], r['letter_grade']) for r in rows], [('84.00', 'B'), ('96.00', 'A')])
+
+
+class GradeSummaryTests(TestCase):
+    def setUp(self):
+        self.student = make_student()
+        self.subject = make_subject()
+        self.class_obj = make_class()
+        for value, max_grade, grade_type in [(95, 100, 'exam'), (80, 100, 'quiz'), (47, 50, 'quiz'), (30, 60, 'final')]:
+            make_grade(student=self.student, subject=self.subject, class_id=self.class_obj,
+                       grade_value=value, max_grade=max_grade, grade_type=grade_type)
+
+    def test_summary_is_one_query_and_matches_python_properties(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/grades/summary/', {'group_by': 'student,subject'})
+        self.assertEqual(len(context.captured_queries), 1)
+        [row] = response.json()
+        grades = list(Grade.objects.all())
+        self.assertEqual(row['student_code'], self.student.student_id)
+        self.assertEqual(row['count'], 4)
+        self.assertEqual(row['average_percentage'], round(float(sum(g.percentage for g in grades) / 4), 2))
+        self.assertEqual(row['weighted_percentage'], round(252 * 100 / 310, 2))
+        self.assertEqual((row['min_percentage'], row['max_percentage']), (50.0, 95.0))
+        self.assertEqual(row['grade_types'], {'assignment': 0, 'quiz': 2, 'exam': 1, 'midterm': 0, 'final': 1})
+        expected = {letter: 0 for letter in 'ABCDF'}
+        for grade in grades:
+            expected[grade.letter_grade] += 1
+        self.assertEqual(row['letter_grades'], expected)
+
+    def test_whole_school_summary_without_grouping(self):
+        [row] = self.client.get('/api/grades/summary/').json()
+        self.assertEqual(row['count'], 4)
+
+    def test_unknown_group_is_rejected(self):
+        response = self.client.get('/api/grades/summary/', {'group_by': 'teacher'})
+        self.assertEqual(response.status_code, 400)
+
+
+class GradeFieldsetTests(QueryBudgetMixin, TestCase):
+    def test_fields_trim_output_and_columns(self):
+        make_grade(grade_value=45, max_grade=50)
+        _, context = self.count_queries('/api/grades/?fields=id,title,percentage')
+        page_sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('JOIN', page_sql)
+        self.assertNotIn('"description"', page_sql)
+        row = self.client.get('/api/grades/', {'fields': 'id,title,percentage'}).json()['results'][0]
+        self.assertEqual(set(row), {'id', 'title', 'percentage'})
+        self.assertEqual(row['percentage'], 90.0)
+
+    def test_name_fields_join_only_their_relation(self):
+        make_grade()
+        _, context = self.count_queries('/api/grades/?fields=id,subject_name')
+        page_sql = context.captured_queries[-1]['sql']
+        self.assertIn('subjects_subject', page_sql)
+        self.assertNotIn('students_student', page_sql)
+
+    def test_expand_nests_related_objects_without_extra_queries(self):
+        self.assertQueriesConstant('/api/grades/?expand=student,class_id', make_grade, budget=3)
+        row = self.client.get('/api/grades/', {'fields': 'id', 'expand': 'class_id'}).json()['results'][0]
+        self.assertEqual(set(row), {'id', 'class_id'})
+        self.assertIn('current_enrollment', row['class_id'])
+
+    def test_unknown_names_are_rejected(self):
+        response = self.client.get('/api/grades/', {'fields': 'id,nope', 'expand': 'graded_by'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'fields', 'expand'})
+
+
+@override_settings(REPLICA_READS=True)
+class GradeReplicaRoutingTests(TestCase):
+    databases = {'default', 'replica'}
+
+    def queries_by_alias(self, method, url, **kwargs):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica']) as replica:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertLess(response.status_code, 400, response.content)
+        return len(primary.captured_queries), len(replica.captured_queries)
+
+    def test_summary_reads_from_replica(self):
+        make_grade()
+        primary, replica = self.queries_by_alias('get', '/api/grades/summary/')
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+    def test_list_stays_on_primary(self):
+        make_grade()
+        self.assertEqual(self.queries_by_alias('get', '/api/grades/')[1], 0)
+
+    def test_client_that_wrote_is_pinned_to_primary(self):
+        grade = make_grade()
+        self.queries_by_alias('patch', f'/api/grades/{grade.pk}/', data={'title': 'Retake'},
+                              content_type='application/json')
+        self.assertIn('primary_pin', self.client.cookies)
+        self.assertEqual(self.queries_by_alias('get', '/api/grades/summary/')[1], 0)
+
+    @override_settings(REPLICA_READS=False)
+    def test_disabled_replica_is_never_used(self):
+        make_grade()
+        self.assertEqual(self.queries_by_alias('get', '/api/grades/summary/')[1], 0)
+
+
+class ReportCardTests(ReferenceCacheMixin, TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(make_teacher())
+        self.class_obj = make_class(class_name='6A', grade_level='Grade 6')
+        self.student = make_student(student_id='S1', first_name='Ada', last_name='Byron', class_enrolled=self.class_obj)
+        maths = make_subject(subject_code='MATH', subject_name='Maths')
+        for value, day in ((90, 10), (70, 11), (10, 28)):  # The last is after the term
+            make_grade(student=self.student, subject=maths, class_id=self.class_obj, grade_value=value,
+                       graded_at=datetime(2025, 2, day, 12, tzinfo=timezone.utc))
+        make_attendance(student=self.student, class_name=self.class_obj, date=date(2025, 2, 10), status='present')
+        make_attendance(student=self.student, class_name=self.class_obj, date=date(2025, 2, 11), status='absent')
+
+    def test_cards_are_collected_in_constant_queries(self):
+        for _ in range(3):
+            make_grade(student=make_student(class_enrolled=self.class_obj), class_id=self.class_obj)
+        with self.assertNumQueries(3):  # Students, grades, attendance counts
+            cards = report_cards.collect(report_cards.select_students(grade_level='Grade 6'),
+                                         date(2025, 2, 1), date(2025, 2, 20))
+        card = next(card for card in cards if card['student']['student_id'] == 'S1')
+        self.assertEqual(len(cards), 4)
+        self.assertEqual([(row['name'], row['percentage'], row['letter']) for row in card['subjects']],
+                         [('Maths', 80.0, 'B')])
+        self.assertEqual((card['attendance']['present'], card['attendance']['absent'], card['present_rate']),
+                         (1, 1, 50.0))
+
+    def test_endpoint_streams_a_zip_of_html_cards(self):
+        response = self.client.get('/api/grades/report-cards/', {
+            'class_id': self.class_obj.pk, 'start_date': '2025-02-01', 'end_date': '2025-02-20',
+        })
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), ['6a-grade-6/s1-ada-byron.html'])
+        html = archive.read('6a-grade-6/s1-ada-byron.html').decode()
+        self.assertIn('Ada Byron', html)
+        self.assertIn('80.0%', html)
+
+    def test_post_builds_the_zip_in_a_job(self):
+        response = self.client.post('/api/grades/report-cards/', {'class_id': self.class_obj.pk}, format='json')
+        self.assertEqual(response.status_code, 202)
+        run_pending()
+        job = self.client.get(response['Location']).json()
+        self.assertEqual((job['status'], job['result'], job['progress']['percentage']),
+                         ('succeeded', {'report_cards': 1}, 100.0))
+        download = self.client.get(job['download_url'])
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(download.streaming_content)))
+        self.assertEqual(archive.namelist(), ['6a-grade-6/s1-ada-byron.html'])
+
+    def test_endpoint_validates_its_parameters(self):
+        response = self.client.get('/api/grades/report-cards/', {'start_date': '2025-03-01'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get('/api/grades/report-cards/', {'class_id': 999, 'output': 'docx'})
+        self.assertEqual(set(response.json()), {'class_id', 'output'})
+
+    def test_command_renders_across_processes_into_a_directory(self):
+        for _ in range(report_cards.CHUNK_SIZE):  # Enough cards to use the pool
+            make_student(class_enrolled=self.class_obj)
+        with tempfile.TemporaryDirectory() as path:
+            call_command('generate_report_cards', path, '--class', str(self.class_obj.pk), '--workers', '2',
+                         stdout=io.StringIO())
+            files = os.listdir(os.path.join(path, '6a-grade-6'))
+        self.assertEqual(len(files), report_cards.CHUNK_SIZE + 1)
+        self.assertIn('s1-ada-byron.html', files)
+
+    def test_student_grades_action(self):
+        row = self.client.get(f'/api/students/{self.student.pk}/grades/').json()[0]
+        self.assertEqual(row['graded_at'][:10], '2025-02-28')
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'priority', 'attempts', 'progress_done', 'progress_total', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    ordering = ['-created_at']
+    readonly_fields = ['id', 'attempts', 'progress_done', 'progress_total', 'result', 'error', 'worker',
+                       'heartbeat_at', 'created_by', 'created_at', 'started_at', 'finished_at']
@@ -0,0 +1,34 @@
+import os
+from django.http import FileResponse, Http404
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+from .models import Job
+from .serializers import JobSerializer
+
+
+def accepted(job, request):
+    """202 response for an endpoint that queued ``job``, pointing at its status."""
+    location = reverse('job-detail', args=[job.pk], request=request)
+    return Response(JobSerializer(job, context={'request': request}).data,
+                    status=status.HTTP_202_ACCEPTED, headers={'Location': location})
+
+
+class JobViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Status of a background job: poll until `status` is succeeded or failed.
+    Job ids are random UUIDs handed only to whoever queued the job.
+    """
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+
+    @action(detail=True)
+    def download(self, request, pk=None):
+        """The job's output file, once it has succeeded."""
+        job = self.get_object()
+        if job.status != Job.SUCCEEDED or not job.output_file:
+            raise Http404('This job has no output.')
+        return FileResponse(job.output_file.open('rb'), as_attachment=True,
+                            filename=os.path.basename(job.output_file.name))
@@ -0,0 +1,29 @@
+import signal
+from django.core.management.base import BaseCommand
+from jobs.worker import POOLS, Worker
+
+
+class Command(BaseCommand):
+    help = ('Run queued background jobs (gradebook imports, report cards, ...) until stopped. '
+            'Start as many workers as you like; they share the queue through the database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help='Jobs run at once (default: JOBS_CONCURRENCY)')
+        parser.add_argument('--pool', choices=POOLS, default='thread',
+                            help='Run jobs on threads, or on processes for CPU-bound work')
+        parser.add_argument('--poll-interval', type=float, help='Seconds between looks at an empty queue')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is ready')
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options['concurrency'], pool=options['pool'],
+                        poll_interval=options['poll_interval'], log=self.stdout.write)
+
+        def stop(signum, frame):
+            self.stdout.write('Stopping after the running jobs finish')
+            worker.stop()
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(f'Worker {worker.name}: up to {worker.concurrency} job(s) at once on {worker.pool}s')
+        worker.run(once=options['once'])
+        self.stdout.write(self.style.SUCCESS('Worker stopped'))
@@ -0,0 +1,135 @@
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+class JobQuerySet(models.QuerySet):
+    def enqueue(self, task, payload=None, *, priority=0, max_attempts=3, input_file=None, created_by=None):
+        """
+        Queue ``task`` (a name registered with jobs.registry.task) to run with
+        ``payload``. ``input_file`` (a File, e.g. an upload) is stored for
+        the task to read.
+        """
+        # By id: a user authenticated from token claims is not a User row
+        job = self.model(task=task, payload=payload or {}, priority=priority, max_attempts=max_attempts,
+                         created_by_id=created_by.pk if created_by and created_by.is_authenticated else None)
+        if input_file is not None:
+            job.input_file.save(input_file.name, input_file, save=False)
+        job.save(force_insert=True)
+        return job
+
+    def ready(self, now=None):
+        """Queued jobs whose time has come, in the order workers take them."""
+        return self.filter(status=Job.QUEUED, run_after__lte=now or timezone.now()).order_by('-priority', 'run_after')
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    progress_done = models.PositiveIntegerField(default=0)
+    progress_total = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    error = models.TextField(blank=True)
+    input_file = models.FileField(upload_to='jobs/input/%Y/%m/', blank=True)
+    output_file = models.FileField(upload_to='jobs/output/%Y/%m/', blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Workers' next-job query: JobQuerySet.ready()
+            models.Index(fields=['status', '-priority', 'run_after'], name='job_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.get_status_display()})"
+
+    @property
+    def finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def _claim(self):
+        """This attempt's row, unless the job was requeued or claimed again since."""
+        return Job.objects.filter(pk=self.pk, status=self.RUNNING, worker=self.worker, attempts=self.attempts)
+
+    def _update(self, rows, **changes):
+        """Apply ``changes`` to ``rows`` and, if that matched this job, to the instance too."""
+        if not rows.update(**changes):
+            return False
+        for field, value in changes.items():
+            setattr(self, field, value)
+        return True
+
+    def report_progress(self, done, total=None):
+        """Record progress, which also tells the worker's peers the job is alive."""
+        changes = {'progress_done': done, 'heartbeat_at': timezone.now()}
+        if total is not None:
+            changes['progress_total'] = total
+        self._update(self._claim(), **changes)
+
+    def save_output(self, name, content):
+        """
+        Store ``content`` (a File) as the job's downloadable output. Like
+        succeed(), only for the attempt that is still running: otherwise the
+        stored file is deleted again and it returns False.
+        """
+        previous = self.output_file.name
+        self.output_file.save(name, content, save=False)
+        if self._update(self._claim(), output_file=self.output_file.name):
+            return True
+        self.output_file.delete(save=False)
+        self.output_file = previous
+        return False
+
+    def succeed(self, result):
+        """
+        Record ``result``. Like fail(), this only applies to the attempt that
+        is still running: it returns False and changes nothing if the job was
+        requeued, and maybe claimed by another worker, in the meantime.
+        """
+        return self._update(self._claim(), status=self.SUCCEEDED, result=result, error='',
+                            finished_at=timezone.now())
+
+    def fail(self, error, retry=True, stale_before=None, result=None):
+        """
+        Record ``error``. While attempts remain and ``retry`` is set, queue the
+        job again after a backoff that doubles with each attempt; otherwise it
+        fails for good with ``result``. With ``stale_before``, only if the job
+        has not heartbeated since.
+        """
+        rows = self._claim()
+        if stale_before is not None:
+            rows = rows.filter(heartbeat_at__lt=stale_before)
+        if retry and self.attempts < self.max_attempts:
+            delay = getattr(settings, 'JOBS_RETRY_DELAY', 30) * 2 ** max(self.attempts - 1, 0)
+            return self._update(rows, status=self.QUEUED, error=error,
+                                run_after=timezone.now() + timedelta(seconds=delay))
+        return self._update(rows, status=self.FAILED, error=error, result=result, finished_at=timezone.now())
@@ -0,0 +1,35 @@
+"""
+Background tasks by name.
+
+A task is a function taking the Job it runs for; it reads ``job.payload``
+and ``job.input_file``, may call ``job.report_progress()`` and
+``job.save_output()``, and returns the job's result, which must be
+JSON-serialisable. Apps register theirs in a ``tasks.py`` module, which
+JobsConfig imports at startup.
+"""
+_tasks = {}
+
+
+class JobError(Exception):
+    """
+    Fails the job at once with this message, without retrying it. ``result``,
+    if given, is kept as the job's result, e.g. to say what went wrong in detail.
+    """
+
+    def __init__(self, message, result=None):
+        super().__init__(message)
+        self.result = result
+
+
+def task(name):
+    def decorator(function):
+        _tasks[name] = function
+        return function
+    return decorator
+
+
+def get_task(name):
+    try:
+        return _tasks[name]
+    except KeyError:
+        raise JobError(f'No task named {name!r}.') from None
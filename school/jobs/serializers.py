@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'task', 'status', 'priority', 'attempts', 'max_attempts', 'progress',
+                  'result', 'error', 'download_url', 'run_after', 'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+    def get_progress(self, job):
+        total = job.progress_total
+        return {
+            'done': job.progress_done,
+            'total': total,
+            'percentage': round(job.progress_done * 100 / total, 1) if total else None,
+        }
+
+    def get_download_url(self, job):
+        if not job.output_file:
+            return None
+        return reverse('job-download', args=[job.pk], request=self.context.get('request'))
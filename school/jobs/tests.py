@@ -0,0 +1,139 @@
+import io
+import os
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from jobs.models import Job
+from jobs.registry import JobError, task
+from jobs.worker import claim_next, requeue_stale, run_pending
+from school.testing import TemporaryMediaMixin
+
+ran = []
+
+
+@task('tests.record')
+def record(job):
+    ran.append(job.payload['name'])
+    job.report_progress(1, 1)
+    return {'name': job.payload['name']}
+
+
+@task('tests.flaky')
+def flaky(job):
+    if job.attempts < 2:
+        raise RuntimeError('Try again')
+    return 'ok'
+
+
+@task('tests.invalid')
+def invalid(job):
+    raise JobError('Choose a class.')
+
+
+class JobQueueTests(TemporaryMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        ran.clear()
+
+    def test_higher_priority_runs_first(self):
+        Job.objects.enqueue('tests.record', {'name': 'low'}, priority=-5)
+        Job.objects.enqueue('tests.record', {'name': 'normal'})
+        Job.objects.enqueue('tests.record', {'name': 'urgent'}, priority=10)
+        self.assertEqual(run_pending(), 3)
+        self.assertEqual(ran, ['urgent', 'normal', 'low'])
+
+    def test_a_claimed_job_is_not_claimed_again(self):
+        job = Job.objects.enqueue('tests.record', {'name': 'once'})
+        self.assertEqual(claim_next('a').pk, job.pk)
+        self.assertIsNone(claim_next('b'))
+
+    def test_failures_are_retried_after_a_backoff(self):
+        job = Job.objects.enqueue('tests.flaky')
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertIn('RuntimeError: Try again', job.error)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertEqual(run_pending(), 0)  # Not yet due
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result, job.error), (Job.SUCCEEDED, 'ok', ''))
+
+    def test_job_errors_fail_without_retrying(self):
+        job = Job.objects.enqueue('tests.invalid')
+        run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.error), (Job.FAILED, 1, 'Choose a class.'))
+
+    def test_jobs_of_a_vanished_worker_are_requeued(self):
+        job = Job.objects.enqueue('tests.record', {'name': 'orphan'}, max_attempts=2)
+        claim_next('gone')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (Job.QUEUED, 'Worker gone stopped responding.'))
+
+    def test_a_requeued_job_ignores_its_old_worker(self):
+        job = Job.objects.enqueue('tests.record', {'name': 'slow'})
+        slow = claim_next('slow')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale()
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        fresh = claim_next('fresh')
+        self.assertFalse(slow.succeed('late'))
+        self.assertFalse(slow.fail('late'))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.result), (Job.RUNNING, 'fresh', None))
+        self.assertTrue(fresh.succeed('ok'))
+
+    def test_a_requeued_job_keeps_the_output_of_the_attempt_that_replaced_it(self):
+        job = Job.objects.enqueue('tests.record', {'name': 'slow'})
+        slow = claim_next('slow')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        requeue_stale()
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        fresh = claim_next('fresh')
+        self.assertTrue(fresh.save_output('fresh.txt', ContentFile(b'fresh')))
+        stored = fresh.output_file.name
+
+        self.assertFalse(slow.save_output('slow.txt', ContentFile(b'slow')))
+        job.refresh_from_db()
+        self.assertEqual(job.output_file.name, stored)
+        self.assertEqual(job.output_file.storage.listdir(os.path.dirname(stored))[1], [os.path.basename(stored)])
+
+    def test_a_stale_job_is_requeued_once(self):
+        job = Job.objects.enqueue('tests.record', {'name': 'orphan'})
+        claim_next('gone')
+        Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        first, second = Job.objects.get(pk=job.pk), Job.objects.get(pk=job.pk)
+        cutoff = timezone.now()
+        self.assertTrue(first.fail('gone', stale_before=cutoff))
+        self.assertFalse(second.fail('gone', stale_before=cutoff))
+
+    def test_status_endpoint(self):
+        job = Job.objects.enqueue('tests.record', {'name': 'polled'})
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/').json()['status'], 'queued')
+        run_pending()
+        data = self.client.get(f'/api/jobs/{job.pk}/').json()
+        self.assertEqual((data['status'], data['result'], data['progress']['percentage'], data['download_url']),
+                         ('succeeded', {'name': 'polled'}, 100.0, None))
+        self.assertEqual(self.client.get(f'/api/jobs/{job.pk}/download/').status_code, 404)
+
+
+@override_settings(JOBS_POLL_INTERVAL=0.01)
+class RunWorkerTests(TransactionTestCase):
+    def setUp(self):
+        ran.clear()
+
+    def test_runs_jobs_on_a_thread_pool(self):
+        for name in 'abc':
+            Job.objects.enqueue('tests.record', {'name': name})
+        out = io.StringIO()
+        call_command('runworker', '--once', '--concurrency', '2', stdout=out)
+        self.assertEqual(sorted(ran), ['a', 'b', 'c'])
+        self.assertEqual(Job.objects.filter(status=Job.SUCCEEDED).count(), 3)
+        self.assertIn('Running tests.record job', out.getvalue())
@@ -0,0 +1,151 @@
+"""
+Runs queued jobs; ``manage.py runworker`` is the entry point.
+
+Workers need no broker: they claim jobs from the Job table with a
+conditional UPDATE, so any number of them, on any number of machines, can
+share one database and no job runs twice at once. A worker heartbeats its
+running jobs; a job whose worker stopped responding for
+``JOBS_STALE_AFTER`` seconds is queued again (or failed once out of
+attempts).
+"""
+import multiprocessing
+import os
+import socket
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from datetime import timedelta
+import django
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import F
+from django.utils import timezone
+from .models import Job
+from .registry import JobError, get_task
+
+POOLS = ('thread', 'process')
+# Ready jobs looked at per claim; others may take the first ones meanwhile
+CLAIM_CANDIDATES = 10
+
+
+def claim_next(worker):
+    """Mark the next ready job as running on ``worker`` and return it, or None."""
+    now = timezone.now()
+    for pk in Job.objects.ready(now).values_list('pk', flat=True)[:CLAIM_CANDIDATES]:
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, attempts=F('attempts') + 1, started_at=now, heartbeat_at=now,
+        )
+        if claimed:
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def execute(job):
+    """
+    Run a claimed job's task and record how it went. If the job was requeued
+    meanwhile (this worker looked dead), the outcome is dropped.
+    """
+    try:
+        result = get_task(job.task)(job)
+    except JobError as e:
+        job.fail(str(e), retry=False, result=e.result)
+    except Exception:
+        job.fail(traceback.format_exc())
+    else:
+        job.succeed(result)
+
+
+def requeue_stale():
+    """Queue again (or fail) running jobs whose worker stopped heartbeating."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'JOBS_STALE_AFTER', 5 * 60))
+    for job in Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=cutoff):
+        # Conditional: another worker may requeue it first, or it may heartbeat meanwhile
+        job.fail(f'Worker {job.worker} stopped responding.', stale_before=cutoff)
+
+
+def run_pending(worker='inline'):
+    """Run every ready job in this thread, one after another; for tests and scripts."""
+    count = 0
+    while (job := claim_next(worker)) is not None:
+        execute(job)
+        count += 1
+    return count
+
+
+def _run(pk):
+    # Pool entry point: one connection per job, as a request would have
+    close_old_connections()
+    try:
+        execute(Job.objects.get(pk=pk))
+    finally:
+        close_old_connections()
+
+
+class Worker:
+    """
+    Claims ready jobs, highest priority first, and runs up to ``concurrency``
+    of them at once on a pool of threads or (``pool='process'``) processes.
+    Threads suit jobs that wait on the database; processes suit CPU-bound
+    ones, which would otherwise take turns on the GIL.
+    """
+
+    def __init__(self, concurrency=None, pool='thread', poll_interval=None, name=None, log=None):
+        if pool not in POOLS:
+            raise ValueError(f"Unknown pool {pool!r}. Choose from {', '.join(POOLS)}.")
+        self.concurrency = concurrency or getattr(settings, 'JOBS_CONCURRENCY', 2)
+        self.pool = pool
+        self.poll_interval = poll_interval or getattr(settings, 'JOBS_POLL_INTERVAL', 1.0)
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.log = log or (lambda message: None)
+        self.stopping = threading.Event()
+
+    def _executor(self):
+        if self.pool == 'process':
+            # Spawned, not forked: the parent holds database connections and threads
+            return ProcessPoolExecutor(max_workers=self.concurrency, initializer=django.setup,
+                                       mp_context=multiprocessing.get_context('spawn'))
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job')
+
+    def stop(self):
+        """Take no more jobs; run() returns once the running ones finish."""
+        self.stopping.set()
+
+    def run(self, once=False):
+        """Work until stop() is called or, with ``once``, until no job is ready."""
+        heartbeat_interval = getattr(settings, 'JOBS_HEARTBEAT_INTERVAL', 30)
+        running = {}  # Future -> job pk
+        next_heartbeat = 0
+        with self._executor() as executor:
+            while not self.stopping.is_set():
+                for future in [future for future in running if future.done()]:
+                    pk = running.pop(future)
+                    if future.exception() is not None:
+                        # The pool itself failed (e.g. a process was killed); the job
+                        # stays running and is requeued once it goes stale
+                        self.log(f'Job {pk} crashed its worker: {future.exception()!r}')
+                try:
+                    if time.monotonic() >= next_heartbeat:
+                        Job.objects.filter(pk__in=running.values(), status=Job.RUNNING, worker=self.name).update(
+                            heartbeat_at=timezone.now(),
+                        )
+                        requeue_stale()
+                        next_heartbeat = time.monotonic() + heartbeat_interval
+                    while len(running) < self.concurrency and not self.stopping.is_set():
+                        job = claim_next(self.name)
+                        if job is None:
+                            break
+                        self.log(f'Running {job.task} job {job.pk} (attempt {job.attempts}/{job.max_attempts})')
+                        running[executor.submit(_run, job.pk)] = job.pk
+                except DatabaseError as e:
+                    # e.g. SQLite locked by a long import; try again next round
+                    self.log(f'Database unavailable: {e}')
+                    close_old_connections()
+                if once and not running:
+                    break
+                if running:
+                    wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                else:
+                    self.stopping.wait(self.poll_interval)
+            if running:
+                self.log(f'Waiting for {len(running)} running job(s) to finish')
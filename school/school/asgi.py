@@ -2,6 +2,9 @@
 ASGI config for school project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn school.asgi:application``) so the
+async composite views (dashboard summary, student overview, class report)
+don't hold a worker per request.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
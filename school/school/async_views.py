@@ -0,0 +1,99 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.http import JsonResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+# Worker threads for gather_queries(); each holds at most one connection per alias
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_QUERY_WORKERS', 8), thread_name_prefix='async-query',
+)
+
+
+def _in_transaction():
+    return any(connection.in_atomic_block for connection in connections.all(initialized_only=True))
+
+
+def _on_own_connection(query):
+    def run():
+        # As around a request: connections past CONN_MAX_AGE, or broken, are
+        # closed before and after each call; others stay open for the next one
+        close_old_connections()
+        try:
+            return query()
+        finally:
+            close_old_connections()
+    return run
+
+
+async def gather_queries(**queries):
+    """
+    Run independent ORM calls concurrently and return their results by name.
+
+    Each value is a zero-argument callable doing blocking ORM work, e.g.
+    ``students=Student.objects.count``. Django's async ORM methods (``acount()``
+    and friends) all queue on one thread per request, so awaiting several of
+    them together still runs them one after another. Here each call gets a
+    worker thread and its own database connection, and the page takes as
+    long as its slowest query.
+
+    Inside a transaction the calls run in turn on the caller's connection
+    instead, since other connections cannot see its uncommitted writes.
+    """
+    if await sync_to_async(_in_transaction)():
+        return {name: await sync_to_async(query)() for name, query in queries.items()}
+    results = await asyncio.gather(*(
+        sync_to_async(_on_own_connection(query), thread_sensitive=False, executor=_executor)()
+        for query in queries.values()
+    ))
+    return dict(zip(queries, results))
+
+
+class PoolSaturated(Exception):
+    """Raised by BoundedPool.run() when its queue is full."""
+
+
+class BoundedPool:
+    """
+    A fixed set of worker threads for one kind of blocking work, with a
+    bounded queue in front of them.
+
+    run() takes a place in the queue or fails at once with PoolSaturated, so
+    a burst of expensive calls (password hashing, say) occupies at most
+    ``workers`` threads and CPU cores and answers the overflow quickly,
+    instead of piling up until every server thread is busy.
+    """
+
+    def __init__(self, workers, queue, name):
+        self.workers = workers
+        self.queue = queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._places = threading.BoundedSemaphore(workers + queue)  # Running or waiting
+
+    async def run(self, function, *args, **kwargs):
+        if not self._places.acquire(blocking=False):
+            raise PoolSaturated
+        # Shielded: if the caller is cancelled (its client went away) the call
+        # still runs to the end, and only then gives its place back
+        task = asyncio.ensure_future(self._call(functools.partial(function, *args, **kwargs)))
+        task.add_done_callback(self._done)
+        return await asyncio.shield(task)
+
+    async def _call(self, call):
+        if await sync_to_async(_in_transaction)():
+            return await sync_to_async(call)()  # As in gather_queries()
+        return await sync_to_async(_on_own_connection(call), thread_sensitive=False, executor=self._executor)()
+
+    def _done(self, task):
+        self._places.release()
+        if not task.cancelled():
+            task.exception()  # Marks it retrieved: the caller may be gone
+
+
+def json_response(data, status=200):
+    """A JSON response encoded the way DRF's ``Response`` would encode ``data``."""
+    return JsonResponse(data, status=status, encoder=JSONEncoder, safe=False)
@@ -0,0 +1,257 @@
+import bisect
+import re
+import threading
+import time
+import unicodedata
+from django.apps import apps
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+LIMIT = 10
+MAX_LIMIT = 50
+
+_indexes = {}
+
+
+_WORD = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Lowercase ``text`` and strip accents, so ``Zoë`` and ``zoe`` match."""
+    text = str(text)
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def words(text):
+    return _WORD.findall(normalize(text))
+
+
+class PrefixIndex:
+    """
+    In-process typeahead index over one model.
+
+    A sorted list of ``(word, pk)`` pairs, one per word of each row's
+    ``fields``: a query bisects to its first word's prefix and walks
+    forward, so lookups cost microseconds whatever the table size. Rows
+    also keep their label and words for the other query words and for
+    updates.
+
+    Built from the database on first use, then kept current by
+    ``post_save``/``post_delete`` (applied on commit). Other processes see a
+    change once their copy is older than ``AUTOCOMPLETE_MAX_AGE``: a thread
+    then rebuilds it while the old copy keeps serving. A table with more
+    than ``AUTOCOMPLETE_MAX_ROWS`` rows (counted, not fetched) is not held
+    in memory; queries then go to the database through
+    ``fallback(queryset, q)``, or ``istartswith`` on ``fields``.
+    """
+
+    def __init__(self, model, fields, label=None, fallback=None):
+        self.model = model
+        self.fields = list(fields)
+        self.label = label or (lambda values: str(model(**values)))
+        self.fallback = fallback
+        self._lock = threading.Lock()
+        self._entries = None  # Sorted (word, pk); None until built
+        self._rows = {}  # pk -> (label, words)
+        self._built_at = None
+        self._oversized = False
+        self._rebuilder = None  # The thread rebuilding a stale index
+        self._changes = []  # update()/remove() calls made while it reads
+        self._generation = 0  # Bumped by reset(), which discards a rebuild under way
+
+    def _load(self):
+        """``(rows, entries)`` read from the database; None if the table is too large."""
+        manager = self.model._default_manager
+        if manager.count() > getattr(settings, 'AUTOCOMPLETE_MAX_ROWS', 50_000):
+            return None
+        rows = {row['pk']: self._row(row) for row in manager.order_by().values('pk', *self.fields)}
+        return rows, sorted((word, pk) for pk, (_, row_words) in rows.items() for word in row_words)
+
+    def _install(self, loaded):
+        self._oversized = loaded is None
+        self._rows, self._entries = loaded or ({}, [])
+        self._built_at = time.monotonic()
+
+    def _rebuild(self, generation):
+        try:
+            loaded = self._load()
+        except Exception:
+            loaded = False  # Keep serving the old copy; the next query tries again
+        finally:
+            connections.close_all()  # This thread's own
+        with self._lock:
+            if generation != self._generation:
+                return
+            changes, self._changes, self._rebuilder = self._changes, [], None
+            if loaded is False:
+                return
+            self._install(loaded)
+            # Commits that may have landed after the read; replaying one it saw is harmless
+            for change in changes:
+                change()
+
+    def _row(self, values):
+        row_words = {word for field in self.fields if values[field] for word in words(values[field])}
+        return self.label(values), tuple(sorted(row_words))
+
+    def _ensure_built(self):
+        if self._entries is None:
+            self._install(self._load())  # Nothing to serve until the first build
+        elif (self._rebuilder is None
+              and time.monotonic() - self._built_at > getattr(settings, 'AUTOCOMPLETE_MAX_AGE', 300)):
+            self._rebuilder = threading.Thread(target=self._rebuild, args=(self._generation,),
+                                               name='autocomplete-rebuild', daemon=True)
+            self._rebuilder.start()
+
+    def search(self, query, limit=LIMIT):
+        """Up to ``limit`` rows where every word of ``query`` starts some word of the row."""
+        query_words = words(query)
+        with self._lock:
+            self._ensure_built()
+            if self._oversized:
+                return None
+            if not query_words:
+                return []
+            # Walk the narrowest word's range; check the others per row
+            ranges = [(self._range(word), word) for word in query_words]
+            ranges.sort(key=lambda item: item[0][1] - item[0][0])
+            (start, end), _ = ranges[0]
+            others = [word for _, word in ranges[1:]]
+            results, seen = [], set()
+            for position in range(start, end):
+                pk = self._entries[position][1]
+                if pk in seen:
+                    continue
+                seen.add(pk)
+                label, row_words = self._rows[pk]
+                if all(any(row_word.startswith(other) for row_word in row_words) for other in others):
+                    results.append({'id': pk, 'label': label})
+                    if len(results) == limit:
+                        break
+            return results
+
+    def _range(self, prefix):
+        """Positions of the entries whose word starts with ``prefix``."""
+        start = bisect.bisect_left(self._entries, (prefix,))
+        end = bisect.bisect_left(self._entries, (prefix + '\U0010ffff',), lo=start)
+        return start, end
+
+    def search_database(self, query, limit=LIMIT):
+        """search() for tables too large to index in memory."""
+        if not words(query):
+            return []
+        queryset = self.model._default_manager.all()
+        if self.fallback is not None:
+            queryset = self.fallback(queryset, query)
+        else:
+            for word in words(query):
+                queryset = queryset.filter(
+                    Q(*(Q(**{f'{field}__istartswith': word}) for field in self.fields), _connector=Q.OR)
+                )
+        return [{'id': row['pk'], 'label': self.label(row)} for row in queryset.values('pk', *self.fields)[:limit]]
+
+    def update(self, pk, values):
+        with self._lock:
+            if self._rebuilder is not None:
+                self._changes.append(lambda: self._update(pk, values))
+            self._update(pk, values)
+
+    def _update(self, pk, values):
+        if self._entries is None or self._oversized:
+            return  # Built (or skipped) from the database when next needed
+        self._discard(pk)
+        self._rows[pk] = row = self._row(values)
+        for word in row[1]:
+            bisect.insort(self._entries, (word, pk))
+
+    def remove(self, pk):
+        with self._lock:
+            if self._rebuilder is not None:
+                self._changes.append(lambda: self._remove(pk))
+            self._remove(pk)
+
+    def _remove(self, pk):
+        if self._entries is not None and not self._oversized:
+            self._discard(pk)
+
+    def _discard(self, pk):
+        _, row_words = self._rows.pop(pk, (None, ()))
+        for word in row_words:
+            position = bisect.bisect_left(self._entries, (word, pk))
+            if position < len(self._entries) and self._entries[position] == (word, pk):
+                del self._entries[position]
+
+    def reset(self):
+        with self._lock:
+            self._entries, self._rows, self._built_at, self._oversized = None, {}, None, False
+            self._rebuilder, self._changes = None, []
+            self._generation += 1
+
+
+def register(name, model, fields, label=None, fallback=None):
+    """
+    Serve ``/api/autocomplete/<name>/`` from a PrefixIndex over ``model`` (a
+    model or ``'app_label.ModelName'``), indexing the words of ``fields``.
+    Rows are shown as ``label(values)``, where ``values`` maps each field to
+    its value; by default the ``str()`` of a model instance built from them,
+    so ``fields`` must cover what ``__str__`` reads.
+    """
+    if isinstance(model, str):
+        model = apps.get_model(model)
+    index = _indexes[name] = PrefixIndex(model, fields, label, fallback)
+
+    def saved(instance, update_fields=None, using=None, **kwargs):
+        if update_fields is not None and not set(update_fields) & set(index.fields):
+            return
+        values = {field: getattr(instance, field) for field in index.fields}
+        transaction.on_commit(lambda: index.update(instance.pk, values), using=using)
+
+    def deleted(instance, using=None, **kwargs):
+        pk = instance.pk
+        transaction.on_commit(lambda: index.remove(pk), using=using)
+
+    post_save.connect(saved, sender=model, weak=False, dispatch_uid=f'autocomplete:{name}:save')
+    post_delete.connect(deleted, sender=model, weak=False, dispatch_uid=f'autocomplete:{name}:delete')
+    return index
+
+
+def get_index(name):
+    return _indexes.get(name)
+
+
+def reset():
+    """Forget every index's contents; each rebuilds on its next query."""
+    for index in _indexes.values():
+        index.reset()
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])  # Allow unauthenticated access for development
+def autocomplete(request, name):
+    """
+    Typeahead matches for ``?q=``: ``[{"id": ..., "label": ...}]``, at most
+    ``?limit=`` (default 10, at most 50). Every word of ``q`` must start a
+    word of the row's name or code; accents and case are ignored.
+    """
+    index = get_index(name)
+    if index is None:
+        return Response({'detail': f"No autocomplete for '{name}'. Choose from {', '.join(sorted(_indexes))}."},
+                        status=status.HTTP_404_NOT_FOUND)
+    try:
+        limit = min(max(int(request.query_params.get('limit', LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        return Response({'limit': ['Enter a whole number.']}, status=status.HTTP_400_BAD_REQUEST)
+    query = request.query_params.get('q', '')
+    results = index.search(query, limit)
+    if results is None:
+        results = index.search_database(query, limit)
+    return Response(results)
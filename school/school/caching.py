@@ -0,0 +1,163 @@
+import hashlib
+import threading
+from collections import Counter
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import serializers
+from rest_framework.response import Response
+
+KEY_PREFIX = 'reference'
+
+_lock = threading.Lock()
+_hits = Counter()
+_misses = Counter()
+
+
+def get_cache():
+    return caches[getattr(settings, 'REFERENCE_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'REFERENCE_CACHE_TIMEOUT', 3600)
+
+
+def generation(collection):
+    """Current version of ``collection``; bumping it orphans every cached entry at once."""
+    key = f'{KEY_PREFIX}:{collection}:generation'
+    cache = get_cache()
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, 1, None)
+        value = cache.get(key, 1)
+    return value
+
+
+def get_or_load(collection, part, loader):
+    """
+    Return the cached value for ``part`` of ``collection``, calling
+    ``loader()`` and storing its result on a miss.
+    """
+    key = f'{KEY_PREFIX}:{collection}:{generation(collection)}:{part}'
+    cache = get_cache()
+    value = cache.get(key)
+    with _lock:
+        (_misses if value is None else _hits)[collection] += 1
+    if value is None:
+        value = loader()
+        cache.set(key, value, _timeout())
+    return value
+
+
+def invalidate(collection):
+    cache = get_cache()
+    key = f'{KEY_PREFIX}:{collection}:generation'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, None)
+
+
+def invalidate_on_change(sender, *collections, ignore_fields=()):
+    """
+    Invalidate ``collections`` after every save or delete of ``sender`` (a
+    model or ``'app_label.ModelName'``).
+
+    Saves limited by ``update_fields`` to ``ignore_fields`` (such as a
+    user's ``last_login``) are skipped. The bump happens immediately and
+    again on commit, so a reader that refilled the cache from the old rows
+    mid-transaction is not served.
+    """
+    def receiver(update_fields=None, **kwargs):
+        if update_fields and set(update_fields) <= set(ignore_fields):
+            return
+        for collection in collections:
+            invalidate(collection)
+            transaction.on_commit(lambda collection=collection: invalidate(collection))
+
+    uid = f'reference-cache:{sender}:{",".join(collections)}'
+    post_save.connect(receiver, sender=sender, weak=False, dispatch_uid=f'{uid}:save')
+    post_delete.connect(receiver, sender=sender, weak=False, dispatch_uid=f'{uid}:delete')
+
+
+def display_names(collection, queryset, label=str):
+    """Cached ``{pk: label(obj)}`` for every row of ``queryset``."""
+    return get_or_load(collection, 'names', lambda: {obj.pk: label(obj) for obj in queryset})
+
+
+def stats():
+    """Hit and miss counts per collection since the process started."""
+    with _lock:
+        names = sorted(_hits.keys() | _misses.keys())
+        collections = {
+            name: {'hits': _hits[name], 'misses': _misses[name]} for name in names
+        }
+    hits = sum(c['hits'] for c in collections.values())
+    misses = sum(c['misses'] for c in collections.values())
+    return {
+        'backend': get_cache().__class__.__name__,
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None,
+        'collections': collections,
+    }
+
+
+def reset_stats():
+    with _lock:
+        _hits.clear()
+        _misses.clear()
+
+
+class CachedListMixin:
+    """
+    Serve a viewset's ``list`` from the reference cache.
+
+    Set ``reference_collection`` to the collection whose invalidation
+    covers every row the list shows. Each distinct URL (filters, ordering,
+    cursor) is cached separately.
+    """
+    reference_collection = None
+
+    def list(self, request, *args, **kwargs):
+        def load():
+            return super(CachedListMixin, self).list(request, *args, **kwargs).data
+
+        url = request.build_absolute_uri()
+        part = 'list:' + hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+        return Response(get_or_load(self.reference_collection, part, load))
+
+
+class CachedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField whose choices come from a cached id -> name map.
+
+    Unknown ids are rejected without a query, and the browsable API's
+    select box no longer loads the whole table on every render.
+    """
+
+    def __init__(self, collection, label_for=str, **kwargs):
+        self.collection = collection
+        self.label_for = label_for
+        super().__init__(**kwargs)
+
+    def names(self):
+        return display_names(self.collection, self.get_queryset(), self.label_for)
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in self.names():
+            self.fail('does_not_exist', pk_value=data)
+        return super().to_internal_value(pk)
+
+    def get_choices(self, cutoff=None):
+        items = list(self.names().items())
+        if cutoff is not None:
+            items = items[:cutoff]
+        return dict(items)
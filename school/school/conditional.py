@@ -0,0 +1,116 @@
+import hashlib
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from school import caching
+
+
+def _changed_key(model):
+    label = model if isinstance(model, str) else model._meta.label
+    return f'{caching.KEY_PREFIX}:changed:{label.lower()}'
+
+
+def last_changed(model):
+    """When a row of ``model`` was last saved or deleted, as recorded by track_changes()."""
+    key = _changed_key(model)
+    cache = caching.get_cache()
+    value = cache.get(key)
+    if value is None:
+        # Not known (a cold or cleared cache): say just now, so clients refetch once
+        cache.add(key, timezone.now(), None)
+        value = cache.get(key) or timezone.now()
+    return value
+
+
+def track_changes(sender):
+    """
+    Record the time of every save or delete of ``sender`` (a model or
+    ``'app_label.ModelName'``) for views that list it in
+    ``etag_dependencies``. Connect it from the app's ``ready()``. Like
+    school.caching, the time is set immediately and again on commit.
+    """
+    key = _changed_key(sender)
+
+    def receiver(**kwargs):
+        def stamp():
+            caching.get_cache().set(key, timezone.now(), None)
+        stamp()
+        transaction.on_commit(stamp)
+
+    uid = f'etag-changes:{sender}'
+    post_save.connect(receiver, sender=sender, weak=False, dispatch_uid=f'{uid}:save')
+    post_delete.connect(receiver, sender=sender, weak=False, dispatch_uid=f'{uid}:delete')
+
+
+class ConditionalGetMixin:
+    """
+    ETag and Last-Modified on ``list`` and ``retrieve``, computed without
+    serializing anything.
+
+    A list's validators are ``max(updated_at)`` and the row count of the
+    filtered queryset, in one aggregate query, plus the last_changed() time
+    of each model in ``etag_dependencies`` (models whose fields the
+    serializer shows, such as student names on grades), which comes from
+    the cache rather than the dependency's table. A matching
+    ``If-None-Match`` gets a 304 with no body; otherwise the view runs as
+    usual and the headers are added to its response.
+
+    Lists ignore ``If-Modified-Since``: deleting a row lowers the count but
+    not ``max(updated_at)``, so only the ETag notices.
+    """
+    etag_field = 'updated_at'
+    etag_dependencies = []
+
+    def get_etag_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validators(self, queryset):
+        """Row count and ``max(updated_at)`` of ``queryset``, and when each dependency last changed."""
+        validators = queryset.aggregate(count=Count('pk'), last_modified=Max(self.etag_field))
+        for model in self.etag_dependencies:
+            validators[f'{model._meta.label_lower}_modified'] = last_changed(model)
+        return validators
+
+    def list(self, request, *args, **kwargs):
+        validators = self.get_validators(self.get_etag_queryset())
+        return self._conditional(request, validators, use_last_modified=False,
+                                 view=lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = {self.lookup_field: kwargs[self.lookup_url_kwarg or self.lookup_field]}
+        try:
+            validators = self.get_validators(self.get_etag_queryset().filter(**lookup))
+        except (TypeError, ValueError, ValidationError):
+            validators = {'count': 0}
+        if not validators['count']:
+            # Missing or malformed; let the view produce its 404
+            return super().retrieve(request, *args, **kwargs)
+        return self._conditional(request, validators,
+                                 view=lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+    def _conditional(self, request, validators, view, use_last_modified=True):
+        # The body also depends on the URL (filters, cursor) and the renderer
+        key = repr((request.get_full_path(), request.accepted_renderer.format, sorted(validators.items())))
+        etag = quote_etag(hashlib.md5(key.encode(), usedforsecurity=False).hexdigest())
+        etag = f'W/{etag}'  # Equivalent JSON, not byte-identical
+        modified = [value for name, value in validators.items() if name.endswith('modified') and value]
+        timestamp = int(max(modified).timestamp()) if modified else None  # HTTP dates have 1s resolution
+
+        response = get_conditional_response(
+            request._request, etag=etag,
+            last_modified=timestamp if use_last_modified else None,
+        )
+        if response is None:
+            response = view()
+        if 200 <= response.status_code < 300 or response.status_code == 304:
+            response.headers['ETag'] = etag
+            # Browsers revalidate every time instead of guessing freshness, so
+            # the frontend's refetches become cheap 304s without client changes
+            response.headers['Cache-Control'] = 'private, no-cache'
+            if timestamp is not None:
+                response.headers['Last-Modified'] = http_date(timestamp)
+        return response
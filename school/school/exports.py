@@ -0,0 +1,48 @@
+import csv
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Lets DRF negotiate ``text/csv`` and the ``.csv`` format suffix.
+
+    Export actions return a StreamingHttpResponse themselves, so this
+    renderer is only used for error responses.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode(self.charset)
+
+
+class Echo:
+    """File-like object whose write() hands the line back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(filename, header, rows):
+    """
+    Stream ``rows`` as a CSV attachment one line at a time.
+
+    ``rows`` should be lazy (e.g. ``queryset.values_list(...).iterator()``)
+    so memory stays flat however large the result is.
+    """
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,160 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer side of ``?fields=`` and ``?expand=``.
+
+    The view passes the requested names in the context as ``fields`` (a set,
+    or None for all) and ``expand``. ``Meta.expandable`` maps a relation to
+    the dotted path of the serializer that replaces its id when expanded.
+    ``Meta.sparse_sources`` lists the ORM lookups a field reads when that
+    cannot be worked out from its ``source``, such as a model property.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        context = kwargs.get('context') or {}
+        for name in context.get('expand') or ():
+            self.fields[name] = import_string(self.Meta.expandable[name])(read_only=True)
+        fields = context.get('fields')
+        if fields:
+            for name in list(self.fields):
+                if name not in fields:
+                    self.fields.pop(name)
+
+    @classmethod
+    def get_expand_queryset(cls):
+        """Queryset to prefetch when this serializer is used for an expansion; None joins instead."""
+        return None
+
+
+def _field_lookups(model, field, declared):
+    """
+    ``(lookups, joins)`` that ``field`` reads, or None if they cannot be
+    known. A join without narrower lookups loads the whole related row.
+    """
+    if field.field_name in declared:
+        lookups = list(declared[field.field_name])
+        return lookups, {lookup.split('__')[0] for lookup in lookups if '__' in lookup}
+    if field.source == '*':
+        return None
+    attrs = field.source_attrs
+    try:
+        model_field = model._meta.get_field(attrs[0])
+    except FieldDoesNotExist:
+        return None
+    if not model_field.concrete or model_field.many_to_many:
+        return None
+    if len(attrs) == 1:
+        return [attrs[0]], set()
+    if not model_field.is_relation or len(attrs) > 2:
+        return None
+    try:
+        related_field = model_field.related_model._meta.get_field(attrs[1])
+    except FieldDoesNotExist:
+        related_field = None  # A property of the related row
+    if related_field is not None and related_field.concrete and not related_field.is_relation:
+        return [f'{attrs[0]}__{attrs[1]}'], {attrs[0]}
+    return [attrs[0]], {attrs[0]}
+
+
+class SparseFieldsetMixin:
+    """
+    ``?fields=id,first_name`` and ``?expand=student`` on ``list`` and
+    ``retrieve``.
+
+    ``fields`` trims the serializer output and loads only the columns those
+    fields read (``.only()``); joins are kept only for relations a remaining
+    field or an expansion needs. ``expand`` replaces a relation's id with
+    the related object. Unknown names are a 400.
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def get_sparse_params(self):
+        if not hasattr(self, '_sparse_params'):
+            self._sparse_params = self._parse_sparse_params()
+        return self._sparse_params
+
+    def _parse_sparse_params(self):
+        if self.request is None or self.action not in self.sparse_actions:
+            return None, ()
+        params = self.request.query_params
+        fields = [name.strip() for name in params.get('fields', '').split(',') if name.strip()]
+        expand = [name.strip() for name in params.get('expand', '').split(',') if name.strip()]
+        if not fields and not expand:
+            return None, ()
+
+        serializer_class = self.get_serializer_class()
+        available = set(serializer_class(context={}).fields)
+        expandable = getattr(serializer_class.Meta, 'expandable', {})
+        errors = {}
+        unknown = [name for name in fields if name not in available]
+        if unknown:
+            errors['fields'] = [f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(sorted(available))}."]
+        unknown = [name for name in expand if name not in expandable]
+        if unknown:
+            errors['expand'] = [f"Cannot expand: {', '.join(unknown)}. "
+                                f"Expandable: {', '.join(sorted(expandable)) or 'none'}."]
+        if errors:
+            raise ValidationError(errors)
+        # Asking to expand a relation implies wanting it
+        return (set(fields) | set(expand)) if fields else None, tuple(dict.fromkeys(expand))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'], context['expand'] = self.get_sparse_params()
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        fields, expand = self.get_sparse_params()
+        if not fields and not expand:
+            return queryset
+        return self.narrow_queryset(queryset, fields, expand)
+
+    def narrow_queryset(self, queryset, fields, expand):
+        serializer_class = self.get_serializer_class()
+        model = queryset.model
+        declared = getattr(serializer_class.Meta, 'sparse_sources', {})
+        serializer = serializer_class(context={'fields': fields, 'expand': ()})
+
+        columns = {model._meta.pk.name}
+        joins = set()
+        for name, field in serializer.fields.items():
+            if name in expand:
+                continue
+            reads = _field_lookups(model, field, declared)
+            if reads is None:
+                columns = None  # Some field reads something unknown; keep every column and join
+                break
+            columns.update(reads[0])
+            joins.update(reads[1])
+        if columns is not None:
+            queryset = queryset.select_related(None)
+
+        prefetches = []
+        for name in expand:
+            # The expanded serializer reads the whole related row, however
+            # other fields narrowed it, and a join would defeat a prefetch
+            joins.discard(name)
+            if columns is not None:
+                columns = {lookup for lookup in columns if not lookup.startswith(f'{name}__')}
+            expand_queryset = import_string(serializer_class.Meta.expandable[name]).get_expand_queryset()
+            if expand_queryset is None:
+                joins.add(name)
+            else:
+                prefetches.append(Prefetch(name, queryset=expand_queryset))
+            if columns is not None:
+                columns.add(name)
+
+        if joins:
+            queryset = queryset.select_related(*joins)
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        if columns is not None:
+            queryset = queryset.only(*columns)
+        return queryset
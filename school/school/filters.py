@@ -0,0 +1,87 @@
+from datetime import datetime, time, timedelta
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import models
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+
+class QueryParamFilterBackend(BaseFilterBackend):
+    """
+    Exact and range filters declared on the view as ``filter_params``, a
+    mapping of query parameter to ORM lookup::
+
+        filter_params = {
+            'student': 'student',
+            'start_date': 'date__gte',
+        }
+
+    Values are converted with the model field's ``to_python`` and checked
+    against its choices, so bad input is a 400 instead of an empty page.
+    Integers, including foreign keys, must fit the column, since an
+    out-of-range id is an overflow in the database rather than no match.
+    A date-only value for a DateTimeField covers the whole day: ``__gte``
+    starts at midnight and ``__lte`` runs up to the next midnight.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        return self.filter_with(request, queryset, getattr(view, 'filter_params', None) or {})
+
+    def filter_with(self, request, queryset, filter_params):
+        filters = {}
+        errors = {}
+        for param, lookup in filter_params.items():
+            value = request.query_params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                lookup, value = self.convert(queryset.model, lookup, value)
+            except DjangoValidationError as e:
+                errors[param] = e.messages
+                continue
+            filters[lookup] = value
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**filters)
+
+    def convert(self, model, lookup, value):
+        field = self.get_field(model, lookup)
+        if isinstance(field, models.DateTimeField):
+            try:
+                day = parse_date(value)
+            except ValueError:  # The right format but no such day, e.g. 2025-02-30
+                raise DjangoValidationError(field.error_messages['invalid_date'], code='invalid_date',
+                                            params={'value': value})
+            if day is not None and lookup.endswith('__lte'):
+                try:
+                    value = datetime.combine(day + timedelta(days=1), time.min)
+                    lookup = lookup[:-len('__lte')] + '__lt'
+                except OverflowError:  # 9999-12-31 has no next midnight
+                    value = datetime.max
+            elif day is not None:
+                value = datetime.combine(day, time.min)
+            else:
+                value = field.to_python(value)
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            return lookup, value
+
+        value = field.to_python(value)
+        column = field.target_field if field.is_relation else field
+        if isinstance(column, models.IntegerField):
+            column.run_validators(value)
+        if field.choices and value not in dict(field.flatchoices):
+            raise DjangoValidationError(f"Select a valid choice. {value} is not one of the available choices.")
+        return lookup, value
+
+    def get_field(self, model, lookup):
+        field = None
+        for part in lookup.split('__'):
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                break  # The rest is a lookup such as 'gte'
+            if field.is_relation:
+                model = field.related_model
+        return field
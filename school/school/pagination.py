@@ -0,0 +1,164 @@
+import base64
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from django.db import models
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    # Keep full precision; DjangoJSONEncoder truncates microseconds
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    Keyset pagination over every field of the ordering, not just the first.
+
+    DRF's CursorPagination only keys on the first ordering field and falls
+    back to an OFFSET for rows sharing that value, and it cannot read related
+    lookups such as ``student__last_name``. Here each ordering field becomes an
+    annotated sort key, ``pk`` is appended as a tie-breaker, and pages are
+    selected with a lexicographic ``WHERE`` so deep pages cost the same as the
+    first one.
+
+    The ordering comes from an ordering filter backend if the view has one,
+    then ``view.ordering``, then the model's ``Meta.ordering``.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    key_prefix = '_cursor_'
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        ordering = tuple(ordering)
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering += ('pk',)
+        return ordering
+
+    def get_sort_keys(self, queryset, ordering):
+        """Return ``(alias, expression, descending)`` for each ordering field."""
+        keys = []
+        for index, field in enumerate(ordering):
+            descending = field.startswith('-')
+            lookup = field.lstrip('-')
+            expression = F(lookup)
+            model_field = self._resolve_field(queryset.model, lookup)
+            if model_field is not None and model_field.null:
+                if not isinstance(model_field, (models.CharField, models.TextField)):
+                    raise NotFound(f"Cannot paginate on nullable field '{lookup}'.")
+                # NULLs sort differently per backend; compare them as ''
+                expression = Coalesce(F(lookup), Value(''))
+            keys.append((f'{self.key_prefix}{index}', expression, descending))
+        return keys
+
+    def _resolve_field(self, model, lookup):
+        if lookup == 'pk':
+            return model._meta.pk
+        field = None
+        for part in lookup.split('__'):
+            field = model._meta.get_field(part)
+            if field.is_relation:
+                model = field.related_model
+        return field
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = self.cursor if self.cursor else (False, None)
+
+        self.keys = self.get_sort_keys(queryset, self.ordering)
+        queryset = queryset.annotate(**{alias: expression for alias, expression, _ in self.keys})
+        queryset = queryset.order_by(*[
+            ('-' if descending != reverse else '') + alias
+            for alias, _, descending in self.keys
+        ])
+        if position is not None:
+            queryset = queryset.filter(self._keyset_filter(position, reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return self.page
+
+    def _keyset_filter(self, position, reverse):
+        if len(position) != len(self.keys):
+            raise NotFound(self.invalid_cursor_message)
+        # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ... with per-key direction
+        condition = Q()
+        equal = {}
+        for (alias, _, descending), value in zip(self.keys, position):
+            operator = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{alias}__{operator}': value})
+            equal[alias] = value
+        # Leading range so the planner can seek on the first sort column
+        first_alias, _, first_descending = self.keys[0]
+        operator = 'lte' if first_descending != reverse else 'gte'
+        return Q(**{f'{first_alias}__{operator}': position[0]}) & condition
+
+    def get_position(self, instance):
+        return [getattr(instance, alias) for alias, _, _ in self.keys]
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor((False, self.get_position(self.page[-1])))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            # Stepped past the end; the previous page is the start of the list
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor((True, self.get_position(self.page[0])))
+
+    def encode_cursor(self, cursor):
+        reverse, position = cursor
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        data = json.dumps(payload, default=_encode_value, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
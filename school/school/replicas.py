@@ -0,0 +1,88 @@
+from contextvars import ContextVar
+from django.conf import settings
+
+REPLICA = 'replica'
+PIN_COOKIE = 'primary_pin'
+
+# Per-request routing state: {'replica': reads may use the replica, 'wrote': a write happened}
+_state = ContextVar('replica_routing', default=None)
+
+
+def replica_enabled():
+    return getattr(settings, 'REPLICA_READS', False) and REPLICA in settings.DATABASES
+
+
+def replica_reads(view):
+    """Mark a function view as safe to serve from the replica."""
+    view.replica_reads = True
+    return view
+
+
+class PrimaryReplicaRouter:
+    """
+    Sends reads to the replica while a request marked by
+    ReplicaRoutingMiddleware is being served, and everything else to
+    default. The first write in a request pins its remaining reads to
+    default, so a request always sees its own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state and state['replica'] and not state['wrote'] and replica_enabled():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state['wrote'] = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # Same data on both aliases
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA  # Copied or replicated from default, never migrated
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serve GET and HEAD requests for designated read-heavy endpoints from the
+    replica: function views decorated with ``@replica_reads`` and viewset
+    actions listed in the viewset's ``replica_actions``.
+
+    A request that writes sets a short-lived cookie (``REPLICA_STICKY_SECONDS``)
+    that keeps the client's following requests on default until the replica
+    has caught up, so users see their own changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = {'replica': False, 'wrote': False}
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state['wrote']:
+            response.set_cookie(PIN_COOKIE, '1', max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 5),
+                                httponly=True, samesite='Lax')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        state = _state.get()
+        if (state is not None and request.method in ('GET', 'HEAD')
+                and PIN_COOKIE not in request.COOKIES and self.reads_from_replica(request, view_func)):
+            state['replica'] = True
+        return None
+
+    def reads_from_replica(self, request, view_func):
+        if getattr(view_func, 'replica_reads', False):
+            return True
+        # DRF viewsets: as_view() records the class and the method -> action map
+        view_class = getattr(view_func, 'cls', None)
+        actions = getattr(view_func, 'actions', None) or {}
+        action = actions.get(request.method.lower())
+        return action is not None and action in getattr(view_class, 'replica_actions', ())
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,8 @@ INSTALLED_APPS = [
     'subjects',
     'grades',
     'attendance',
+    'dashboard',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -55,6 +58,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     # 'django.middleware.csrf.CsrfViewMiddleware',  # Disabled for API development
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'school.replicas.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,13 +87,128 @@ WSGI_APPLICATION = 'school.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Production SQLite profile, tuned for concurrent readers and writers
+# (measure with benchmark_sqlite). Opt in with SCHOOL_DB_PROFILE=production;
+# otherwise Django's defaults are used:
+# - WAL lets readers carry on while a write transaction is open
+# - synchronous=NORMAL only syncs at checkpoints; safe from corruption in WAL mode
+# - busy_timeout waits up to 5s for the write lock instead of failing
+#   with "database is locked"
+# - mmap_size and cache_size (negative means KiB) keep hot pages in memory
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    'cache_size': -32 * 1024,
+}
+
+SQLITE_OPTIONS = {
+    'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+    # atomic() takes the write lock up front with BEGIN IMMEDIATE. A deferred
+    # transaction that reads first and then writes cannot wait for the lock;
+    # it fails immediately when another writer got there in between.
+    'transaction_mode': 'IMMEDIATE',
+    'timeout': 5,
+}
+
+SQLITE_PROFILES = {
+    # Django's SQLite backend and defaults: rollback journal, deferred transactions
+    'default': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+    'production': {
+        # Django's SQLite backend, with writers queued in-process (see its
+        # docstring). Every write, including a whole atomic gradebook import,
+        # holds the one write lock until it commits; other writers wait up to
+        # the 5s timeout and then fail with "database is locked".
+        'ENGINE': 'school.backends.sqlite3',
+        'OPTIONS': SQLITE_OPTIONS,
+        # Reused across requests and the async views' worker threads for up
+        # to a minute, so a page doesn't pay for connecting (and the pragmas
+        # in init_command) once per query
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+}
+
+DB_PROFILE = os.environ.get('SCHOOL_DB_PROFILE', 'default')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **SQLITE_PROFILES[DB_PROFILE],
+    },
+    # Read replica for the endpoints ReplicaRoutingMiddleware routes to it.
+    # Locally, `manage.py sync_replica` copies db.sqlite3 here; with Postgres,
+    # point this at a hot standby. Read-only, so Django's plain backend.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'OPTIONS': {
+            # read_uncommitted only matters for the shared-cache in-memory
+            # database tests use, where this alias mirrors default
+            'init_command': 'PRAGMA query_only=1;PRAGMA read_uncommitted=1',
+            'timeout': 5,
+        },
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['school.replicas.PrimaryReplicaRouter']
+
+# Serve the replica-marked endpoints from 'replica'. Off until a replica exists.
+REPLICA_READS = False
+# After a write, keep the client on default for this long (replication lag)
+REPLICA_STICKY_SECONDS = 5
+
+# Threads (and database connections) shared by the async views' concurrent queries
+ASYNC_QUERY_WORKERS = 8
+
+# Threads checking and hashing passwords for login and registration, and
+# how many more requests may wait for one before the rest get a 503. Keep
+# the workers below the core count so a login burst leaves cores free.
+PASSWORD_HASH_WORKERS = 2
+PASSWORD_HASH_QUEUE = 32
+
+# Processes rendering report cards in report-card jobs (None: one per CPU).
+# Downloads from GET /api/grades/report-cards/ render in the web process.
+REPORT_CARD_WORKERS = None
+
+# Background jobs (jobs app), run by `manage.py runworker`
+JOBS_CONCURRENCY = 2  # Jobs a worker runs at once
+JOBS_POLL_INTERVAL = 1.0  # Seconds between looks at an empty queue
+JOBS_RETRY_DELAY = 30  # Seconds before the first retry; doubles each attempt
+JOBS_HEARTBEAT_INTERVAL = 30
+# A running job not heartbeated for this long lost its worker and is requeued
+JOBS_STALE_AFTER = 5 * 60
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory needs no external service. With several worker processes use
+# 'django.core.cache.backends.filebased.FileBasedCache' and a shared
+# directory as LOCATION so invalidations reach every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'school',
     }
 }
 
+# Subjects, classes and users served from school.caching
+REFERENCE_CACHE_ALIAS = 'default'
+REFERENCE_CACHE_TIMEOUT = 60 * 60
+
+# In-process typeahead indexes (school.autocomplete). Larger tables are
+# searched in the database instead; other processes' edits show up once an
+# index is older than MAX_AGE seconds and is rebuilt.
+AUTOCOMPLETE_MAX_ROWS = 50_000  # About 0.6 KB and 12 µs of build time per row
+AUTOCOMPLETE_MAX_AGE = 5 * 60
+
+
+# Log in with a username or an email address (any case)
+AUTHENTICATION_BACKENDS = ['students.backends.UsernameOrEmailBackend']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -127,6 +246,10 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Uploaded and generated files (job inputs and outputs)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -169,6 +292,15 @@ REST_FRAMEWORK = {
         'rest_framework.parsers.FormParser',
         'rest_framework.parsers.MultiPartParser',
     ],
+    # Keyset pagination on each model's Meta.ordering; override with ?page_size=
+    'DEFAULT_PAGINATION_CLASS': 'school.pagination.KeysetCursorPagination',
+    'PAGE_SIZE': 50,
+    # students.throttles; counted in the default cache
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '120/min',  # A whole school may share one address
+        'login_account': '10/min',
+        'register_ip': '30/min',
+    },
 }
 
 # JWT settings
@@ -204,4 +336,13 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
-}
\ No newline at end of file
+
+    # Refreshing re-reads the profile claims (students.tokens)
+    'TOKEN_REFRESH_SERIALIZER': 'students.tokens.ProfileTokenRefreshSerializer',
+}
+
+# students.authentication: stateless JWT users for the API viewsets. Each
+# process reloads its deny-list of deactivated users this often (and when
+# one changes), and keeps full User rows for stale-claim tokens this long.
+JWT_DENY_LIST_TTL = 60
+JWT_USER_CACHE_TTL = 60
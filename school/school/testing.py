@@ -0,0 +1,152 @@
+import shutil
+import tempfile
+from datetime import date, timedelta
+from itertools import count
+from django.db import connection, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+_sequence = count(1)
+
+
+def make_class(**kwargs):
+    from classes.models import Class
+    n = next(_sequence)
+    kwargs.setdefault('class_name', f'Class {n}')
+    kwargs.setdefault('grade_level', 'Grade 1')
+    kwargs.setdefault('academic_year', '2025-2026')
+    return Class.objects.create(**kwargs)
+
+
+def make_student(**kwargs):
+    from students.models import Student
+    n = next(_sequence)
+    kwargs.setdefault('student_id', f'S{n:05d}')
+    kwargs.setdefault('first_name', f'First{n}')
+    kwargs.setdefault('last_name', f'Last{n}')
+    kwargs.setdefault('email', f'student{n}@example.com')
+    return Student.objects.create(**kwargs)
+
+
+def make_subject(**kwargs):
+    from subjects.models import Subject
+    n = next(_sequence)
+    kwargs.setdefault('subject_code', f'SUB{n}')
+    kwargs.setdefault('subject_name', f'Subject {n}')
+    return Subject.objects.create(**kwargs)
+
+
+def make_grade(**kwargs):
+    from grades.models import Grade
+    n = next(_sequence)
+    if 'student' not in kwargs:
+        kwargs['student'] = make_student()
+    if 'subject' not in kwargs:
+        kwargs['subject'] = make_subject()
+    if 'class_id' not in kwargs:
+        kwargs['class_id'] = make_class()
+    kwargs.setdefault('grade_value', 80)
+    kwargs.setdefault('grade_type', 'quiz')
+    kwargs.setdefault('title', f'Quiz {n}')
+    kwargs.setdefault('graded_at', timezone.now())
+    return Grade.objects.create(**kwargs)
+
+
+def make_teacher(**kwargs):
+    from django.contrib.auth.models import User
+    n = next(_sequence)
+    kwargs.setdefault('is_staff', True)
+    return User.objects.create_user(f'teacher{n}', f'teacher{n}@example.com', **kwargs)
+
+
+def make_attendance(**kwargs):
+    from attendance.models import Attendance
+    n = next(_sequence)
+    if 'student' not in kwargs:
+        kwargs['student'] = make_student()
+    if 'class_name' not in kwargs:
+        kwargs['class_name'] = make_class()
+    kwargs.setdefault('date', date(2025, 1, 1) + timedelta(days=n))
+    kwargs.setdefault('status', 'present')
+    return Attendance.objects.create(**kwargs)
+
+
+class QueryBudgetMixin:
+    """
+    Assertions for TestCase subclasses that catch N+1 queries on endpoints.
+
+    ``assertQueriesConstant`` requests ``url`` once with a few rows and again
+    after more rows were added; a serializer that lazily loads a relation per
+    row makes the second request issue more queries and fails the test.
+    """
+
+    def count_queries(self, url, **extra):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(context.captured_queries), context
+
+    def assertQueriesConstant(self, url, make_row, small=2, large=10, budget=None):
+        for _ in range(small):
+            make_row()
+        baseline, _ = self.count_queries(url)
+        for _ in range(large - small):
+            make_row()
+        queries, context = self.count_queries(url)
+        executed = '\n'.join(query['sql'] for query in context.captured_queries)
+        self.assertEqual(
+            queries, baseline,
+            f"{url} ran {baseline} queries for {small} rows but {queries} for "
+            f"{large} rows:\n{executed}"
+        )
+        if budget is not None:
+            self.assertLessEqual(
+                queries, budget,
+                f"{url} ran {queries} queries, over its budget of {budget}:\n{executed}"
+            )
+
+
+class IndexUsageMixin:
+    """Assertions that check the database planner picks a given index."""
+
+    def assertUsesIndex(self, queryset, index_name):
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Test tables are tiny; keep the planner from preferring a seq scan
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        self.assertIn(index_name, plan, f"Expected {index_name} in the plan for:\n{queryset.query}\n{plan}")
+
+
+class ReferenceCacheMixin:
+    """
+    Start each test with an empty reference cache, zeroed counters,
+    unbuilt autocomplete indexes and forgotten token-authentication state.
+
+    These outlive the per-test transaction, so without this a list cached
+    in one test could show rows another test rolled back.
+    """
+
+    def setUp(self):
+        from school import autocomplete, caching
+        from students import authentication
+        super().setUp()
+        caching.get_cache().clear()
+        caching.reset_stats()
+        autocomplete.reset()
+        authentication.deny_list.reset()
+        authentication.users.clear()
+
+
+class TemporaryMediaMixin:
+    """Store uploaded and generated files in a directory removed after each test."""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
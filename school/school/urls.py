@@ -17,18 +17,26 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from classes.api_views import ClassViewSet
-from students.api_views import StudentViewSet
+from classes.api_views import ClassViewSet, class_report
+from jobs.api_views import JobViewSet
+from school.autocomplete import autocomplete
+from students.api_views import StudentViewSet, student_overview
 
 router = DefaultRouter()
 router.register(r'classes', ClassViewSet)
 router.register(r'students', StudentViewSet)
+router.register(r'jobs', JobViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/auth/', include('students.auth_urls')),
+    # Async composite views; they run their queries concurrently under ASGI
+    path('api/students/<int:pk>/overview/', student_overview, name='student_overview'),
+    path('api/classes/<int:pk>/report/', class_report, name='class_report'),
     path('api/', include(router.urls)),
     path('api/subjects/', include('subjects.api_urls')),
     path('api/grades/', include('grades.api_urls')),
     path('api/attendance/', include('attendance.api_urls')),
+    path('api/dashboard/', include('dashboard.api_urls')),
+    path('api/autocomplete/<str:name>/', autocomplete, name='autocomplete'),
 ]
\ No newline at end of file
@@ -1,11 +1,12 @@
 from django.contrib import admin
 from .models import Student
+from .search import filter_matching
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ['student_id', 'first_name', 'last_name', 'email', 'enrollment_date', 'status']
     list_filter = ['status', 'enrollment_date', 'gender']
-    search_fields = ['student_id', 'first_name', 'last_name', 'email']
+    search_fields = ['student_id', 'first_name', 'last_name', 'email']  # Searched through students.search
     ordering = ['last_name', 'first_name']
     fieldsets = (
         ('Personal Information', {
@@ -22,3 +23,7 @@ class StudentAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        # The full-text index instead of icontains over search_fields
+        return filter_matching(queryset, search_term), False
@@ -1,19 +1,83 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.filters import OrderingFilter
+from django.db.models import Sum
 from django.shortcuts import get_object_or_404
+from django.views.decorators.http import require_safe
+from attendance.api_views import stats_row
+from attendance.models import Attendance, StudentMonthlyAttendance
+from attendance.rollups import STATUSES
+from grades.api_views import summary_row
+from grades.models import Grade
+from school.async_views import gather_queries, json_response
+from school.replicas import replica_reads
+from school.conditional import ConditionalGetMixin
+from school.fieldsets import SparseFieldsetMixin
+from school.filters import QueryParamFilterBackend
+from .authentication import API_AUTHENTICATION_CLASSES
 from .models import Student
+from .search import search_ids, terms
 from .serializers import StudentSerializer
 
-class StudentViewSet(viewsets.ModelViewSet):
+RECENT_ITEMS = 10
+SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+class StudentViewSet(ConditionalGetMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    """
+    Students, by last then first name.
+
+    Filters (served by the (status, class_enrolled) index on Student):
+    - `status`: active, inactive, graduated or transferred
+    - `class_enrolled`: class id
+
+    Order with `?ordering=` on last_name, first_name, student_id, enrollment_date or status.
+    `?fields=id,first_name,last_name` suits pickers; `?expand=class_enrolled` nests the class.
+    Ranked full-text search is at `search/?q=`.
+    """
     queryset = Student.objects.all()
     serializer_class = StudentSerializer
+    authentication_classes = API_AUTHENTICATION_CLASSES  # Users from token claims, no query
     permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    filter_backends = [QueryParamFilterBackend, OrderingFilter]
+    filter_params = {
+        'status': 'status',
+        'class_enrolled': 'class_enrolled',
+    }
+    ordering_fields = ['last_name', 'first_name', 'student_id', 'enrollment_date', 'status']
+
+    @action(detail=False)
+    def search(self, request):
+        """
+        Students matching `?q=`, best match first, from the full-text index.
+
+        Every word must match the start of a word in a student's id, name or
+        email (`jo sm` finds John Smith). `?limit=` caps the results (default
+        20, at most 100).
+        """
+        query = request.query_params.get('q', '')
+        errors = {}
+        if not terms(query):
+            errors['q'] = ['Enter at least one letter or digit to search for.']
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_LIMIT))
+            if limit < 1:
+                raise ValueError
+        except ValueError:
+            errors['limit'] = ['Enter a positive whole number.']
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.get_queryset()
+        ids = search_ids(query, min(limit, MAX_SEARCH_LIMIT), using=queryset.db)
+        students = queryset.in_bulk(ids)
+        return Response(self.get_serializer([students[pk] for pk in ids if pk in students], many=True).data)
 
     @action(detail=True, methods=['get'])
     def grades(self, request, pk=None):
         student = self.get_object()
-        grades = student.grade_set.all()
+        grades = student.grade_set.select_related('subject')
         # You can create a grade serializer here if needed
         grades_data = [{
             'id': grade.id,
@@ -22,14 +86,14 @@ class StudentViewSet(viewsets.ModelViewSet):
             'max_grade': grade.max_grade,
             'grade_type': grade.grade_type,
             'title': grade.title,
-            'graded_date': grade.graded_date
+            'graded_at': grade.graded_at
         } for grade in grades]
         return Response(grades_data)
 
     @action(detail=True, methods=['get'])
     def attendance(self, request, pk=None):
         student = self.get_object()
-        attendance_records = student.attendance_set.all()
+        attendance_records = student.attendance_set.select_related('class_name')
         attendance_data = [{
             'id': record.id,
             'class_name': record.class_name.class_name,
@@ -38,4 +102,49 @@ class StudentViewSet(viewsets.ModelViewSet):
             'check_in_time': record.check_in_time,
             'check_out_time': record.check_out_time
         } for record in attendance_records]
-        return Response(attendance_data)
\ No newline at end of file
+        return Response(attendance_data)
+
+
+def _student_profile(pk):
+    student = Student.objects.select_related('class_enrolled').filter(pk=pk).first()
+    if student is None:
+        return None
+    data = StudentSerializer(student).data
+    data['class_name'] = student.class_enrolled.class_name if student.class_enrolled else None
+    return data
+
+
+@replica_reads
+@require_safe
+async def student_overview(request, pk):
+    """
+    Everything about one student in one response: profile, grade averages
+    overall and per subject, attendance totals, and the latest grades and
+    attendance records. The six queries run concurrently.
+    """
+    grades = Grade.objects.filter(student=pk)
+    attendance = Attendance.objects.filter(student=pk)
+    results = await gather_queries(
+        student=lambda: _student_profile(pk),
+        overall=lambda: grades.summary()[0],
+        subjects=lambda: list(grades.summary(['subject'])),
+        recent_grades=lambda: list(grades.values(
+            'id', 'subject__subject_name', 'title', 'grade_type', 'grade_value', 'max_grade', 'graded_at',
+        )[:RECENT_ITEMS]),
+        attendance=lambda: StudentMonthlyAttendance.objects.filter(student=pk).aggregate(
+            **{status: Sum(status, default=0) for status in STATUSES}
+        ),
+        recent_attendance=lambda: list(attendance.values(
+            'id', 'class_name__class_name', 'date', 'status', 'check_in_time', 'check_out_time',
+        )[:RECENT_ITEMS]),
+    )
+    if results['student'] is None:
+        return json_response({'detail': 'No Student matches the given query.'}, status=404)
+    return json_response({
+        'student': results['student'],
+        'grades': summary_row(results['overall']),
+        'subjects': [summary_row(row) for row in results['subjects']],
+        'recent_grades': results['recent_grades'],
+        'attendance': stats_row(results['attendance']),
+        'recent_attendance': results['recent_attendance'],
+    })
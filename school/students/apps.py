@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'students'
+
+    def ready(self):
+        from school import autocomplete
+        from school.conditional import track_changes
+        from . import signals  # noqa: F401
+        from .search import filter_matching
+        track_changes('students.Student')  # Names on grades and attendance, class enrollment counts
+        # Large schools outgrow the in-memory index; the full-text index takes over
+        autocomplete.register(
+            'students', 'students.Student', ['student_id', 'first_name', 'last_name'],
+            label='{student_id} - {first_name} {last_name}'.format_map, fallback=filter_matching,
+        )
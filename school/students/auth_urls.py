@@ -1,6 +1,6 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from .auth_views import RegisterView, login_view, logout_view, user_profile
+from .auth_views import login_view, register_view, logout_view, user_profile
 from django.contrib.auth.models import User
 from rest_framework import viewsets, permissions
 from rest_framework.response import Response
@@ -21,7 +21,7 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(user_data)
 
 urlpatterns = [
-    path('register/', RegisterView.as_view(), name='auth_register'),
+    path('register/', register_view, name='auth_register'),
     path('login/', login_view, name='auth_login'),
     path('logout/', logout_view, name='auth_logout'),
     path('profile/', user_profile, name='auth_profile'),
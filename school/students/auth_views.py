@@ -1,98 +1,153 @@
-from rest_framework import status, generics
+import json
+import math
+import time
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth.models import User
+from django.conf import settings
 from django.contrib.auth import authenticate
-from .auth_serializers import UserRegistrationSerializer, UserLoginSerializer, CustomTokenObtainPairSerializer
+from django.db import transaction
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_http_methods, require_POST
+from school.async_views import BoundedPool, PoolSaturated, json_response
+from . import tokens
+from .authentication import API_AUTHENTICATION_CLASSES
+from .auth_serializers import UserRegistrationSerializer, UserLoginSerializer
+from .throttles import LoginAccountThrottle, LoginIPThrottle, RegisterIPThrottle
 
-class RegisterView(generics.CreateAPIView):
-    queryset = User.objects.all()
-    serializer_class = UserRegistrationSerializer
-    permission_classes = [AllowAny]
-    http_method_names = ['get', 'post']
+# Threads that check and hash passwords; see login_view
+PASSWORD_HASHING = BoundedPool(
+    workers=getattr(settings, 'PASSWORD_HASH_WORKERS', 2),
+    queue=getattr(settings, 'PASSWORD_HASH_QUEUE', 32),
+    name='password-hash',
+)
 
-    def get(self, request, *args, **kwargs):
-        serializer = self.get_serializer()
-        return Response(serializer.data)
 
-    def create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+def _session_response(user, message, read_at):
+    refresh = tokens.ProfileRefreshToken.for_user(user, read_at)
+    return {
+        'message': message,
+        'user': {
+            'id': user.id,
+            'username': user.username,
+            'email': user.email,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+        },
+        'tokens': {
+            'access': str(refresh.access_token),
+            'refresh': str(refresh),
+        }
+    }
 
+
+def _request_data(request):
+    """The JSON or form body of a plain Django request; None if the JSON is malformed."""
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+def _throttled(request, *throttles):
+    """A 429 response if any of ``throttles`` refuses the request, else None."""
+    waits = [throttle.wait() for throttle in throttles if not throttle.allow_request(request, None)]
+    if not waits:
+        return None
+    wait = max((wait for wait in waits if wait is not None), default=None)
+    response = json_response({'detail': exceptions.Throttled(wait).detail},
+                             status=status.HTTP_429_TOO_MANY_REQUESTS)
+    if wait is not None:
+        response['Retry-After'] = str(math.ceil(wait))
+    return response
+
+
+def _saturated():
+    response = json_response({'detail': 'Too many sign-ins in progress; try again shortly.'},
+                             status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    response['Retry-After'] = '1'
+    return response
+
+
+def _login(request, username, password):
+    # Before the user is read: a change committed during the hash is newer than the claims
+    read_at = time.time()
+    # Username or email, fetched once (students.backends)
+    user = authenticate(request, username=username, password=password)
+    return _session_response(user, 'Login successful', read_at) if user else None
+
+
+@csrf_exempt
+@require_POST
+async def login_view(request):
+    """
+    Log in with a username or email and a password; returns the user and a
+    JWT pair.
+
+    Password checks run on PASSWORD_HASHING, a few threads of their own, so
+    a burst of logins cannot take every server thread or core: once its
+    queue is full this answers 503 straight away. Attempts are also limited
+    per client IP and per account (429).
+    """
+    data = _request_data(request)
+    if data is None:
+        return json_response({'detail': 'Malformed JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+    serializer = UserLoginSerializer(data=data)
+    if not serializer.is_valid():
+        return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    username = serializer.validated_data['username']
+    password = serializer.validated_data['password']
+
+    account_throttle = await sync_to_async(LoginAccountThrottle.for_login)(username)
+    throttled = _throttled(request, LoginIPThrottle(), account_throttle)
+    if throttled:
+        return throttled
+    try:
+        body = await PASSWORD_HASHING.run(_login, request, username, password)
+    except PoolSaturated:
+        return _saturated()
+    if body is None:
+        return json_response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
+    return json_response(body)
+
+
+def _register(data):
+    serializer = UserRegistrationSerializer(data=data)
+    if not serializer.is_valid():
+        return None, serializer.errors
+    read_at = time.time()
+    with transaction.atomic():  # The user and their student profile, or neither
         user = serializer.save()
+    return _session_response(user, 'User registered successfully', read_at), None
 
-        # Generate tokens for the new user
-        refresh = RefreshToken.for_user(user)
-        access_token = str(refresh.access_token)
-        refresh_token = str(refresh)
-
-        return Response({
-            'message': 'User registered successfully',
-            'user': {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-            },
-            'tokens': {
-                'access': access_token,
-                'refresh': refresh_token,
-            }
-        }, status=status.HTTP_201_CREATED)
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def login_view(request):
-    serializer = UserLoginSerializer(data=request.data)
-
-    if serializer.is_valid():
-        username = serializer.validated_data['username']
-        password = serializer.validated_data['password']
-
-        # Allow login with either username or email
-        user = None
-        if '@' in username:
-            # If it looks like an email, try to find user by email
-            try:
-                from django.contrib.auth.models import User
-                user_obj = User.objects.get(email=username)
-                user = authenticate(username=user_obj.username, password=password)
-            except User.DoesNotExist:
-                user = None
-        else:
-            # Try to authenticate with username
-            user = authenticate(username=username, password=password)
-
-        if user:
-            # Generate tokens
-            refresh = RefreshToken.for_user(user)
-            access_token = str(refresh.access_token)
-            refresh_token = str(refresh)
-
-            return Response({
-                'message': 'Login successful',
-                'user': {
-                    'id': user.id,
-                    'username': user.username,
-                    'email': user.email,
-                    'first_name': user.first_name,
-                    'last_name': user.last_name,
-                },
-                'tokens': {
-                    'access': access_token,
-                    'refresh': refresh_token,
-                }
-            })
-        else:
-            return Response(
-                {'error': 'Invalid credentials'},
-                status=status.HTTP_401_UNAUTHORIZED
-            )
-
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+async def register_view(request):
+    """
+    GET lists the registration fields; POST creates a user and their
+    student profile and returns a JWT pair. The new password is hashed on
+    PASSWORD_HASHING as in login_view, and registrations are limited per IP.
+    """
+    if request.method == 'GET':
+        return json_response(UserRegistrationSerializer().data)
+    data = _request_data(request)
+    if data is None:
+        return json_response({'detail': 'Malformed JSON.'}, status=status.HTTP_400_BAD_REQUEST)
+    throttled = _throttled(request, RegisterIPThrottle())
+    if throttled:
+        return throttled
+    try:
+        body, errors = await PASSWORD_HASHING.run(_register, data)
+    except PoolSaturated:
+        return _saturated()
+    if errors:
+        return json_response(errors, status=status.HTTP_400_BAD_REQUEST)
+    return json_response(body, status=status.HTTP_201_CREATED)
 
 @api_view(['POST'])
 def logout_view(request):
@@ -107,41 +162,29 @@ def logout_view(request):
         return Response({'error': 'Logout failed'}, status=status.HTTP_400_BAD_REQUEST)
 
 @api_view(['GET'])
+@authentication_classes(API_AUTHENTICATION_CLASSES)  # Users from token claims, no query
 def user_profile(request):
+    """
+    The signed-in user's profile, read from the access token's claims while
+    they are current (students.tokens) and from the database otherwise.
+    """
     user = request.user
-    if user.is_authenticated:
-        # Get student profile if it exists
-        try:
-            from .models import Student
-            student = Student.objects.get(user=user)
-            role = 'student'
-            profile_data = {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'student_id': student.student_id,
-                'date_of_birth': student.date_of_birth,
-                'gender': student.gender,
-                'role': role,
-            }
-        except Student.DoesNotExist:
-            # Determine role based on user permissions
-            if user.is_superuser:
-                role = 'admin'
-            elif user.is_staff:
-                role = 'teacher'
-            else:
-                role = 'teacher'  # Default for non-student users
-            profile_data = {
-                'id': user.id,
-                'username': user.username,
-                'email': user.email,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'role': role,
-            }
-        return Response(profile_data)
-    else:
-        return Response({'error': 'Not authenticated'}, status=status.HTTP_401_UNAUTHORIZED)
\ No newline at end of file
+    if not user.is_authenticated:
+        return Response({'error': 'Not authenticated'}, status=status.HTTP_401_UNAUTHORIZED)
+    claims = tokens.current_claims(request.auth) or tokens.profile_claims(user)
+    profile_data = {
+        'id': user.id,
+        'username': claims['username'],
+        'email': claims['email'],
+        'first_name': claims['first_name'],
+        'last_name': claims['last_name'],
+    }
+    if claims['role'] == 'student':
+        profile_data.update({
+            'student': claims['student'],
+            'student_id': claims['student_id'],
+            'date_of_birth': claims['date_of_birth'],
+            'gender': claims['gender'],
+        })
+    profile_data['role'] = claims['role']
+    return Response(profile_data)
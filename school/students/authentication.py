@@ -0,0 +1,133 @@
+"""
+Stateless JWT authentication for the API viewsets.
+
+StatelessJWTAuthentication trusts the claims students.tokens signs into
+access tokens instead of loading the User row on every request:
+``request.user`` is a ClaimsUser built from the token. Two lookups keep it
+honest without a query per request:
+
+- A deny-list of deactivated users, loaded once and kept per process. It
+  is reloaded every JWT_DENY_LIST_TTL seconds, and at once when a user's
+  ``is_active`` changes: the change bumps a version in the default cache
+  that every process compares on each request.
+- Tokens whose claims are stale (see students.tokens) get the real User,
+  from an in-process cache kept for JWT_USER_CACHE_TTL seconds.
+
+Views opt in with ``authentication_classes = API_AUTHENTICATION_CLASSES``.
+Deactivate users rather than deleting them: a deleted user's tokens stay
+valid until they expire.
+"""
+import threading
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from .tokens import current_claims
+
+DENY_LIST_VERSION_KEY = 'jwt-deny-list-version'
+
+
+class ClaimsUser(TokenUser):
+    """TokenUser whose id is an int like User's, so it compares and joins the same."""
+
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def pk(self):
+        return self.id
+
+
+class DenyList:
+    """Ids of deactivated users, reloaded when stale (see the module docstring)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = frozenset()
+        self._loaded_at = None
+        self._version = None
+
+    def __contains__(self, user_id):
+        version = cache.get(DENY_LIST_VERSION_KEY)
+        ttl = getattr(settings, 'JWT_DENY_LIST_TTL', 60)
+        with self._lock:
+            if self._loaded_at is None or version != self._version or time.monotonic() - self._loaded_at > ttl:
+                self._ids = frozenset(
+                    get_user_model()._default_manager.filter(is_active=False).values_list('pk', flat=True)
+                )
+                self._loaded_at = time.monotonic()
+                self._version = version
+            return user_id in self._ids
+
+    def changed(self):
+        """Make every process reload the list on its next request."""
+        cache.set(DENY_LIST_VERSION_KEY, time.time(), None)
+
+    def reset(self):
+        with self._lock:
+            self._loaded_at = None
+
+
+class UserCache:
+    """Recently used User rows by pk, for JWT_USER_CACHE_TTL seconds."""
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._users = {}  # pk -> (expires, user or None)
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        user = get_user_model()._default_manager.filter(pk=user_id).first()
+        with self._lock:
+            if len(self._users) >= self.max_size:
+                self._users = {pk: entry for pk, entry in self._users.items() if entry[0] > now}
+                if len(self._users) >= self.max_size:
+                    del self._users[next(iter(self._users))]  # The oldest
+            self._users[user_id] = (now + getattr(settings, 'JWT_USER_CACHE_TTL', 60), user)
+        return user
+
+    def discard(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+
+
+deny_list = DenyList()
+users = UserCache()
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """JWTAuthentication that reads the user from the token's claims rather than the database."""
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken('Token contained no recognizable user identification')
+        user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        if user_id in deny_list:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if current_claims(validated_token) is not None:
+            return ClaimsUser(validated_token)
+        # Claims from before a profile change or another claims version
+        user = users.get(user_id)
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        return user
+
+
+API_AUTHENTICATION_CLASSES = [StatelessJWTAuthentication, SessionAuthentication, BasicAuthentication]
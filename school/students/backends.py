@@ -0,0 +1,52 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+# Functional index on LOWER(auth_user.email), created by migration 0008
+EMAIL_INDEX = 'auth_user_email_lower_idx'
+
+_ASCII_LOWER = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def lower_like_database(text, using='default'):
+    """``text`` lowercased the way the database's LOWER() would: SQLite's only knows ASCII."""
+    if connections[using].vendor == 'sqlite':
+        return text.translate(_ASCII_LOWER)
+    return text.lower()
+
+
+def users_matching(login):
+    """
+    Users whose username is ``login`` or, when it looks like an address,
+    whose email is ``login`` ignoring case: one query, through the username
+    and lowercase-email indexes.
+    """
+    users = get_user_model()._default_manager.all()
+    if '@' not in login:
+        return users.filter(username=login)
+    # Filtering on the aliased expression repeats the index's LOWER(email)
+    return users.alias(email_lower=Lower('email')).filter(
+        Q(username=login) | Q(email_lower=lower_like_database(login, users.db))
+    )
+
+
+class UsernameOrEmailBackend(ModelBackend):
+    """Authenticate with a username or an email address."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(get_user_model().USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        # A username match first; emails are not unique, so try each holder
+        candidates = sorted(users_matching(username), key=lambda user: user.username != username)
+        if not candidates:
+            # Hash anyway, so unknown logins take as long as wrong passwords
+            get_user_model()().set_password(password)
+            return None
+        for user in candidates:
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        return None
@@ -0,0 +1,124 @@
+import asyncio
+import json
+import logging
+import statistics
+import time
+from collections import Counter
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.asgi import get_asgi_application
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from attendance.management.commands.benchmark_sqlite import PROFILES, scratch_database
+from school.async_views import BoundedPool
+from students import auth_views
+from subjects.models import Subject
+
+PASSWORD = 'benchmark password'
+
+
+class Command(BaseCommand):
+    help = ('Measure the latency of an ordinary API endpoint while a burst of logins hashes '
+            'passwords, with the bounded hashing pool and with every login hashing at once. '
+            'Requests go straight to the ASGI application on a scratch database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=40, help='Logins in the burst')
+        parser.add_argument('--quiet-seconds', type=float, default=2, help='Probing before the burst')
+        parser.add_argument('--probe', default='/api/subjects/', help='Endpoint timed throughout')
+
+    def handle(self, *args, **options):
+        scenarios = {
+            'bounded': (settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE),
+            # What a threaded server did before: every login hashing at once
+            'unbounded': (options['logins'], 0),
+        }
+        application = get_asgi_application()
+        logging.getLogger('django.request').setLevel(logging.ERROR)  # Expected 503s aren't news
+        with scratch_database(PROFILES['production']):
+            self.seed(options['logins'])
+            for name, (workers, queue) in scenarios.items():
+                cache.clear()  # Throttle history
+                auth_views.PASSWORD_HASHING = BoundedPool(workers, queue, f'bench-{name}')
+                results = asyncio.run(self.run(application, options))
+                self.report(f'{name} ({workers} hashing thread(s), queue {queue})', results)
+
+    def seed(self, logins):
+        Subject.objects.bulk_create(
+            Subject(subject_code=f'B{n}', subject_name=f'Bench {n}') for n in range(20)
+        )
+        password = make_password(PASSWORD)  # Hashed once; every account shares it
+        User.objects.bulk_create(
+            User(username=f'bench{n}', email=f'bench{n}@example.com', password=password) for n in range(logins)
+        )
+
+    async def run(self, application, options):
+        probes = {'quiet': [], 'burst': []}
+        phase = 'quiet'
+        done = asyncio.Event()
+
+        async def probe():
+            while not done.is_set():
+                _, latency = await request(application, 'GET', options['probe'])
+                probes[phase].append(latency)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        await asyncio.sleep(options['quiet_seconds'])
+        phase = 'burst'
+        started = time.perf_counter()
+        logins = await asyncio.gather(*(
+            request(application, 'POST', '/api/auth/login/',
+                    {'username': f'bench{n}', 'password': PASSWORD}, client=f'10.0.{n // 250}.{n % 250}')
+            for n in range(options['logins'])
+        ))
+        burst = time.perf_counter() - started
+        done.set()
+        await prober
+        return {'probes': probes, 'logins': logins, 'burst': burst}
+
+    def report(self, name, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        for phase, latencies in results['probes'].items():
+            self.stdout.write(f'  {phase:5} probe: {summary(latencies)}')
+        statuses = Counter(status for status, _ in results['logins'])
+        succeeded = [latency for status, latency in results['logins'] if status == 200]
+        self.stdout.write(f"  logins: {dict(sorted(statuses.items()))} in {results['burst']:.1f}s; "
+                          f'successful ones {summary(succeeded)}')
+
+
+def summary(latencies):
+    if not latencies:
+        return 'none'
+    quantiles = statistics.quantiles(latencies, n=100, method='inclusive') if len(latencies) > 1 else latencies * 99
+    return (f'n={len(latencies)} p50 {quantiles[49] * 1000:.1f} ms, p99 {quantiles[98] * 1000:.1f} ms, '
+            f'max {max(latencies) * 1000:.1f} ms')
+
+
+async def request(application, method, path, data=None, client='127.0.0.1'):
+    """``(status, seconds)`` for one request sent straight to the ASGI application."""
+    body = json.dumps(data).encode() if data is not None else b''
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+        'method': method, 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'content-type', b'application/json'),
+                    (b'content-length', str(len(body)).encode())],
+        'client': (client, 50000), 'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = None
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()  # The client never disconnects
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    started = time.perf_counter()
+    await application(scope, receive, send)
+    return status, time.perf_counter() - started
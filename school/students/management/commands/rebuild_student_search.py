@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from students import search
+
+
+class Command(BaseCommand):
+    help = ('Refill the student search index from the students table, e.g. after '
+            'bulk_create() or queryset.update(), which skip the signals that maintain it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if not search.uses_index(options['database']):
+            self.stdout.write('This database indexes students itself; nothing to rebuild')
+            return
+        search.rebuild(using=options['database'])
+        self.stdout.write(self.style.SUCCESS('Rebuilt the student search index'))
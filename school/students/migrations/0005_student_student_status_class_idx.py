@@ -0,0 +1,20 @@
+# Generated by Django 5.1.2 on 2026-10-18 02:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classes', '0001_initial'),
+        ('students', '0004_student_class_enrolled'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['status', 'class_enrolled'], name='student_status_class_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+FTS_TABLE = 'students_student_fts'
+PG_INDEX = 'student_search_idx'
+# Keep in step with students.search.PG_DOCUMENT
+PG_DOCUMENT = (
+    "to_tsvector('simple', student_id || ' ' || first_name || ' ' || last_name || ' ' || email)"
+)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        # Own copy of the text, so index entries can be replaced without the old values;
+        # prefix indexes make short prefixes as cheap as whole words
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"student_id, first_name, last_name, email, "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, student_id, first_name, last_name, email) '
+            f'SELECT id, student_id, first_name, last_name, email FROM students_student'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'CREATE INDEX {PG_INDEX} ON students_student USING GIN (({PG_DOCUMENT}))')
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {FTS_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX {PG_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_student_student_name_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+INDEX = models.Index(Lower('email'), name='auth_user_email_lower_idx')
+
+
+def create_email_index(apps, schema_editor):
+    # auth_user belongs to django.contrib.auth, so its index is added here
+    schema_editor.add_index(apps.get_model(settings.AUTH_USER_MODEL), INDEX)
+
+
+def drop_email_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model(settings.AUTH_USER_MODEL), INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0007_student_search_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_email_index, drop_email_index),
+    ]
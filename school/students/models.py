@@ -35,6 +35,10 @@ class Student(models.Model):
 
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['status', 'class_enrolled'], name='student_status_class_idx'),
+            models.Index(fields=['last_name', 'first_name'], name='student_name_idx'),
+        ]
 
     def __str__(self):
         return f"{self.student_id} - {self.first_name} {self.last_name}"
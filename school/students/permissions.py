@@ -0,0 +1,28 @@
+from rest_framework.permissions import BasePermission
+from .tokens import current_claims, profile_claims
+
+
+def request_role(request):
+    """The role of the request's user, from its token's claims when current."""
+    if not request.user or not request.user.is_authenticated:
+        return None
+    claims = current_claims(request.auth)
+    if claims is None:
+        claims = profile_claims(request.user)
+    return claims['role']
+
+
+class RolePermission(BasePermission):
+    """Allow users whose role (see students.tokens.user_role) is one of ``roles``."""
+    roles = ()
+
+    def has_permission(self, request, view):
+        return request_role(request) in self.roles
+
+
+class IsTeacher(RolePermission):
+    roles = ('teacher', 'admin')
+
+
+class IsAdmin(RolePermission):
+    roles = ('admin',)
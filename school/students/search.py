@@ -0,0 +1,120 @@
+"""
+Indexed full-text search over students' ids, names and emails.
+
+On SQLite the text lives in an FTS5 table keyed by the student's rowid and
+kept in step by the signals in students.signals; bulk_create() and
+queryset.update() skip those, so run ``manage.py rebuild_student_search``
+after them. On PostgreSQL a GIN index on the same text's tsvector needs no
+upkeep. Other databases fall back to ``icontains``.
+
+Every word of the query must match, each as a prefix, so ``jo sm`` finds
+John Smith and ``S0012`` finds student S00123.
+"""
+import re
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'students_student_fts'
+FIELDS = ['student_id', 'first_name', 'last_name', 'email']
+# bm25() weight per FIELDS column: an id or a name match outranks an email one
+WEIGHTS = [10.0, 5.0, 5.0, 1.0]
+
+# PostgreSQL: the indexed expression, which queries must repeat verbatim to use the index
+PG_DOCUMENT = (
+    "to_tsvector('simple', student_id || ' ' || first_name || ' ' || last_name || ' ' || email)"
+)
+
+
+def terms(query):
+    """The words of ``query``, split the way the FTS5 tokenizer splits text."""
+    return re.findall(r'[^\W_]+', query.lower())
+
+
+def _fts_match(words):
+    # Quoted so words like AND or NEAR are not operators; * makes each a prefix
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _pg_query(words):
+    return ' & '.join(f'{word}:*' for word in words)
+
+
+def search_ids(query, limit, using='default'):
+    """Primary keys of the students best matching ``query``, best first."""
+    words = terms(query)
+    if not words:
+        return []
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        # Every match is ranked: capping the candidates first would drop the
+        # best ones whenever a word is shared by more students than the cap
+        sql = (f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+               f'ORDER BY bm25({FTS_TABLE}, {", ".join(map(str, WEIGHTS))}), rowid LIMIT %s')
+        params = [_fts_match(words), limit]
+    elif connection.vendor == 'postgresql':
+        sql = (f"SELECT id FROM students_student WHERE {PG_DOCUMENT} @@ to_tsquery('simple', %s) "
+               f"ORDER BY ts_rank({PG_DOCUMENT}, to_tsquery('simple', %s)) DESC, id LIMIT %s")
+        params = [_pg_query(words), _pg_query(words), limit]
+    else:
+        from .models import Student
+        return list(filter_matching(Student.objects.using(using), query).values_list('pk', flat=True)[:limit])
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def filter_matching(queryset, query):
+    """``queryset`` narrowed to students matching ``query``, in its own order."""
+    words = terms(query)
+    if not words:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == 'sqlite':
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [_fts_match(words)]
+        ))
+    if vendor == 'postgresql':
+        return queryset.filter(pk__in=RawSQL(
+            f"SELECT id FROM students_student WHERE {PG_DOCUMENT} @@ to_tsquery('simple', %s)", [_pg_query(words)]
+        ))
+    for word in words:
+        queryset = queryset.filter(Q(*(Q(**{f'{field}__icontains': word}) for field in FIELDS), _connector=Q.OR))
+    return queryset
+
+
+def uses_index(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def index(students, using='default'):
+    """Add or refresh the index entries of ``students``."""
+    if not uses_index(using):
+        return
+    rows = [(student.pk, *(getattr(student, field) or '' for field in FIELDS)) for student in students]
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FIELDS)}) VALUES (%s, %s, %s, %s, %s)', rows,
+        )
+
+
+def unindex(pks, using='default'):
+    if not uses_index(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [(pk,) for pk in pks])
+
+
+def rebuild(using='default'):
+    """Refill the index from the students table."""
+    if not uses_index(using):
+        return
+    from .models import Student
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, {", ".join(FIELDS)}) '
+            f'SELECT id, {", ".join(FIELDS)} FROM {Student._meta.db_table}'
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
@@ -1,25 +1,24 @@
 from rest_framework import serializers
+from classes.models import Class
+from school.caching import CachedPrimaryKeyRelatedField
+from school.fieldsets import SparseFieldsetSerializerMixin
 from .models import Student
 
-class StudentSerializer(serializers.ModelSerializer):
-    class_enrolled = serializers.PrimaryKeyRelatedField(
-        queryset=Student.objects.none(),  # Will be set in __init__ to avoid circular import
+class StudentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    class_enrolled = CachedPrimaryKeyRelatedField(
+        'class-names',
+        queryset=Class.objects.all(),
         allow_null=True,
         required=False
     )
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Import here to avoid circular import
-        from classes.models import Class
-        self.fields['class_enrolled'].queryset = Class.objects.all()
-
     class Meta:
         model = Student
         fields = ['id', 'student_id', 'first_name', 'last_name', 'email', 'date_of_birth',
                  'gender', 'phone', 'address', 'enrollment_date', 'status', 'class_enrolled',
                  'guardian_name', 'guardian_phone', 'guardian_email', 'created_at', 'updated_at']
         read_only_fields = ['id', 'enrollment_date', 'created_at', 'updated_at']
+        expandable = {'class_enrolled': 'classes.serializers.ClassSerializer'}
 
     def validate_student_id(self, value):
         # Check uniqueness only for new instances or if value changed
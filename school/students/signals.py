@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from . import authentication, search, tokens
+from .models import Student
+
+
+@receiver(post_save, sender=Student)
+def index_student(sender, instance, using, update_fields, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(search.FIELDS):
+        return  # Nothing searchable changed
+    search.index([instance], using=using)
+
+
+@receiver(post_delete, sender=Student)
+def unindex_student(sender, instance, using, **kwargs):
+    search.unindex([instance.pk], using=using)
+
+
+# Fields behind the profile claims in JWTs (students.tokens)
+USER_CLAIM_FIELDS = {'username', 'email', 'first_name', 'last_name', 'is_superuser', 'is_staff', 'is_active'}
+STUDENT_CLAIM_FIELDS = {'user', 'student_id', 'date_of_birth', 'gender'}
+
+
+@receiver(pre_save, sender=User)
+def remember_user_active(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and 'is_active' not in update_fields):
+        return
+    # Only a change of is_active makes every process reload the deny-list
+    instance._was_active = sender.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_claims_changed(sender, instance, update_fields=None, **kwargs):
+    was_active = instance.__dict__.pop('_was_active', None)
+    if update_fields is not None and not set(update_fields) & USER_CLAIM_FIELDS:
+        return  # e.g. last_login
+    user_id = instance.pk
+    activation_changed = was_active is not None and was_active != instance.is_active
+
+    def changed():
+        tokens.mark_stale(user_id)
+        authentication.users.discard(user_id)
+        if activation_changed:
+            authentication.deny_list.changed()
+    transaction.on_commit(changed, using=kwargs['using'])
+
+
+@receiver(pre_save, sender=Student)
+def remember_student_user(sender, instance, update_fields=None, **kwargs):
+    if instance._state.adding or (update_fields is not None and 'user' not in update_fields):
+        return
+    # The previous holder's claims go stale too if the profile moves to another user
+    instance._previous_user_id = sender.objects.filter(pk=instance.pk).values_list('user', flat=True).first()
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def student_claims_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & STUDENT_CLAIM_FIELDS:
+        return
+    for user_id in {instance.user_id, getattr(instance, '_previous_user_id', None)} - {None}:
+        transaction.on_commit(lambda user_id=user_id: tokens.mark_stale(user_id), using=kwargs['using'])
@@ -1,3 +1,432 @@
-from django.test import TestCase
+import asyncio
+from io import StringIO
+import threading
+import time
+from django.conf import settings
+from django.contrib.admin.sites import site
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from attendance.models import Attendance
+from school.async_views import BoundedPool, PoolSaturated
+from students.auth_views import PASSWORD_HASHING
+from students.authentication import DENY_LIST_VERSION_KEY
+from students.backends import EMAIL_INDEX, users_matching
+from students.models import Student
+from students.permissions import IsTeacher
+from students.tokens import CLAIMS_VERSION, ProfileRefreshToken, current_claims, mark_stale
+from school.testing import (
+    IndexUsageMixin, QueryBudgetMixin, ReferenceCacheMixin, make_attendance, make_class, make_grade, make_student, make_subject,
+)
 
-# Create your tests here.
+
+class StudentAPIQueryTests(QueryBudgetMixin, TestCase):
+    def test_list_does_not_query_per_row(self):
+        self.assertQueriesConstant('/api/students/', make_student, budget=2)  # ETag validators, then the page
+
+    def test_attendance_action_does_not_query_per_row(self):
+        student = make_student()
+        self.assertQueriesConstant(
+            f'/api/students/{student.pk}/attendance/',
+            lambda: make_attendance(student=student),
+            budget=2,
+        )
+
+
+class StudentIndexTests(IndexUsageMixin, TestCase):
+    def test_status_and_class_filter_uses_status_class_index(self):
+        self.assertUsesIndex(Student.objects.filter(status='active', class_enrolled=1), 'student_status_class_idx')
+
+    def test_default_ordering_uses_name_index(self):
+        self.assertUsesIndex(Student.objects.all()[:50], 'student_name_idx')
+
+
+class StudentConditionalGetTests(QueryBudgetMixin, TestCase):
+    def test_unchanged_list_is_not_modified(self):
+        make_student()
+        etag = self.client.get('/api/students/')['ETag']
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/students/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(len(context.captured_queries), 1)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_update_delete_and_filters_change_the_etag(self):
+        student = make_student()
+        other = make_student()
+        etag = self.client.get('/api/students/')['ETag']
+        self.assertNotEqual(self.client.get('/api/students/', {'status': 'active'})['ETag'], etag)
+
+        student.first_name = 'Renamed'
+        student.save()
+        response = self.client.get('/api/students/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        other.delete()
+        self.assertEqual(self.client.get('/api/students/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_honours_if_modified_since(self):
+        student = make_student()
+        response = self.client.get(f'/api/students/{student.pk}/')
+        response = self.client.get(f'/api/students/{student.pk}/',
+                                   HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+
+class StudentFieldsetTests(QueryBudgetMixin, TestCase):
+    def test_picker_fields_skip_contact_columns(self):
+        make_student(address='1 Main St', guardian_name='Pat')
+        _, context = self.count_queries('/api/students/?fields=id,first_name,last_name')
+        page_sql = context.captured_queries[-1]['sql']
+        self.assertNotIn('"address"', page_sql)
+        self.assertNotIn('"guardian_name"', page_sql)
+
+    def test_expanded_class_keeps_enrollment_without_per_row_queries(self):
+        def make_row():
+            make_student(class_enrolled=make_class())
+        self.assertQueriesConstant('/api/students/?fields=id,class_enrolled&expand=class_enrolled', make_row)
+        row = self.client.get('/api/students/', {'expand': 'class_enrolled'}).json()['results'][0]
+        self.assertEqual(row['class_enrolled']['current_enrollment'], 1)
+
+
+class StudentOverviewTests(TestCase):
+    def test_overview_combines_profile_grades_and_attendance(self):
+        class_obj = make_class(class_name='5B')
+        student = make_student(class_enrolled=class_obj)
+        maths, art = make_subject(subject_name='Maths'), make_subject(subject_name='Art')
+        make_grade(student=student, subject=maths, grade_value=90)
+        make_grade(student=student, subject=maths, grade_value=70)
+        make_grade(student=student, subject=art, grade_value=60)
+        make_grade(subject=maths, grade_value=10)  # Someone else's
+        make_attendance(student=student, class_name=class_obj, status='present')
+        make_attendance(student=student, class_name=class_obj, status='late')
+
+        data = self.client.get(f'/api/students/{student.pk}/overview/').json()
+        self.assertEqual(data['student']['student_id'], student.student_id)
+        self.assertEqual(data['student']['class_name'], '5B')
+        self.assertEqual(data['grades']['count'], 3)
+        self.assertEqual(data['grades']['average_percentage'], 73.33)
+        self.assertEqual({row['subject_name']: row['average_percentage'] for row in data['subjects']},
+                         {'Maths': 80.0, 'Art': 60.0})
+        self.assertEqual(len(data['recent_grades']), 3)
+        self.assertEqual((data['attendance']['total'], data['attendance']['present_rate']), (2, 50.0))
+        self.assertEqual([row['status'] for row in data['recent_attendance']], ['late', 'present'])
+
+    def test_unknown_student_is_404(self):
+        response = self.client.get('/api/students/999/overview/')
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', response.json())
+
+
+class StudentSearchTests(TestCase):
+    def search(self, q, **params):
+        return [row['student_id'] for row in self.client.get('/api/students/search/', {'q': q, **params}).json()]
+
+    def test_prefixes_of_every_word_must_match(self):
+        make_student(student_id='S1', first_name='John', last_name='Smith', email='js@example.com')
+        make_student(student_id='S2', first_name='Joan', last_name='Baker', email='jb@example.com')
+        self.assertEqual(self.search('jo sm'), ['S1'])
+        self.assertEqual(sorted(self.search('JO')), ['S1', 'S2'])
+        self.assertEqual(self.search('jb@example'), ['S2'])
+
+    def test_name_matches_outrank_email_matches(self):
+        make_student(student_id='S1', first_name='Ann', last_name='Lee', email='rivera@example.com')
+        make_student(student_id='S2', first_name='Maria', last_name='Rivera', email='maria@example.com')
+        self.assertEqual(self.search('rivera'), ['S2', 'S1'])
+        self.assertEqual(self.search('rivera', limit=1), ['S2'])
+
+    def test_the_best_match_wins_however_many_share_the_word(self):
+        Student.objects.bulk_create([
+            Student(student_id=f'B{n}', first_name='Kim', last_name='Lee', email=f'b{n}@example.com')
+            for n in range(1200)
+        ])
+        make_student(student_id='KIM', first_name='Kim', last_name='Kim')  # The newest
+        call_command('rebuild_student_search', stdout=StringIO())
+        self.assertEqual(self.search('kim', limit=1), ['KIM'])
+
+    def test_index_follows_saves_and_deletes(self):
+        student = make_student(student_id='S1', first_name='Old')
+        student.first_name = 'New'
+        student.save()
+        self.assertEqual(self.search('old'), [])
+        self.assertEqual(self.search('new'), ['S1'])
+        student.delete()
+        self.assertEqual(self.search('new'), [])
+
+    def test_rebuild_restores_entries_skipped_by_bulk_operations(self):
+        Student.objects.bulk_create([Student(student_id='B1', first_name='Bulk', last_name='Row', email='b@example.com')])
+        self.assertEqual(self.search('bulk'), [])
+        call_command('rebuild_student_search', stdout=StringIO())
+        self.assertEqual(self.search('bulk'), ['B1'])
+
+    def test_query_without_words_is_rejected(self):
+        response = self.client.get('/api/students/search/', {'q': '"*', 'limit': 0})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'q', 'limit'})
+
+    def test_admin_search_uses_the_index(self):
+        make_student(first_name='Priya')
+        make_student(first_name='Pat')
+        admin = site._registry[Student]
+        queryset, may_have_duplicates = admin.get_search_results(
+            RequestFactory().get('/'), Student.objects.all(), 'pri',
+        )
+        self.assertEqual([student.first_name for student in queryset], ['Priya'])
+        self.assertFalse(may_have_duplicates)
+        self.assertIn('students_student_fts', str(queryset.query))
+
+
+class StudentAutocompleteTests(ReferenceCacheMixin, TestCase):
+    def test_names_and_ids(self):
+        make_student(student_id='S100', first_name='Zoë', last_name='Adams')
+        make_student(student_id='S200', first_name='Zack', last_name='Brown')
+        response = self.client.get('/api/autocomplete/students/', {'q': 'zo'})
+        self.assertEqual(response.json(), [{'id': Student.objects.get(student_id='S100').pk, 'label': 'S100 - Zoë Adams'}])
+        labels = [row['label'] for row in self.client.get('/api/autocomplete/students/', {'q': 's2'}).json()]
+        self.assertEqual(labels, ['S200 - Zack Brown'])
+
+    @override_settings(AUTOCOMPLETE_MAX_ROWS=1)
+    def test_too_many_rows_for_memory_falls_back_to_full_text_search(self):
+        make_student(first_name='Zoë')
+        make_student(first_name='Zack')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/autocomplete/students/', {'q': 'zac'})
+        self.assertEqual([row['label'].split()[-2] for row in response.json()], ['Zack'])
+        self.assertIn('students_student_fts', context.captured_queries[-1]['sql'])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])  # Fast, for tests only
+class EmailLoginTests(IndexUsageMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('ada', 'Ada.Byron@Example.com', 'correct horse')
+
+    def login(self, username, password='correct horse'):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password})
+
+    def test_email_matches_ignoring_case_in_one_query(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.login('ada.byron@example.COM')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['user']['username'], 'ada')
+        user_queries = [q for q in context.captured_queries if q['sql'].startswith('SELECT') and 'auth_user' in q['sql']]
+        self.assertEqual(len(user_queries), 2)  # The account throttle's id lookup, then the backend's
+
+    def test_username_and_wrong_password(self):
+        self.assertEqual(self.login('ada').status_code, 200)
+        self.assertEqual(self.login('ada', 'wrong').status_code, 401)
+        self.assertEqual(self.login('nobody@example.com').status_code, 401)
+
+    def test_shared_email_logs_in_whichever_password_matches(self):
+        User.objects.create_user('ada2', 'ada.byron@example.com', 'other password')
+        self.assertEqual(self.login('ada.byron@example.com', 'other password').json()['user']['username'], 'ada2')
+        self.assertEqual(self.login('ada.byron@example.com').json()['user']['username'], 'ada')
+
+    def test_non_ascii_emails_still_match(self):
+        User.objects.create_user('emile', 'Émile.Zola@Example.com', 'correct horse')
+        for login in ('Émile.Zola@Example.com', 'ÉMILE.ZOLA@EXAMPLE.COM'):
+            self.assertEqual(self.login(login).json()['user']['username'], 'emile')
+
+    def test_email_lookup_uses_lowercase_email_index(self):
+        self.assertUsesIndex(users_matching('ada.byron@example.com'), EMAIL_INDEX)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class AsyncAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()  # Throttle history
+        self.user = User.objects.create_user('grace', 'grace@example.com', 'correct horse')
+
+    def login(self, username='grace', password='correct horse'):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password},
+                                content_type='application/json')
+
+    def test_register_then_log_in(self):
+        response = self.client.post('/api/auth/register/', {
+            'username': 'ada', 'email': 'ada@example.com', 'password': 'pw', 'password_confirm': 'pw',
+            'student_id': 'S9', 'first_name': 'Ada', 'date_of_birth': '2010-12-10', 'gender': 'F',
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Student.objects.get(student_id='S9').user.username, 'ada')
+        self.assertIn('access', self.login('ada', 'pw').json()['tokens'])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.login(password='wrong').status_code, 401)
+        self.assertEqual(self.client.post('/api/auth/login/', {'username': 'grace'},
+                                          content_type='application/json').json(), {'password': ['This field is required.']})
+        response = self.client.post('/api/auth/register/', {'username': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('student_id', response.json())
+
+    def test_attempts_on_one_account_are_throttled(self):
+        rates = {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], 'login_account': '2/min'}
+        with override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates}):
+            self.assertEqual(self.login(password='wrong').status_code, 401)
+            self.assertEqual(self.login('GRACE@example.com', password='wrong').status_code, 401)
+            response = self.login()
+            self.assertEqual(response.status_code, 429)
+            self.assertIn('Retry-After', response)
+            self.assertEqual(self.login('someone-else').status_code, 401)
+
+    def test_a_cancelled_call_keeps_its_place_until_it_finishes(self):
+        pool = BoundedPool(workers=1, queue=0, name='test-pool')
+        started, finish = threading.Event(), threading.Event()
+
+        def hash_password():
+            started.set()
+            finish.wait(5)
+
+        async def cancel_midway():
+            call = asyncio.ensure_future(pool.run(hash_password))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            call.cancel()
+            await asyncio.wait([call])
+            with self.assertRaises(PoolSaturated):
+                await pool.run(hash_password)
+            finish.set()
+            while not pool._places.acquire(blocking=False):
+                await asyncio.sleep(0.01)
+            pool._places.release()
+
+        asyncio.run(cancel_midway())
+
+    def test_saturated_hashing_pool_answers_503(self):
+        places = PASSWORD_HASHING.workers + PASSWORD_HASHING.queue
+        for _ in range(places):
+            PASSWORD_HASHING._places.acquire()
+        try:
+            response = self.login()
+        finally:
+            for _ in range(places):
+                PASSWORD_HASHING._places.release()
+        self.assertEqual((response.status_code, response['Retry-After']), (503, '1'))
+        self.assertEqual(self.login().status_code, 200)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ProfileClaimsTests(ReferenceCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()  # Also clears throttle history and stale-claim marks
+        self.user = User.objects.create_user('lin', 'lin@example.com', 'pw', first_name='Lin')
+        self.student = make_student(user=self.user, student_id='S77', gender='F')
+
+    def log_in(self):
+        return self.client.post('/api/auth/login/', {'username': 'lin', 'password': 'pw'}).json()['tokens']
+
+    def profile(self, access):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get('/api/auth/profile/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return response.json(), len(context.captured_queries)
+
+    def test_profile_comes_from_the_token(self):
+        access = self.log_in()['access']
+        self.profile(access)  # Loads the deny-list, once per process
+        profile, queries = self.profile(access)
+        self.assertEqual(queries, 0)
+        self.assertEqual((profile['role'], profile['student'], profile['student_id'], profile['gender']),
+                         ('student', self.student.pk, 'S77', 'F'))
+
+    def test_profile_changes_make_claims_stale_until_refresh(self):
+        tokens = self.log_in()
+        self.student.student_id = 'S78'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student.save()
+        self.assertIsNone(current_claims(AccessToken(tokens['access'])))
+        profile, queries = self.profile(tokens['access'])
+        self.assertEqual((profile['student_id'], queries), ('S78', 3))  # Deny-list, user and student
+
+        refreshed = self.client.post('/api/auth/token/refresh/', {'refresh': tokens['refresh']}).json()
+        self.assertEqual(current_claims(AccessToken(refreshed['access']))['student_id'], 'S78')
+
+    def test_changes_made_while_the_user_was_read_make_the_claims_stale(self):
+        read_at = time.time()  # e.g. before the password check
+        mark_stale(self.user.pk)
+        token = ProfileRefreshToken.for_user(self.user, read_at).access_token
+        self.assertIsNone(current_claims(token))
+
+    def test_claims_from_another_version_are_ignored(self):
+        token = ProfileRefreshToken.for_user(self.user).access_token
+        self.assertEqual(current_claims(token)['role'], 'student')
+        token['claims_version'] = CLAIMS_VERSION + 1
+        self.assertIsNone(current_claims(token))
+
+    def test_role_permission_reads_the_claims(self):
+
+        @api_view(['GET'])
+        @permission_classes([IsTeacher])
+        def teachers_only(request):
+            return Response({})
+
+        teacher = User.objects.create_user('t', 't@example.com', 'pw', is_staff=True)
+        for user, expected in ((teacher, 200), (self.user, 403)):
+            access = ProfileRefreshToken.for_user(user).access_token
+            request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+            self.assertEqual(teachers_only(request).status_code, expected)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class StatelessTokenTests(ReferenceCacheMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user('ada', 'ada@example.com', 'pw', is_staff=True)
+
+    def access(self):
+        return f'Bearer {ProfileRefreshToken.for_user(self.user).access_token}'
+
+    def user_queries(self, path, access, **kwargs):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(path, HTTP_AUTHORIZATION=access, **kwargs)
+        return response, [q['sql'] for q in context.captured_queries if 'auth_user' in q['sql']]
+
+    def test_current_claims_need_no_user_query(self):
+        access = self.access()
+        self.user_queries('/api/subjects/', access)  # Loads the deny-list
+        response, queries = self.user_queries('/api/subjects/', access)
+        self.assertEqual((response.status_code, queries), (200, []))
+
+    def test_deactivated_users_are_refused(self):
+        access = self.access()
+        self.assertEqual(self.user_queries('/api/subjects/', access)[0].status_code, 200)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(self.user_queries('/api/subjects/', access)[0].status_code, 401)
+
+    def test_only_activation_changes_reload_the_deny_list(self):
+        self.user.first_name = 'Ada'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertIsNone(cache.get(DENY_LIST_VERSION_KEY))
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertIsNotNone(cache.get(DENY_LIST_VERSION_KEY))
+
+    def test_stale_claims_use_the_cached_user(self):
+        access = self.access()
+        self.user.first_name = 'Ada'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response, queries = self.user_queries('/api/subjects/', access)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(queries)  # The deny-list and the user
+        response, queries = self.user_queries('/api/subjects/', access)
+        self.assertEqual((response.status_code, queries), (200, []))
+
+    def test_roll_call_records_the_token_user(self):
+        student = make_student()
+        class_obj = make_class()
+        response = self.client.post('/api/attendance/bulk/', {
+            'class_name': class_obj.pk, 'date': '2024-09-02',
+            'records': [{'student': student.pk, 'status': 'present'}],
+        }, content_type='application/json', HTTP_AUTHORIZATION=self.access())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Attendance.objects.get().marked_by_id, self.user.pk)
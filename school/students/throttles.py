@@ -0,0 +1,54 @@
+"""
+Rate limits for the login and registration views, counted in the default
+cache. With the local-memory cache each server process counts on its own;
+point CACHES at a shared backend to count across processes.
+"""
+import hashlib
+from django.db.models import Case, IntegerField, Value, When
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+from .backends import users_matching
+
+
+class AuthRateThrottle(SimpleRateThrottle):
+    """Requests per client IP, at the rate configured for ``scope``."""
+
+    def get_rate(self):
+        # Read when used rather than at import, so the rates follow the settings
+        return api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginIPThrottle(AuthRateThrottle):
+    scope = 'login_ip'
+
+
+class RegisterIPThrottle(AuthRateThrottle):
+    scope = 'register_ip'
+
+
+class LoginAccountThrottle(AuthRateThrottle):
+    """Login attempts against one account, from anywhere."""
+    scope = 'login_account'
+
+    def __init__(self, login):
+        # Hashed: any text can be typed here, and cache keys must stay short and plain
+        self.login = hashlib.sha256(login.strip().lower().encode()).hexdigest()
+        super().__init__()
+
+    @classmethod
+    def for_login(cls, login):
+        """
+        The throttle for the account ``login`` names, so attempts by username
+        and by email share one count. Logins naming no account count by text.
+        """
+        # The user the backend tries first (students.backends): a username match
+        user_id = users_matching(login).order_by(
+            Case(When(username=login, then=Value(0)), default=Value(1), output_field=IntegerField()), 'pk',
+        ).values_list('pk', flat=True).first()
+        return cls(f'user:{user_id}' if user_id is not None else login)
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.login}
@@ -0,0 +1,131 @@
+"""
+JWTs that carry the user's profile, so /api/auth/profile/ and role checks
+need no query.
+
+Tokens are minted with the user's role, student pk, student_id and the
+other profile fields at login, and re-minted from the database on every
+refresh. Two things make claims stale:
+
+- ``claims_version`` differs from CLAIMS_VERSION: the claims' shape
+  changed in a release. Bump it whenever PROFILE_CLAIMS or their meaning
+  changes.
+- The profile changed after the claims were read: the signals in
+  students.signals record when each change commits (mark_stale()), and
+  claims read before that (``claims_at``) no longer speak for the user.
+
+Stale claims are ignored and the profile read from the database, until the
+client refreshes its token. The marks live in the default cache for
+ACCESS_TOKEN_LIFETIME, after which every earlier access token has expired.
+With several processes the cache must be shared for the marks to reach
+all of them.
+"""
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+CLAIMS_VERSION = 2  # 2: is_staff and is_superuser, for TokenUser
+PROFILE_CLAIMS = ['username', 'email', 'first_name', 'last_name', 'role',
+                  'student', 'student_id', 'date_of_birth', 'gender']
+
+
+def user_role(user, student=None):
+    if student is not None:
+        return 'student'
+    if user.is_superuser:
+        return 'admin'
+    return 'teacher'  # Staff, and other users without a student profile
+
+
+def profile_claims(user):
+    """The profile claims of ``user``, read from the database."""
+    from .models import Student
+    student = Student.objects.filter(user=user).only('student_id', 'date_of_birth', 'gender').first()
+    return {
+        'username': user.username,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'role': user_role(user, student),
+        'student': student.pk if student else None,
+        'student_id': student.student_id if student else None,
+        'date_of_birth': student.date_of_birth.isoformat() if student and student.date_of_birth else None,
+        'gender': student.gender if student else None,
+    }
+
+
+def _stale_key(user_id):
+    return f'jwt-claims-stale:{user_id}'
+
+
+def mark_stale(user_id):
+    """Stop trusting the profile claims of tokens issued to ``user_id`` until now."""
+    cache.set(_stale_key(user_id), time.time(), api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+
+
+def current_claims(token):
+    """``token``'s profile claims if they are still current, else None."""
+    if token is None or token.get('claims_version') != CLAIMS_VERSION:
+        return None
+    stale_since = cache.get(_stale_key(token.get(api_settings.USER_ID_CLAIM)))
+    if stale_since is not None and token.get('claims_at', 0) < stale_since:
+        return None
+    return {claim: token.get(claim) for claim in PROFILE_CLAIMS}
+
+
+class ProfileRefreshToken(RefreshToken):
+    """A refresh token, and the access tokens made from it, carrying the profile claims."""
+
+    @classmethod
+    def for_user(cls, user, read_at=None):
+        """A token for ``user``; ``read_at`` as for set_profile()."""
+        token = super().for_user(user)
+        token.set_profile(user, read_at)
+        return token
+
+    def set_profile(self, user, read_at=None):
+        """
+        Claim ``user``'s profile, as read from the database at ``read_at``
+        (default: now). Pass the time from before ``user`` was fetched when
+        that was a while ago, e.g. before a password check.
+        """
+        self['claims_version'] = CLAIMS_VERSION
+        # Taken before reading, so a change committed during the read counts as later
+        self['claims_at'] = read_at or time.time()
+        for claim, value in profile_claims(user).items():
+            self[claim] = value
+        # Read by simplejwt's TokenUser (students.authentication)
+        self['is_staff'] = user.is_staff
+        self['is_superuser'] = user.is_superuser
+
+
+class ProfileTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    TokenRefreshSerializer that re-reads the profile claims, so refreshing
+    the token brings them up to date.
+    """
+    token_class = ProfileRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        read_at = time.time()
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        refresh.set_profile(user, read_at)
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
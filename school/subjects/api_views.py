@@ -1,8 +1,15 @@
 from rest_framework import viewsets, permissions
+from school.caching import CachedListMixin
+from school.conditional import ConditionalGetMixin
+from school.fieldsets import SparseFieldsetMixin
+from students.authentication import API_AUTHENTICATION_CLASSES
 from .models import Subject
 from .serializers import SubjectSerializer
 
-class SubjectViewSet(viewsets.ModelViewSet):
+class SubjectViewSet(ConditionalGetMixin, CachedListMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
+    """Subjects. The list is served from the reference cache until a subject changes."""
     queryset = Subject.objects.all()
     serializer_class = SubjectSerializer
-    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
\ No newline at end of file
+    authentication_classes = API_AUTHENTICATION_CLASSES  # Users from token claims, no query
+    permission_classes = [permissions.AllowAny]  # Allow unauthenticated access for development
+    reference_collection = 'subjects'
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class SubjectsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'subjects'
+
+    def ready(self):
+        from school import autocomplete
+        from school.caching import invalidate_on_change
+        from school.conditional import track_changes
+        invalidate_on_change('subjects.Subject', 'subjects')
+        track_changes('subjects.Subject')  # Names on grades
+        autocomplete.register('subjects', 'subjects.Subject', ['subject_code', 'subject_name'])
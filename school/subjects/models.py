@@ -4,6 +4,7 @@ class Subject(models.Model):
     subject_code = models.CharField(max_length=20, unique=True)
     subject_name = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['subject_name']
@@ -1,7 +1,8 @@
 from rest_framework import serializers
+from school.fieldsets import SparseFieldsetSerializerMixin
 from .models import Subject
 
-class SubjectSerializer(serializers.ModelSerializer):
+class SubjectSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Subject
         fields = ['id', 'subject_code', 'subject_name', 'description']
@@ -1,3 +1,75 @@
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
+from school import autocomplete
+from school.testing import QueryBudgetMixin, ReferenceCacheMixin, make_subject
+from subjects.models import Subject
 
-# Create your tests here.
+
+class SubjectAPIQueryTests(ReferenceCacheMixin, QueryBudgetMixin, TestCase):
+    def test_list_does_not_query_per_row(self):
+        self.assertQueriesConstant('/api/subjects/', make_subject, budget=2)  # ETag validators, then the page
+
+
+class SubjectCacheTests(ReferenceCacheMixin, QueryBudgetMixin, TestCase):
+    def test_repeat_list_is_served_from_cache(self):
+        make_subject()
+        self.assertEqual(self.count_queries('/api/subjects/')[0], 2)
+        self.assertEqual(self.count_queries('/api/subjects/')[0], 1)  # ETag validators only
+        stats = self.client.get('/api/dashboard/cache/').json()
+        self.assertEqual(stats['collections']['subjects'], {'hits': 1, 'misses': 1})
+
+    def test_save_and_delete_invalidate_the_list(self):
+        subject = make_subject(subject_name='Algebra')
+        self.client.get('/api/subjects/')
+        subject.subject_name = 'Geometry'
+        subject.save()
+        names = [row['subject_name'] for row in self.client.get('/api/subjects/').json()['results']]
+        self.assertEqual(names, ['Geometry'])
+        subject.delete()
+        self.assertEqual(self.client.get('/api/subjects/').json()['results'], [])
+
+
+class SubjectAutocompleteTests(ReferenceCacheMixin, TestCase):
+    def suggest(self, q):
+        return [row['label'] for row in self.client.get('/api/autocomplete/subjects/', {'q': q}).json()]
+
+    def test_prefixes_of_names_and_codes_without_queries_once_built(self):
+        make_subject(subject_code='BIO1', subject_name='Biologie générale')
+        make_subject(subject_code='CHEM', subject_name='Biochemistry')
+        self.assertEqual(self.suggest('bio'), ['BIO1 - Biologie générale', 'CHEM - Biochemistry'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('GENERALE bio'), ['BIO1 - Biologie générale'])
+            self.assertEqual(self.suggest('ch'), ['CHEM - Biochemistry'])
+            self.assertEqual(self.suggest(''), [])
+
+    def test_committed_saves_and_deletes_update_the_index(self):
+        subject = make_subject(subject_code='ART', subject_name='Drawing')
+        self.suggest('art')
+        with self.captureOnCommitCallbacks(execute=True):
+            subject.subject_name = 'Painting'
+            subject.save()
+            make_subject(subject_code='ARTH', subject_name='Art History')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('pa'), ['ART - Painting'])
+            self.assertEqual(self.suggest('dr'), [])
+            self.assertEqual(self.suggest('art'), ['ART - Painting', 'ARTH - Art History'])
+        with self.captureOnCommitCallbacks(execute=True):
+            subject.delete()
+        self.assertEqual(self.suggest('art'), ['ARTH - Art History'])
+
+    def test_unknown_index_is_404(self):
+        self.assertEqual(self.client.get('/api/autocomplete/teachers/', {'q': 'a'}).status_code, 404)
+        self.assertEqual(set(autocomplete._indexes), {'classes', 'students', 'subjects'})
+
+
+class SubjectAutocompleteRebuildTests(ReferenceCacheMixin, TransactionTestCase):
+    def test_a_stale_index_keeps_serving_while_it_rebuilds(self):
+        make_subject(subject_code='GEO', subject_name='Geography')
+        index = autocomplete.get_index('subjects')
+        index.search('geo')
+        Subject.objects.update(subject_name='Geology')  # Sends no signal, like another process's edit
+        with override_settings(AUTOCOMPLETE_MAX_AGE=0), self.assertNumQueries(0):
+            self.assertEqual([row['label'] for row in index.search('geo')], ['GEO - Geography'])
+        rebuilder = index._rebuilder
+        if rebuilder is not None:
+            rebuilder.join()
+        self.assertEqual([row['label'] for row in index.search('geo')], ['GEO - Geology'])